@@ -0,0 +1,296 @@
+# benchmarks/sinks.py
+"""
+🧪 Serviços locais para os benchmarks (sem rede externa).
+- PostgRESTFalso: o pedaço da API REST do Supabase que `core/state.py` e
+  `core/alert_history.py` usam (select/upsert/insert e as duas RPCs).
+- SumidouroSMTP: aceita EHLO/AUTH/MAIL/RCPT/DATA e descarta a mensagem.
+- SumidouroTelegram: responde getMe/sendMessage como a Bot API.
+Todos contam requisições e bytes trafegados num `Trafego` compartilhado.
+"""
+from __future__ import annotations
+
+import datetime
+import itertools
+import json
+import socketserver
+import threading
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+# ==================================================
+# 📊 Contagem de tráfego
+# ==================================================
+class Trafego:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requisicoes: dict[str, int] = defaultdict(int)
+        self.bytes_recebidos: dict[str, int] = defaultdict(int)
+        self.bytes_enviados: dict[str, int] = defaultdict(int)
+
+    def contar(self, servico: str, recebidos: int, enviados: int, requisicoes: int = 1) -> None:
+        with self._lock:
+            self.requisicoes[servico] += requisicoes
+            self.bytes_recebidos[servico] += recebidos
+            self.bytes_enviados[servico] += enviados
+
+    def zerar(self) -> None:
+        with self._lock:
+            self.requisicoes.clear()
+            self.bytes_recebidos.clear()
+            self.bytes_enviados.clear()
+
+    def resumo(self) -> dict:
+        with self._lock:
+            return {
+                "requisicoes": dict(self.requisicoes),
+                "bytes": {s: self.bytes_recebidos[s] + self.bytes_enviados[s] for s in self.requisicoes},
+            }
+
+
+def _servir(servidor) -> int:
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor.server_address[1]
+
+
+# ==================================================
+# 🗄️ Supabase / PostgREST
+# ==================================================
+class PostgRESTFalso:
+    """
+    Tabelas em memória: kv_state_* (k → linha) e tabelas só de inserção.
+    `gatilho_updated_at` imita o gatilho kv_state_touch
+    (sql/kv_state_functions.sql); sem ele, um upsert que não manda
+    `updated_at` mantém o valor anterior, como no Postgres.
+    """
+
+    def __init__(self, trafego: Trafego, gatilho_updated_at: bool = True):
+        self.trafego = trafego
+        self.gatilho_updated_at = gatilho_updated_at
+        self.kv: dict[str, dict[str, dict]] = defaultdict(dict)
+        self.linhas: dict[str, list[dict]] = defaultdict(list)
+        self._lock = threading.Lock()
+        self._versoes = itertools.count(1)
+        self.servidor = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.porta = _servir(self.servidor)
+        self.url = f"http://127.0.0.1:{self.porta}"
+
+    def _versao(self) -> str:
+        base = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+        return (base + datetime.timedelta(microseconds=next(self._versoes))).isoformat()
+
+    def semear(self, tabela: str, k: str, v: dict) -> None:
+        self.kv[tabela][k] = {"k": k, "v": v, "updated_at": self._versao()}
+
+    # -------- operações --------
+    def _select(self, tabela: str, consulta: dict) -> list:
+        colunas = consulta.get("select", ["*"])[0].split(",")
+        filtros = {c: v[0][3:] for c, v in consulta.items() if v and v[0].startswith("eq.")}
+        if tabela.startswith("kv_state_"):
+            linhas = list(self.kv[tabela].values())
+        else:
+            linhas = list(self.linhas[tabela])
+        linhas = [l for l in linhas if all(str(l.get(c)) == v for c, v in filtros.items())]
+        if colunas != ["*"]:
+            linhas = [{c: l.get(c) for c in colunas} for l in linhas]
+        return linhas
+
+    def _gravar(self, tabela: str, corpo, ignorar_conflito: list[str] | None = None) -> list:
+        registros = corpo if isinstance(corpo, list) else [corpo]
+        if tabela.startswith("kv_state_"):
+            for r in registros:
+                anterior = self.kv[tabela].get(r["k"])
+                if self.gatilho_updated_at or anterior is None:
+                    versao = self._versao()
+                else:
+                    versao = r.get("updated_at", anterior["updated_at"])
+                self.kv[tabela][r["k"]] = {"k": r["k"], "v": r["v"], "updated_at": versao}
+            return [self.kv[tabela][r["k"]] for r in registros]
+        if ignorar_conflito:
+            # on_conflict=<colunas> + resolution=ignore-duplicates (on conflict do nothing)
+            vistos = {tuple(str(l.get(c)) for c in ignorar_conflito) for l in self.linhas[tabela]}
+            novos = []
+            for r in registros:
+                chave = tuple(str(r.get(c)) for c in ignorar_conflito)
+                if chave not in vistos:
+                    vistos.add(chave)
+                    novos.append(r)
+            registros = novos
+        self.linhas[tabela].extend(registros)
+        return registros
+
+    def _rpc(self, funcao: str, p: dict):
+        tabela, k = p["p_tabela"], p["p_k"]
+        linha = self.kv[tabela].get(k)
+        anterior = linha["updated_at"] if linha else None
+        v = dict(linha["v"]) if linha else {}
+        if funcao == "kv_state_merge":
+            v.update(p["p_patch"])
+        elif funcao == "kv_state_remove_ticker":
+            if linha is None:
+                return None
+            t = p["p_ticker"]
+            for campo in ("ativos", "historico_alertas"):
+                if isinstance(v.get(campo), list):
+                    v[campo] = [a for a in v[campo] if str(a.get("ticker", "")).upper() != t]
+            for campo in ("tempo_acumulado", "em_contagem", "status", "precos_historicos", "ultimo_update_tempo"):
+                if isinstance(v.get(campo), dict):
+                    v[campo] = {x: y for x, y in v[campo].items() if x != t}
+        else:
+            raise KeyError(funcao)
+        self.kv[tabela][k] = {"k": k, "v": v, "updated_at": self._versao()}
+        resultado = {"anterior": anterior, "updated_at": self.kv[tabela][k]["updated_at"]}
+        if funcao == "kv_state_remove_ticker":
+            resultado["v"] = v
+        return resultado
+
+    def _handler(self):
+        falso = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _responder(self, status: int, dados, recebidos: int) -> None:
+                corpo = json.dumps(dados).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+                falso.trafego.contar("supabase", recebidos, len(corpo))
+
+            def _corpo(self) -> tuple[object, int]:
+                n = int(self.headers.get("Content-Length") or 0)
+                bruto = self.rfile.read(n) if n else b""
+                return (json.loads(bruto) if bruto else None), n
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                tabela = url.path.rsplit("/", 1)[-1]
+                _, n = self._corpo()  # o cliente manda "{}" até no GET
+                with falso._lock:
+                    self._responder(200, falso._select(tabela, parse_qs(url.query)), n)
+
+            def do_POST(self):
+                url = urlsplit(self.path)
+                corpo, n = self._corpo()
+                partes = url.path.strip("/").split("/")
+                with falso._lock:
+                    try:
+                        if len(partes) >= 2 and partes[-2] == "rpc":
+                            self._responder(200, falso._rpc(partes[-1], corpo or {}), n)
+                        else:
+                            conflito = None
+                            if "ignore-duplicates" in (self.headers.get("Prefer") or ""):
+                                conflito = parse_qs(url.query).get("on_conflict", [""])[0].split(",")
+                            self._responder(201, falso._gravar(partes[-1], corpo, conflito), n)
+                    except KeyError as e:
+                        self._responder(404, {"code": "PGRST202", "message": f"função {e} não existe"}, n)
+
+            do_PATCH = do_POST
+
+            def log_message(self, *args):
+                pass
+
+        return _Handler
+
+
+# ==================================================
+# 📧 SMTP
+# ==================================================
+class SumidouroSMTP:
+    def __init__(self, trafego: Trafego):
+        self.trafego = trafego
+        self.mensagens = 0
+        sumidouro = self
+
+        class _Handler(socketserver.StreamRequestHandler):
+            def _enviar(self, linha: str) -> None:
+                dados = (linha + "\r\n").encode()
+                self.wfile.write(dados)
+                sumidouro.trafego.contar("smtp", 0, len(dados), requisicoes=0)
+
+            def handle(self):
+                self._enviar("220 sumidouro ESMTP")
+                while True:
+                    linha = self.rfile.readline()
+                    if not linha:
+                        return
+                    sumidouro.trafego.contar("smtp", len(linha), 0, requisicoes=0)
+                    comando = linha.decode(errors="replace").strip().upper()
+                    if comando.startswith(("EHLO", "HELO")):
+                        self._enviar("250-sumidouro")
+                        self._enviar("250 AUTH PLAIN LOGIN")
+                    elif comando.startswith("AUTH"):
+                        self._enviar("235 ok")
+                    elif comando.startswith("DATA"):
+                        self._enviar("354 fim com <CRLF>.<CRLF>")
+                        while True:
+                            parte = self.rfile.readline()
+                            sumidouro.trafego.contar("smtp", len(parte), 0, requisicoes=0)
+                            if not parte or parte in (b".\r\n", b".\n"):
+                                break
+                        sumidouro.mensagens += 1
+                        sumidouro.trafego.contar("smtp", 0, 0, requisicoes=1)
+                        self._enviar("250 aceito")
+                    elif comando.startswith("QUIT"):
+                        self._enviar("221 tchau")
+                        return
+                    else:
+                        self._enviar("250 ok")
+
+        class _Servidor(socketserver.ThreadingTCPServer):
+            daemon_threads = True
+            allow_reuse_address = True
+
+        self.servidor = _Servidor(("127.0.0.1", 0), _Handler)
+        self.porta = _servir(self.servidor)
+
+
+# ==================================================
+# 📲 Telegram Bot API
+# ==================================================
+class SumidouroTelegram:
+    def __init__(self, trafego: Trafego):
+        self.trafego = trafego
+        self.mensagens = 0
+        self._ids = itertools.count(1)
+        sumidouro = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                n = int(self.headers.get("Content-Length") or 0)
+                self.rfile.read(n)
+                metodo = self.path.rsplit("/", 1)[-1].lower()
+                agora = int(datetime.datetime.now().timestamp())
+                if metodo == "getme":
+                    resultado = {"id": 1, "is_bot": True, "first_name": "bench", "username": "bench_bot"}
+                elif metodo == "sendmessage":
+                    sumidouro.mensagens += 1
+                    resultado = {
+                        "message_id": next(sumidouro._ids),
+                        "date": agora,
+                        "chat": {"id": 1, "type": "private"},
+                        "text": "",
+                    }
+                else:
+                    resultado = True
+                corpo = json.dumps({"ok": True, "result": resultado}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+                sumidouro.trafego.contar("telegram", n, len(corpo))
+
+            do_GET = do_POST
+
+            def log_message(self, *args):
+                pass
+
+        self.servidor = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.porta = _servir(self.servidor)
+        self.url = f"http://127.0.0.1:{self.porta}/bot"
@@ -0,0 +1,249 @@
+# core/alert_history.py
+"""
+🗃️ Histórico de alertas.
+Cada disparo é gravado na tabela `alertas_historico` (só inserção, índices
+por robô/data e ticker/data — ver sql/alert_history.sql). O estado quente
+do robô guarda apenas os últimos HISTORICO_RECENTE_MAX alertas, então o
+histórico não pesa mais em cada load/save.
+No disparo o alerta só vai para um arquivo local; uma thread em segundo
+plano o envia ao Supabase (o disparo não espera a rede). O envio é
+idempotente — chave única (robo, ticker, disparado_em) e duplicatas
+ignoradas —, então reenviar depois de uma falha ou queda não duplica linhas.
+"""
+from __future__ import annotations
+
+import atexit
+import datetime
+import json
+import os
+import queue
+import threading
+import time
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+from core.config import ALERT_HISTORY_SPOOL
+from core.logger import log
+from core.state import cliente_do_robo
+
+TABELA_HISTORICO = "alertas_historico"
+
+# Chave única da tabela (ver sql/alert_history.sql): reenvio não duplica
+CHAVE_UNICA = "robo,ticker,disparado_em"
+
+
+def _robo_base(nome_robo: str) -> str:
+    return nome_robo.replace("_przo_v1", "").strip().lower()
+
+
+def _linha(robo: str, registro: dict, tz: Optional[ZoneInfo]) -> dict:
+    """Registro do estado (`hora`, `ticker`, ...) → linha da tabela."""
+    hora = registro.get("hora")
+    try:
+        dt = datetime.datetime.strptime(str(hora), "%Y-%m-%d %H:%M:%S")
+        disparado_em = dt.replace(tzinfo=tz) if tz else dt.astimezone()
+    except ValueError:
+        disparado_em = datetime.datetime.now(datetime.timezone.utc)
+    # Mesmas chaves em todas as linhas (exigência do insert em lote do PostgREST)
+    return {
+        "robo": robo,
+        "ticker": registro.get("ticker"),
+        "operacao": registro.get("operacao"),
+        "preco_alvo": registro.get("preco_alvo"),
+        "preco_atual": registro.get("preco_atual"),
+        "hora": hora,
+        "disparado_em": disparado_em.isoformat(),
+        "dados": registro,
+    }
+
+
+# ==================================================
+# 📮 Pendentes (ainda não enviados ao Supabase)
+# ==================================================
+# `<robo>.jsonl` recebe os alertas novos; quem vai enviar move o conteúdo
+# para `<robo>.jsonl.enviando` e só o apaga depois do envio
+_PENDENTES_LOCK = threading.Lock()
+# Um envio por vez (a thread de fundo e o aparo na inicialização)
+_ENVIO_LOCK = threading.Lock()
+
+
+def _arquivo_pendentes(robo: str) -> str:
+    return os.path.join(ALERT_HISTORY_SPOOL, f"{robo}.jsonl")
+
+
+def _guardar_pendentes(robo: str, linhas: list[dict]) -> bool:
+    try:
+        with _PENDENTES_LOCK:
+            os.makedirs(ALERT_HISTORY_SPOOL, exist_ok=True)
+            with open(_arquivo_pendentes(robo), "a", encoding="utf-8") as f:
+                for linha in linhas:
+                    f.write(json.dumps(linha, ensure_ascii=False, default=str) + "\n")
+        return True
+    except OSError as e:
+        log(f"Não foi possível guardar alertas pendentes de {robo}: {e}", "⚠️")
+        return False
+
+
+def _ler_linhas(caminho: str) -> list[dict]:
+    if not os.path.exists(caminho):
+        return []
+    with open(caminho, encoding="utf-8") as f:
+        return [json.loads(l) for l in f if l.strip()]
+
+
+def _reservar_pendentes(robo: str) -> list[dict]:
+    """
+    Passa os pendentes para o arquivo `.enviando` (junto com o que sobrou de
+    um envio interrompido) e os devolve. Alertas guardados durante o envio
+    vão para o arquivo principal e não se perdem.
+    """
+    caminho = _arquivo_pendentes(robo)
+    enviando = caminho + ".enviando"
+    try:
+        with _PENDENTES_LOCK:
+            if os.path.exists(caminho):
+                with open(caminho, encoding="utf-8") as f:
+                    novos = f.read()
+                with open(enviando, "a", encoding="utf-8") as f:
+                    f.write(novos)
+                os.remove(caminho)
+            return _ler_linhas(enviando)
+    except (OSError, ValueError) as e:
+        log(f"Erro ao ler alertas pendentes de {robo}: {e}", "⚠️")
+        return []
+
+
+def _concluir_pendentes(robo: str) -> None:
+    try:
+        os.remove(_arquivo_pendentes(robo) + ".enviando")
+    except OSError:
+        pass
+
+
+# ==================================================
+# 💾 Gravar
+# ==================================================
+def arquivar_alertas(nome_robo: str, registros: list[dict], tz: Optional[ZoneInfo] = None,
+                     guardar_pendentes: bool = True) -> bool:
+    """
+    Insere os alertas na tabela de histórico (junto com os pendentes),
+    ignorando os que já estão lá. Em caso de falha guarda-os localmente
+    (se `guardar_pendentes`) e retorna False. Bloqueia até o Supabase
+    responder: no disparo use `arquivar_em_segundo_plano`.
+    """
+    robo = _robo_base(nome_robo)
+    novas = [_linha(robo, r, tz) for r in registros]
+
+    with _ENVIO_LOCK:
+        pendentes = _reservar_pendentes(robo)
+        try:
+            sb = cliente_do_robo(nome_robo)
+            if pendentes or novas:
+                sb.table(TABELA_HISTORICO).upsert(
+                    pendentes + novas, on_conflict=CHAVE_UNICA, ignore_duplicates=True,
+                ).execute()
+        except Exception as e:
+            log(f"Erro ao gravar histórico de alertas de {nome_robo}: {e}", "⚠️")
+            if guardar_pendentes and novas:
+                _guardar_pendentes(robo, novas)
+            return False
+
+        if pendentes:
+            _concluir_pendentes(robo)
+            log(f"{len(pendentes)} alerta(s) pendente(s) enviados ao histórico ({robo}).", "📮")
+    return True
+
+
+# ==================================================
+# 🧵 Envio em segundo plano (fora do caminho do disparo)
+# ==================================================
+_FILA_HISTORICO: "queue.Queue[str]" = queue.Queue()
+_ARQUIVADOR: Optional[threading.Thread] = None
+_ARQUIVADOR_LOCK = threading.Lock()
+
+# Segundos entre novas tentativas quando o Supabase está fora
+ESPERA_NOVA_TENTATIVA = 60.0
+
+
+def _laco_arquivador() -> None:
+    atrasados: set[str] = set()
+    while True:
+        try:
+            novo = _FILA_HISTORICO.get(timeout=ESPERA_NOVA_TENTATIVA if atrasados else None)
+        except queue.Empty:
+            novo = None
+        try:
+            for nome in atrasados | ({novo} if novo else set()):
+                try:
+                    ok = arquivar_alertas(nome, [])
+                except Exception as e:
+                    log(f"Erro no envio do histórico em segundo plano ({nome}): {e}", "⚠️")
+                    ok = False
+                if ok:
+                    atrasados.discard(nome)
+                else:
+                    atrasados.add(nome)
+        finally:
+            if novo is not None:
+                _FILA_HISTORICO.task_done()
+
+
+def arquivar_em_segundo_plano(nome_robo: str, registros: list[dict], tz: Optional[ZoneInfo] = None) -> bool:
+    """
+    Guarda os alertas no arquivo local de pendentes e agenda o envio ao
+    Supabase numa thread. Retorna False só se nem o arquivo local gravou
+    (nesse caso tenta o envio direto).
+    """
+    global _ARQUIVADOR
+    robo = _robo_base(nome_robo)
+    if not _guardar_pendentes(robo, [_linha(robo, r, tz) for r in registros]):
+        return arquivar_alertas(nome_robo, registros, tz, guardar_pendentes=False)
+    with _ARQUIVADOR_LOCK:
+        if _ARQUIVADOR is None or not _ARQUIVADOR.is_alive():
+            _ARQUIVADOR = threading.Thread(target=_laco_arquivador, name="historico-alertas", daemon=True)
+            _ARQUIVADOR.start()
+    _FILA_HISTORICO.put(nome_robo)
+    return True
+
+
+def drenar_historico(timeout: float = 10.0) -> bool:
+    """Espera a thread terminar os envios agendados (chamado no encerramento)."""
+    limite = time.monotonic() + timeout
+    while _FILA_HISTORICO.unfinished_tasks:
+        if time.monotonic() >= limite:
+            return False
+        time.sleep(0.05)
+    return True
+
+
+atexit.register(drenar_historico)
+
+
+# ==================================================
+# 🔎 Consultar (painel)
+# ==================================================
+def consultar_alertas(
+    nome_robo: str,
+    ticker: Optional[str] = None,
+    desde: Optional[datetime.datetime | str] = None,
+    ate: Optional[datetime.datetime | str] = None,
+    limite: int = 100,
+) -> list[dict]:
+    """
+    Alertas do robô, mais recentes primeiro, filtrando por ticker e
+    intervalo de datas (usa os índices robo/data e ticker/data).
+    """
+    sb = cliente_do_robo(nome_robo)
+    consulta = (
+        sb.table(TABELA_HISTORICO)
+        .select("ticker,operacao,preco_alvo,preco_atual,disparado_em,hora")
+        .eq("robo", _robo_base(nome_robo))
+    )
+    if ticker:
+        consulta = consulta.eq("ticker", ticker)
+    if desde:
+        consulta = consulta.gte("disparado_em", desde.isoformat() if hasattr(desde, "isoformat") else desde)
+    if ate:
+        consulta = consulta.lt("disparado_em", ate.isoformat() if hasattr(ate, "isoformat") else ate)
+    res = consulta.order("disparado_em", desc=True).limit(limite).execute()
+    return res.data or []
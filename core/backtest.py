@@ -0,0 +1,255 @@
+# core/backtest.py
+"""
+🧪 Backtest offline da regra de tempo na zona.
+Reproduz, de forma vetorizada (pandas/NumPy), o que `RobotEngine` faria com
+barras intradiárias: amostra os preços no intervalo do robô, respeita o
+horário do pregão e a limpeza diária, soma o tempo na zona com a mesma
+regra do motor e devolve cada disparo simulado com horário.
+
+Uso:
+    python -m core.backtest --robo curto --barras barras.csv --ativos ativos.json
+    python -m core.backtest --robo loss_clube --barras barras.parquet \
+        --intervalos 60,300 --tempos 120,600,1500
+"""
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import importlib
+import json
+import sys
+
+import numpy as np
+import pandas as pd
+
+from core.engine import ConfigRobo
+from core.prices import ticker_yahoo
+
+
+# ==================================================
+# 📥 Barras
+# ==================================================
+def carregar_barras(caminho: str | None = None, tickers: list[str] | None = None, provedor=None,
+                    periodo: str = "5d", intervalo: str = "1m") -> pd.DataFrame:
+    """
+    Barras no formato longo (`ticker`, `timestamp` UTC, `close`), lidas de um
+    CSV/Parquet ou do `historico()` de um provedor (Ticker.history no Yahoo).
+    """
+    if caminho:
+        barras = pd.read_parquet(caminho) if str(caminho).endswith(".parquet") else pd.read_csv(caminho)
+        barras = barras.rename(columns={"preco": "close", "symbol": "ticker", "date": "timestamp"})
+    else:
+        if provedor is None:
+            from core.providers import criar_provedor
+            provedor = criar_provedor()
+        partes = []
+        for t in tickers or []:
+            hist = provedor.historico(ticker_yahoo(t), periodo=periodo, intervalo=intervalo)
+            if hist.empty:
+                print(f"⚠️ Sem histórico para {t}.", file=sys.stderr)
+                continue
+            partes.append(pd.DataFrame({"ticker": ticker_yahoo(t), "timestamp": hist.index, "close": hist["close"].to_numpy()}))
+        barras = pd.concat(partes, ignore_index=True) if partes else pd.DataFrame(columns=["ticker", "timestamp", "close"])
+
+    barras = barras[["ticker", "timestamp", "close"]].copy()
+    barras["ticker"] = barras["ticker"].astype(str).map(ticker_yahoo)
+    barras["timestamp"] = pd.to_datetime(barras["timestamp"], utc=True)
+    barras["close"] = pd.to_numeric(barras["close"], errors="coerce")
+    return barras.sort_values("timestamp", kind="stable").reset_index(drop=True)
+
+
+def _precos_amostrados(barras: pd.DataFrame, tickers: list[str], cfg: ConfigRobo, intervalo: int):
+    """
+    Preço visto em cada verificação do robô (última barra até o instante),
+    só nos horários de pregão. Devolve (instantes locais, matriz T×N).
+    """
+    largo = barras.pivot_table(index="timestamp", columns="ticker", values="close", aggfunc="last")
+    largo = largo.reindex(columns=list(dict.fromkeys(tickers)))
+    if largo.empty:
+        return pd.DatetimeIndex([], tz=cfg.tz), np.empty((0, len(tickers)))
+
+    grade = pd.date_range(largo.index[0].ceil(f"{intervalo}s"), largo.index[-1], freq=f"{intervalo}s")
+    amostras = largo.reindex(grade, method="ffill")
+
+    locais = grade.tz_convert(cfg.tz)
+    horas = np.asarray(locais.time)
+    pregao = (horas >= cfg.inicio_pregao) & (horas <= cfg.fim_pregao)
+    return locais[pregao], amostras.loc[pregao, tickers].to_numpy(dtype=float)
+
+
+def _epoch(instantes: pd.DatetimeIndex) -> np.ndarray:
+    """Segundos desde a época (independe da resolução interna do índice)."""
+    return np.asarray((instantes - pd.Timestamp(0, tz="UTC")) / pd.Timedelta(seconds=1), dtype=float)
+
+
+# ==================================================
+# ⏱️ Tempo na zona (mesma regra de CarteiraColunar.avaliar)
+# ==================================================
+def _tempo_na_zona(instantes: pd.DatetimeIndex, precos: np.ndarray, ativos: list[dict], cfg: ConfigRobo):
+    """
+    Matrizes T×N (na_zona, tempo acumulado, grupo de contagem).
+    - Cotação inválida (NaN) é pulada, sem mexer na contagem.
+    - Só soma o intervalo desde a amostra anterior, quando a cotação válida
+      anterior também estava na zona: amostras sem cotação não contam.
+    - A contagem zera na virada do dia e, nos robôs de STOP, ao sair da zona.
+    """
+    estrategia = cfg.estrategia
+    alvos = np.array([float(a["preco"]) for a in ativos])
+    operacoes = np.array([a["operacao"] for a in ativos])
+    validos = ~np.isnan(precos)
+
+    na_zona = estrategia.zona(precos, alvos[None, :], (operacoes == "compra")[None, :])
+    na_zona &= validos & np.isin(operacoes, ["compra", "venda"])[None, :]
+
+    segundos = _epoch(instantes)
+    dias = _epoch(instantes.normalize())
+    tempos = np.broadcast_to(segundos[:, None], precos.shape)
+    dias_2d = np.broadcast_to(dias[:, None], precos.shape)
+
+    def anterior_valido(matriz: np.ndarray) -> np.ndarray:
+        # valor da cotação válida anterior (por coluna), NaN se não houver
+        m = pd.DataFrame(np.where(validos, matriz, np.nan)).ffill().shift(1)
+        return m.to_numpy(dtype=float)
+
+    zona_ant = anterior_valido(na_zona.astype(float)) == 1.0
+    dia_ant = anterior_valido(dias_2d)
+    # como o motor: a amostra sem cotação avança a última cotação na zona
+    tempo_ant = np.full(precos.shape, np.nan)
+    tempo_ant[1:] = tempos[:-1]
+
+    soma = na_zona & zona_ant & (dia_ant == dias_2d)
+    delta = np.where(soma, tempos - np.nan_to_num(tempo_ant), 0.0)
+
+    novo_dia = np.zeros(len(dias), dtype=bool)
+    novo_dia[:1] = True
+    novo_dia[1:] = dias[1:] != dias[:-1]
+    zera = np.broadcast_to(novo_dia[:, None], precos.shape).copy()
+    if estrategia.zera_ao_sair:
+        zera |= validos & ~na_zona
+
+    acumulado = np.cumsum(delta, axis=0)
+    base = pd.DataFrame(np.where(zera, acumulado, np.nan)).ffill().fillna(0.0).to_numpy()
+    grupos = np.cumsum(zera, axis=0)
+    return na_zona, acumulado - base, grupos
+
+
+def _disparos(instantes, precos, ativos, na_zona, tempo, grupos, tempo_maximo: float) -> pd.DataFrame:
+    """Primeiro disparo de cada ativo (o motor remove o ativo ao disparar)."""
+    atingiu = na_zona & (tempo >= tempo_maximo)
+    colunas = np.flatnonzero(atingiu.any(axis=0))
+    linhas = atingiu.argmax(axis=0)[colunas]
+
+    registros = []
+    for j, i in zip(colunas, linhas):
+        mesmo_grupo = (grupos[:, j] == grupos[i, j]) & na_zona[:, j]
+        entrada = int(np.argmax(mesmo_grupo))
+        registros.append({
+            "ticker": ativos[j]["ticker"],
+            "operacao": ativos[j]["operacao"],
+            "preco_alvo": float(ativos[j]["preco"]),
+            "entrada_zona": instantes[entrada],
+            "disparo": instantes[i],
+            "preco_atual": float(precos[i, j]),
+            "tempo_na_zona": float(tempo[i, j]),
+        })
+    colunas_saida = ["ticker", "operacao", "preco_alvo", "entrada_zona", "disparo", "preco_atual", "tempo_na_zona"]
+    disparos = pd.DataFrame(registros, columns=colunas_saida)
+    for coluna in ("entrada_zona", "disparo"):
+        disparos[coluna] = pd.to_datetime(disparos[coluna])
+    return disparos.sort_values("disparo", kind="stable").reset_index(drop=True)
+
+
+# ==================================================
+# 🚀 Simulação e varredura de parâmetros
+# ==================================================
+def simular(barras: pd.DataFrame, ativos: list[dict], cfg: ConfigRobo,
+            intervalo: int | None = None, tempo_maximo: float | None = None) -> pd.DataFrame:
+    """Todos os disparos simulados para a lista de ativos do robô."""
+    intervalo = intervalo or cfg.intervalo
+    tempo_maximo = cfg.tempo_maximo if tempo_maximo is None else tempo_maximo
+    tickers = [ticker_yahoo(a["ticker"]) for a in ativos]
+
+    instantes, precos = _precos_amostrados(barras, tickers, cfg, intervalo)
+    na_zona, tempo, grupos = _tempo_na_zona(instantes, precos, ativos, cfg)
+    return _disparos(instantes, precos, ativos, na_zona, tempo, grupos, tempo_maximo)
+
+
+def varrer_parametros(barras: pd.DataFrame, ativos: list[dict], cfg: ConfigRobo,
+                      intervalos: list[int], tempos_maximos: list[float]) -> pd.DataFrame:
+    """
+    Grade INTERVALO_VERIFICACAO × TEMPO_ACUMULADO_MAXIMO. O tempo na zona
+    não depende do limite, então é calculado uma vez por intervalo.
+    """
+    tickers = [ticker_yahoo(a["ticker"]) for a in ativos]
+    linhas = []
+    for intervalo in intervalos:
+        instantes, precos = _precos_amostrados(barras, tickers, cfg, intervalo)
+        na_zona, tempo, grupos = _tempo_na_zona(instantes, precos, ativos, cfg)
+        for tempo_maximo in tempos_maximos:
+            disparos = _disparos(instantes, precos, ativos, na_zona, tempo, grupos, tempo_maximo)
+            espera = (disparos["disparo"] - disparos["entrada_zona"]).dt.total_seconds()
+            linhas.append({
+                "intervalo": intervalo,
+                "tempo_maximo": tempo_maximo,
+                "disparos": len(disparos),
+                "espera_media": float(espera.mean()) if len(disparos) else np.nan,
+                "primeiro_disparo": disparos["disparo"].min() if len(disparos) else pd.NaT,
+            })
+    return pd.DataFrame(linhas)
+
+
+# ==================================================
+# 🖥️ Linha de comando
+# ==================================================
+def _lista(texto: str | None) -> list[int]:
+    return [int(x) for x in texto.split(",") if x.strip()] if texto else []
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Backtest da regra de tempo na zona dos robôs.")
+    parser.add_argument("--robo", required=True, help="curto, curtissimo, clube, loss_curto, ...")
+    parser.add_argument("--barras", help="CSV/Parquet com ticker, timestamp, close (padrão: histórico do provedor)")
+    parser.add_argument("--ativos", help="JSON com a lista de ativos (padrão: estado atual do robô)")
+    parser.add_argument("--periodo", default="5d", help="período do histórico quando não há --barras")
+    parser.add_argument("--intervalo", type=int, help="sobrescreve o intervalo do robô (s)")
+    parser.add_argument("--tempo-maximo", type=int, help="sobrescreve o tempo máximo na zona (s)")
+    parser.add_argument("--intervalos", help="varredura: lista de intervalos, ex. 60,300")
+    parser.add_argument("--tempos", help="varredura: lista de tempos máximos, ex. 120,600,1500")
+    parser.add_argument("--saida", help="grava o resultado em CSV")
+    args = parser.parse_args(argv)
+
+    cfg: ConfigRobo = importlib.import_module(f"services.robots.robot_{args.robo}").CONFIG
+    cfg = dataclasses.replace(
+        cfg,
+        intervalo=args.intervalo or cfg.intervalo,
+        tempo_maximo=cfg.tempo_maximo if args.tempo_maximo is None else args.tempo_maximo,
+    )
+
+    if args.ativos:
+        with open(args.ativos, encoding="utf-8") as f:
+            ativos = json.load(f)
+    else:
+        from core.state import carregar_estado_duravel
+        ativos = (carregar_estado_duravel(cfg.state_key) or {}).get("ativos", [])
+    if not ativos:
+        print("⚠️ Nenhum ativo para simular.", file=sys.stderr)
+        return
+
+    barras = carregar_barras(args.barras, [a["ticker"] for a in ativos], periodo=args.periodo)
+
+    if args.intervalos or args.tempos:
+        resultado = varrer_parametros(
+            barras, ativos, cfg,
+            _lista(args.intervalos) or [cfg.intervalo],
+            _lista(args.tempos) or [cfg.tempo_maximo],
+        )
+    else:
+        resultado = simular(barras, ativos, cfg)
+
+    if args.saida:
+        resultado.to_csv(args.saida, index=False)
+    print(resultado.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
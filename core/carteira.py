@@ -0,0 +1,162 @@
+# core/carteira.py
+"""
+📊 Carteira colunar.
+A lista `ativos` do estado vira um conjunto de vetores NumPy (alvo, lado da
+operação, tempo acumulado, em contagem, status, última cotação na zona).
+A regra de tempo na zona é avaliada para todos os tickers numa única
+passada por ciclo; os dicionários do estado só são atualizados nos tickers
+que mudaram.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+# ==================================================
+# 🏷️ Códigos de status
+# ==================================================
+SEM_STATUS = 0
+EM_CONTAGEM = 1
+FORA_DA_ZONA = 2
+DISPARADO = 3
+REMOVENDO = 4
+REMOVIDO = 5
+
+
+@dataclass
+class ResultadoAvaliacao:
+    """Índices (posições na carteira) de cada evento do ciclo."""
+    invalidos: np.ndarray
+    saidas: np.ndarray
+    entradas: np.ndarray
+    contando: np.ndarray
+    disparos: np.ndarray
+    duplicados: np.ndarray
+
+
+class CarteiraColunar:
+    def __init__(self, estado: dict, estrategia, ultima_na_zona: dict[str, float] | None = None):
+        self.estrategia = estrategia
+        self.origem = estado.get("ativos", [])  # a própria lista do estado (detecta troca)
+        self.ativos: list[dict] = list(self.origem)
+        self.tickers: list[str] = [a["ticker"] for a in self.ativos]
+        n = len(self.ativos)
+
+        self.alvos = np.fromiter((float(a["preco"]) for a in self.ativos), dtype=float, count=n)
+        operacoes = np.array([a["operacao"] for a in self.ativos], dtype=object)
+        self.compra = operacoes == "compra"
+        self.operacao_valida = self.compra | (operacoes == "venda")
+
+        tempo = estado.get("tempo_acumulado", {})
+        contagem = estado.get("em_contagem", {})
+        self.tempo = np.fromiter((float(tempo.get(t, 0) or 0) for t in self.tickers), dtype=float, count=n)
+        self.em_contagem = np.fromiter((bool(contagem.get(t, False)) for t in self.tickers), dtype=bool, count=n)
+
+        ultima = ultima_na_zona or {}
+        self.ultima_na_zona = np.fromiter((ultima.get(t, np.nan) for t in self.tickers), dtype=float, count=n)
+
+        # Textos de status ↔ códigos (textos desconhecidos ganham código próprio)
+        self.rotulos: list[str | None] = [
+            None,
+            estrategia.status_contagem,
+            getattr(estrategia, "status_fora", None),
+            estrategia.status_disparado,
+            "✅ Removendo...",
+            estrategia.status_removido,
+        ]
+        codigos = {r: i for i, r in enumerate(self.rotulos) if r is not None}
+        status = estado.get("status", {})
+        self.status = np.zeros(n, dtype=np.int16)
+        for i, t in enumerate(self.tickers):
+            s = status.get(t)
+            if s is None:
+                continue
+            if s not in codigos:
+                codigos[s] = len(self.rotulos)
+                self.rotulos.append(s)
+            self.status[i] = codigos[s]
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+    # ==================================================
+    # ⏱️ Uma passada da regra de tempo na zona
+    # ==================================================
+    def avaliar(self, precos: np.ndarray, instante: float | np.ndarray, tempo_maximo: float) -> ResultadoAvaliacao:
+        """
+        Mesma regra do motor, vetorizada (`instante`: um para todos os
+        tickers, ou um por ticker quando vêm de ticks do feed):
+        - preço inválido (≤ 0 ou NaN) não mexe na contagem, e o intervalo
+          até ele também não será somado (a última cotação na zona avança
+          até o instante dele);
+        - fora da zona esquece a última cotação na zona e, nos robôs de STOP,
+          zera a contagem;
+        - dentro da zona soma o intervalo real desde a cotação anterior na
+          zona (0 na entrada/reentrada).
+        """
+        precos = np.asarray(precos, dtype=float)
+        instante = np.broadcast_to(np.asarray(instante, dtype=float), precos.shape)
+        validos = precos > 0
+        with np.errstate(invalid="ignore"):
+            na_zona = validos & self.operacao_valida & self.estrategia.zona(precos, self.alvos, self.compra)
+        fora = validos & ~na_zona
+
+        # Ciclos sem cotação não viram tempo na zona na próxima cotação válida
+        # (instante NaN, ticker sem tick na rodada do feed, não avança nada)
+        sem_cotacao = ~validos & ~np.isnan(self.ultima_na_zona)
+        self.ultima_na_zona[sem_cotacao] = np.fmax(self.ultima_na_zona[sem_cotacao], instante[sem_cotacao])
+        self.ultima_na_zona[fora] = np.nan
+        saidas = fora & self.em_contagem if self.estrategia.zera_ao_sair else np.zeros_like(fora)
+        self.em_contagem[saidas] = False
+        self.tempo[saidas] = 0.0
+        self.status[saidas] = FORA_DA_ZONA
+
+        entradas = na_zona & ~self.em_contagem
+        contando = na_zona & self.em_contagem
+        decorrido = np.where(np.isnan(self.ultima_na_zona), 0.0, np.maximum(0.0, instante - self.ultima_na_zona))
+        self.tempo[contando] = np.round(self.tempo[contando] + decorrido[contando], 1)
+        self.tempo[entradas] = 0.0
+        self.em_contagem[entradas] = True
+        # Nunca volta no tempo (tick atrasado de um ticker não desfaz o que já foi contado)
+        self.ultima_na_zona[na_zona] = np.fmax(self.ultima_na_zona[na_zona], instante[na_zona])
+
+        ja_disparado = np.isin(self.status, (DISPARADO, REMOVENDO, REMOVIDO))
+        self.status[na_zona] = EM_CONTAGEM
+        atingiu = na_zona & (self.tempo >= tempo_maximo)
+
+        return ResultadoAvaliacao(
+            invalidos=np.flatnonzero(~validos),
+            saidas=np.flatnonzero(saidas),
+            entradas=np.flatnonzero(entradas),
+            contando=np.flatnonzero(contando),
+            disparos=np.flatnonzero(atingiu & ~ja_disparado),
+            duplicados=np.flatnonzero(atingiu & ja_disparado),
+        )
+
+    # ==================================================
+    # 💾 Volta para os dicionários do estado
+    # ==================================================
+    def exportar(self, estado: dict, indices: np.ndarray) -> None:
+        """Grava no estado só os tickers em `indices`."""
+        tempo = estado.setdefault("tempo_acumulado", {})
+        contagem = estado.setdefault("em_contagem", {})
+        status = estado.setdefault("status", {})
+        for i in indices.tolist():
+            t = self.tickers[i]
+            tempo[t] = float(self.tempo[i])
+            contagem[t] = bool(self.em_contagem[i])
+            rotulo = self.rotulos[self.status[i]]
+            if rotulo is not None:
+                status[t] = rotulo
+
+    def esquecer_ultimas_na_zona(self) -> None:
+        """A próxima cotação na zona de cada ticker não soma tempo (relógio trocado)."""
+        self.ultima_na_zona[:] = np.nan
+
+    def ultimas_na_zona(self) -> dict[str, float]:
+        """Instante da última cotação na zona por ticker (para reconstruir a carteira)."""
+        return {
+            t: float(u) for t, u in zip(self.tickers, self.ultima_na_zona.tolist())
+            if not np.isnan(u)
+        }
@@ -19,11 +19,34 @@ HORARIO_FIM_PREGAO = os.getenv("HORARIO_FIM_PREGAO", "21:00")
 EMAIL_SENDER = os.getenv("EMAIL_SENDER")
 GMAIL_APP_PASSWORD = os.getenv("GMAIL_APP_PASSWORD")
 
+# Servidor SMTP (padrão Gmail; aponte para um servidor local em testes)
+SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "1") not in ("0", "false", "False")
+
+# Segundos sem uso até a conexão SMTP ser fechada
+SMTP_IDLE_TIMEOUT = int(os.getenv("SMTP_IDLE_TIMEOUT", "120"))
+
+# Conexões SMTP simultâneas mantidas abertas
+SMTP_POOL_SIZE = int(os.getenv("SMTP_POOL_SIZE", "2"))
+
 # ================================
 # 💬 TELEGRAM
 # ================================
 TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN")
 
+# URL base da Bot API (aponte para um servidor local em testes/benchmarks)
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "https://api.telegram.org/bot")
+
+# ================================
+# 📬 FILA DE ALERTAS
+# ================================
+# Quantidade máxima de envios pendentes por canal (excedentes são descartados)
+ALERT_QUEUE_SIZE = int(os.getenv("ALERT_QUEUE_SIZE", "100"))
+
+# Tentativas por canal antes de desistir de um envio
+ALERT_RETRIES = int(os.getenv("ALERT_RETRIES", "3"))
+
 # ================================
 # 🤖 ROBÔS CONFIGURADOS
 # ================================
@@ -74,3 +97,78 @@ INTERVALO_VERIFICACAO = 60  # 1 minuto
 
 # Tempo total que o ativo deve permanecer na zona de preço antes do alerta
 TEMPO_ACUMULADO_MAXIMO = 300  # 5 minutos
+
+# ================================
+# ⚡ CACHE DE COTAÇÕES
+# ================================
+# Validade de uma cotação no cache (em segundos)
+PRICE_CACHE_TTL = int(os.getenv("PRICE_CACHE_TTL", "30"))
+
+# Quantidade máxima de tickers no cache (os menos usados saem primeiro)
+PRICE_CACHE_MAX = int(os.getenv("PRICE_CACHE_MAX", "500"))
+
+# Buscas individuais simultâneas (tickers que o lote não resolveu)
+PRICE_FETCH_WORKERS = int(os.getenv("PRICE_FETCH_WORKERS", "8"))
+
+# Orçamento total (em segundos) para buscar as cotações de um ciclo, retries incluídos
+PRICE_FETCH_DEADLINE = float(os.getenv("PRICE_FETCH_DEADLINE", "20"))
+
+# Rodadas de tentativa por busca (dentro do orçamento)
+PRICE_RETRY_ATTEMPTS = int(os.getenv("PRICE_RETRY_ATTEMPTS", "3"))
+
+# Disjuntor por fonte: falhas seguidas para abrir e segundos aberto
+PRICE_BREAKER_FAILURES = int(os.getenv("PRICE_BREAKER_FAILURES", "3"))
+PRICE_BREAKER_COOLDOWN = float(os.getenv("PRICE_BREAKER_COOLDOWN", "60"))
+
+# Arquivo SQLite compartilhado entre os processos dos robôs (vazio = cache só em memória).
+# Só faz sentido com os robôs em processos separados na mesma máquina (robots_master);
+# no robots_runtime (render.yaml) o cache em memória já é compartilhado e ele fica vazio.
+PRICE_CACHE_PATH = os.getenv("PRICE_CACHE_PATH", "")
+
+# ================================
+# 💾 GRAVAÇÃO DO ESTADO (WRITE-BEHIND)
+# ================================
+# Segundos juntando gravações do estado antes de enviá-las ao Supabase (0 = grava na hora)
+STATE_WRITE_BEHIND = float(os.getenv("STATE_WRITE_BEHIND", "2"))
+
+# Pasta do diário local das gravações ainda não enviadas (reaplicado na próxima carga)
+STATE_JOURNAL_DIR = os.getenv("STATE_JOURNAL_DIR", "logs/estado_pendente")
+
+# ================================
+# 🗃️ HISTÓRICO DE ALERTAS
+# ================================
+# Quantos alertas recentes ficam no estado do robô (o resto vai para a tabela alertas_historico)
+HISTORICO_RECENTE_MAX = max(1, int(os.getenv("HISTORICO_RECENTE_MAX", "20")))
+
+# Pasta dos alertas que não chegaram ao Supabase (reenviados na próxima gravação)
+ALERT_HISTORY_SPOOL = os.getenv("ALERT_HISTORY_SPOOL", "logs/alertas_pendentes")
+
+# ================================
+# 📝 LOGS
+# ================================
+# json (uma linha JSON por evento) ou texto ([HH:MM:SS] [ROBO] ícone mensagem)
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").strip().lower()
+
+# DEBUG, INFO, WARNING, ERROR
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").strip().upper()
+
+# Linhas por ticker ("preço atual", tempo acumulado) só a cada N ciclos (1 = todo ciclo)
+LOG_AMOSTRAGEM = max(1, int(os.getenv("LOG_AMOSTRAGEM", "5")))
+
+# ================================
+# 📈 MÉTRICAS
+# ================================
+# Porta do endpoint /metrics (formato Prometheus); 0 = desligado
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+
+# ================================
+# 📡 FEED DE COTAÇÕES (STREAMING)
+# ================================
+# Vazio = polling (um lote por ciclo); ws://… ou wss://… = websocket; http(s)://… = long-poll
+MARKET_FEED_URL = os.getenv("MARKET_FEED_URL", "").strip()
+
+# Segundos para juntar ticks antes de avaliá-los (entre os ciclos do robô)
+MARKET_FEED_JANELA = float(os.getenv("MARKET_FEED_JANELA", "1"))
+
+# Ticks pendentes por robô (os mais antigos saem primeiro)
+MARKET_FEED_FILA_MAX = int(os.getenv("MARKET_FEED_FILA_MAX", "100000"))
@@ -0,0 +1,658 @@
+# core/engine.py
+# -*- coding: utf-8 -*-
+"""
+🤖 Motor comum dos robôs.
+O laço de monitoramento (sincroniza estado → busca cotações → conta tempo
+na zona → dispara alerta → remove ativo) é o mesmo nos 6 robôs; o que muda
+é a configuração (`ConfigRobo`) e a estratégia (alvo de entrada ou stop).
+"""
+from __future__ import annotations
+
+import datetime
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from core.state import (
+    carregar_estado_duravel, carregar_estado_se_alterado, salvar_estado_duravel, apagar_estado_duravel,
+    instalar_descarga_no_sigterm,
+)
+from core.prices import CotacoesCiclo, ticker_yahoo
+from core.carteira import CarteiraColunar
+from core.providers import ProvedorCotacoes, criar_provedor
+from core.feed import FeedCotacoes, ProvedorFeed, Tick, feed_compartilhado
+from core.notifications import enfileirar_alerta
+from core.alert_history import arquivar_alertas, arquivar_em_segundo_plano
+from core.config import HISTORICO_RECENTE_MAX, MARKET_FEED_JANELA
+from core.logger import log, amostrar, robo_atual, ciclo_atual
+from core.schedule import Agendador
+from core.metrics import CICLO_SEGUNDOS, CICLO_ATRASOS, TICKERS, servir_metricas
+
+# ==================================================
+# 🚫 DESATIVAR LOGS DE HTTP E SUPABASE
+# ==================================================
+logging.getLogger("httpx").setLevel(logging.WARNING)
+logging.getLogger("supabase").setLevel(logging.WARNING)
+logging.getLogger("websockets").setLevel(logging.WARNING)
+
+
+# Encerramento do runtime (SIGTERM): as esperas entre ciclos terminam em até PASSO_ESPERA s
+ENCERRAR = threading.Event()
+PASSO_ESPERA = 5.0
+
+
+def formatar_duracao(segundos) -> str:
+    return str(datetime.timedelta(seconds=int(segundos)))
+
+
+# ==================================================
+# 🎯 ESTRATÉGIAS
+# ==================================================
+class EstrategiaAlvo:
+    """Entrada: dispara quando o preço atinge o alvo (compra ≥ alvo, venda ≤ alvo)."""
+
+    rotulo_monitor = ""
+    exibe_precos = True
+    zera_ao_sair = False
+    status_contagem = "🟡 Em contagem"
+    status_disparado = "🚀 Disparado"
+    status_removido = "✅ Ativado (removido)"
+    msg_duplicado = "já foi disparado ou está sendo removido. Ignorando duplicação."
+    msg_persistido = "removido completamente e persistido."
+
+    def condicao(self, operacao: str, preco_atual: float, preco_alvo: float) -> bool:
+        return (
+            (operacao == "compra" and preco_atual >= preco_alvo)
+            or (operacao == "venda" and preco_atual <= preco_alvo)
+        )
+
+    def zona(self, precos: np.ndarray, alvos: np.ndarray, compra: np.ndarray) -> np.ndarray:
+        """Versão vetorizada de `condicao` (compra: True p/ compra, False p/ venda)."""
+        return np.where(compra, precos >= alvos, precos <= alvos)
+
+    def msg_entrada_zona(self, ticker: str, preco_alvo: float) -> str:
+        return f"{ticker} atingiu o alvo ({preco_alvo:.2f}). Iniciando contagem..."
+
+    def operacao_assunto(self, operacao: str) -> str:
+        return "VENDA A DESCOBERTO" if operacao == "venda" else "COMPRA"
+
+    def mensagens(self, ticker: str, operacao: str, preco_alvo: float, preco_atual: float) -> tuple[str, str]:
+        """Retorna (html do e-mail, texto do Telegram)."""
+        msg_op = self.operacao_assunto(operacao)
+        ticker_symbol_sem_ext = ticker.replace(".SA", "")
+
+        msg_tg = f"""
+💥 <b>ALERTA DE {msg_op.upper()} ATIVADA!</b>\n\n
+<b>Ticker:</b> {ticker_symbol_sem_ext}\n
+<b>Preço alvo:</b> R$ {preco_alvo:.2f}\n
+<b>Preço atual:</b> R$ {preco_atual:.2f}\n\n
+📊 <a href='https://br.tradingview.com/symbols/{ticker_symbol_sem_ext}'>Abrir gráfico no TradingView</a>\n\n
+───────────────\n
+<i><b>COMPLIANCE:</b> mensagem baseada em nossa carteira e não constitui recomendação formal. A decisão de compra ou venda é exclusiva do destinatário. Conteúdo confidencial, uso restrito ao destinatário autorizado. © 1milhão Invest.</i>\n
+───────────────\n
+🤖 Robot 1milhão Invest
+""".strip()
+
+        msg_html = f"""
+<html>
+  <body style="font-family:Arial,sans-serif; background-color:#0b1220; color:#e5e7eb; padding:20px;">
+    <h2 style="color:#3b82f6;">💥 ALERTA DE {msg_op.upper()} ATIVADA!</h2>
+    <p><b>Ticker:</b> {ticker_symbol_sem_ext}</p>
+    <p><b>Preço alvo:</b> R$ {preco_alvo:.2f}</p>
+    <p><b>Preço atual:</b> R$ {preco_atual:.2f}</p>
+    <p>📊 <a href="https://br.tradingview.com/symbols/{ticker_symbol_sem_ext}" style="color:#60a5fa;">Ver gráfico no TradingView</a></p>
+    <hr style="border:1px solid #3b82f6; margin:20px 0;">
+    <p style="font-size:11px; line-height:1.5; color:#9ca3af;">
+      <b>COMPLIANCE:</b> Esta mensagem é uma sugestão de compra/venda baseada em nossa CARTEIRA.<br>
+      A compra ou venda é de total decisão e responsabilidade do Destinatário.<br>
+      Esta informação é <b>CONFIDENCIAL</b>, de propriedade de 1milhao Invest e de seu DESTINATÁRIO tão somente.<br>
+      Se você <b>NÃO</b> for DESTINATÁRIO ou pessoa autorizada a recebê-lo, <b>NÃO PODE</b> usar, copiar, transmitir, retransmitir
+      ou divulgar seu conteúdo (no todo ou em partes), estando sujeito às penalidades da LEI.<br>
+      A Lista de Ações do 1milhao Invest é devidamente <b>REGISTRADA.</b>
+    </p>
+    <p style="margin-top:10px;">🤖 Robot 1milhão Invest</p>
+  </body>
+</html>
+""".strip()
+
+        return msg_html, msg_tg
+
+
+class EstrategiaStop(EstrategiaAlvo):
+    """Encerramento (LOSS): zona inversa (compra ≤ stop, venda ≥ stop)."""
+
+    rotulo_monitor = " (LOSS)"
+    exibe_precos = False
+    zera_ao_sair = True
+    status_contagem = "🟡 Em contagem (STOP)"
+    status_disparado = "🚀 Encerrado"
+    status_removido = "✅ Encerrado (removido)"
+    status_fora = "🔴 Fora do STOP"
+    msg_duplicado = "já foi encerrado. Ignorando duplicação."
+    msg_persistido = "encerrado completamente e persistido."
+
+    def condicao(self, operacao: str, preco_atual: float, preco_alvo: float) -> bool:
+        return (
+            (operacao == "compra" and preco_atual <= preco_alvo)
+            or (operacao == "venda" and preco_atual >= preco_alvo)
+        )
+
+    def zona(self, precos: np.ndarray, alvos: np.ndarray, compra: np.ndarray) -> np.ndarray:
+        return np.where(compra, precos <= alvos, precos >= alvos)
+
+    def msg_entrada_zona(self, ticker: str, preco_alvo: float) -> str:
+        return f"{ticker} entrou na zona de STOP ({preco_alvo:.2f}). Iniciando contagem..."
+
+    def operacao_assunto(self, operacao: str) -> str:
+        return ""
+
+    def mensagens(self, ticker: str, operacao: str, preco_alvo: float, preco_atual: float) -> tuple[str, str]:
+        msg_operacao_anterior = "COMPRA" if operacao == "compra" else "VENDA A DESCOBERTO"
+        msg_op_encerrar = "VENDA" if operacao == "compra" else "COMPRA"
+        ticker_sem_ext = ticker.replace(".SA", "")
+
+        msg_html = f"""
+<html>
+  <body style="font-family:Arial,sans-serif; background-color:#0b1220; color:#e5e7eb; padding:20px;">
+    <h2 style="color:#ef4444;">🛑 ENCERRAMENTO (STOP) ATIVADO!</h2>
+    <p><b>Ticker:</b> {ticker_sem_ext}</p>
+    <p><b>Operação anterior:</b> {msg_operacao_anterior}</p>
+    <p><b>Realize a Operação de:</b> {msg_op_encerrar}</p>
+    <p><b>STOP (alvo):</b> R$ {preco_alvo:.2f}</p>
+    <p><b>Preço atual:</b> R$ {preco_atual:.2f}</p>
+    <p>📊 <a href="https://br.tradingview.com/symbols/{ticker_sem_ext}" style="color:#60a5fa;">Ver gráfico no TradingView</a></p>
+    <hr style="border:1px solid #3b82f6; margin:20px 0;">
+    <p style="font-size:11px; line-height:1.5; color:#9ca3af;">
+      <b>COMPLIANCE:</b> mensagem de encerramento baseada em nossa carteira e não constitui recomendação.<br>
+      A decisão é exclusiva do destinatário. Conteúdo confidencial e de uso restrito.<br>
+      © 1milhão Invest — Todos os direitos reservados.
+    </p>
+    <p style="margin-top:10px;">🤖 Robot 1milhão Invest</p>
+  </body>
+</html>
+""".strip()
+
+        msg_tg = f"""
+🛑 <b>ENCERRAMENTO (STOP) ATIVADO!</b>\n
+<b>Ticker:</b> {ticker_sem_ext}\n
+<b>Operação anterior:</b> {msg_operacao_anterior}\n
+<b>Realize a Operação de:</b> {msg_op_encerrar}\n
+<b>STOP (alvo):</b> R$ {preco_alvo:.2f}\n
+<b>Preço atual:</b> R$ {preco_atual:.2f}\n
+📊 <a href='https://br.tradingview.com/symbols/{ticker_sem_ext}'>Abrir gráfico no TradingView</a>\n
+───────────────\n
+<i><b>COMPLIANCE:</b> mensagem de encerramento baseada em nossa carteira e não constitui recomendação. Decisão exclusiva do destinatário. Conteúdo confidencial e de uso restrito. © 1milhão Invest.</i>\n
+───────────────\n
+🤖 Robot 1milhão Invest
+""".strip()
+
+        return msg_html, msg_tg
+
+
+# ==================================================
+# ⚙️ CONFIGURAÇÃO POR ROBÔ
+# ==================================================
+@dataclass
+class ConfigRobo:
+    nome: str                        # chave em core.config.ROBOTS (e-mail/Telegram)
+    state_key: str                   # registro no Supabase ('<robo>_przo_v1')
+    rotulo: str                      # nome exibido nos logs
+    estrategia: EstrategiaAlvo
+    assunto_alerta: str              # aceita {ticker} e {operacao}
+    abertura_html: str
+    abertura_tg: str
+    intervalo: int = 60              # segundos entre verificações
+    tempo_maximo: int = 120          # segundos na zona antes do alerta
+    inicio_pregao: datetime.time = datetime.time(3, 0, 0)
+    fim_pregao: datetime.time = datetime.time(23, 59, 0)
+    tz: ZoneInfo = field(default_factory=lambda: ZoneInfo("Europe/Lisbon"))
+
+
+# ==================================================
+# 🔁 MOTOR
+# ==================================================
+class RobotEngine:
+    """
+    Executa o monitoramento de um robô. `executar_ciclo()` roda uma única
+    iteração e devolve quantos segundos esperar; `run()` é o laço infinito.
+    As dependências de rede (estado, alertas, provedor de cotações, feed)
+    podem ser trocadas (testes e benchmarks). Com um feed conectado, as
+    cotações do ciclo vêm dele e `aguardar()` avalia os ticks entre ciclos.
+    """
+
+    def __init__(
+        self,
+        config: ConfigRobo,
+        carregar=carregar_estado_duravel,
+        carregar_se_alterado=carregar_estado_se_alterado,
+        salvar=salvar_estado_duravel,
+        apagar=apagar_estado_duravel,
+        alertar=enfileirar_alerta,
+        arquivar=arquivar_alertas,
+        arquivar_no_disparo=arquivar_em_segundo_plano,
+        provedor: ProvedorCotacoes | None = None,
+        feed: FeedCotacoes | None = None,
+    ):
+        self.cfg = config
+        self.estrategia = config.estrategia
+        self.estado: dict = {}
+        self._carregar = carregar
+        self._carregar_se_alterado = carregar_se_alterado
+        self._salvar = salvar
+        self._apagar = apagar
+        self._alertar = alertar
+        self._arquivar = arquivar
+        self._arquivar_no_disparo = arquivar_no_disparo
+        self.provedor = provedor or criar_provedor()
+        self.feed = feed if feed is not None else feed_compartilhado()
+        self.agendador = Agendador(config.intervalo)
+        self._inicio_ciclo = time.perf_counter()
+        # True quando o estado quente já cabe na janela de alertas recentes
+        self._historico_arquivado = False
+        # Carteira colunar (reconstruída quando a lista de ativos muda)
+        self._carteira: CarteiraColunar | None = None
+        # Posição de cada símbolo na carteira (para os ticks do feed)
+        self._posicoes: tuple[CarteiraColunar | None, dict[str, int]] = (None, {})
+        # De onde vieram as últimas cotações avaliadas ("feed" ou "polling")
+        self._relogio_cotacoes: str | None = None
+
+    # ==================================================
+    # 🕒 TEMPO
+    # ==================================================
+    def agora(self) -> datetime.datetime:
+        return datetime.datetime.now(self.cfg.tz)
+
+    def dentro_pregao(self, dt: datetime.datetime) -> bool:
+        return self.cfg.inicio_pregao <= dt.time() <= self.cfg.fim_pregao
+
+    def segundos_ate_abertura(self, dt: datetime.datetime):
+        abre = dt.replace(hour=self.cfg.inicio_pregao.hour, minute=self.cfg.inicio_pregao.minute, second=0, microsecond=0)
+        fecha = dt.replace(hour=self.cfg.fim_pregao.hour, minute=self.cfg.fim_pregao.minute, second=0, microsecond=0)
+        if dt < abre:
+            return int((abre - dt).total_seconds()), abre
+        elif dt > fecha:
+            prox = abre + datetime.timedelta(days=1)
+            return int((prox - dt).total_seconds()), prox
+        else:
+            return 0, abre
+
+    # ==================================================
+    # 🚀 INICIALIZAÇÃO
+    # ==================================================
+    def iniciar(self) -> bool:
+        """Carrega o estado remoto. Retorna False se o Supabase não respondeu."""
+        estado = self._carregar(self.cfg.state_key)
+        if not estado:
+            return False
+        self.estado = estado if isinstance(estado, dict) else {}
+        self.estado.setdefault("ativos", [])
+        self.estado.setdefault("tempo_acumulado", {})
+        self.estado.setdefault("em_contagem", {})
+        self.estado.setdefault("status", {})
+        self.estado.setdefault("historico_alertas", [])
+        self.estado.setdefault("ultima_data_abertura_enviada", None)
+        self._historico_arquivado = self._aparar_historico()
+        log(f"{len(self.estado['ativos'])} ativos carregados.", "📦")
+        log("=" * 60, "—")
+        return True
+
+    def _aparar_historico(self) -> bool:
+        """
+        Leva para a tabela de histórico os alertas que passam da janela do
+        estado quente (HISTORICO_RECENTE_MAX). Só apara se a gravação deu certo.
+        """
+        historico = self.estado["historico_alertas"]
+        excedente = len(historico) - HISTORICO_RECENTE_MAX
+        if excedente <= 0:
+            return True
+        if not self._arquivar(self.cfg.nome, historico[:excedente], self.cfg.tz, guardar_pendentes=False):
+            return False
+        self.estado["historico_alertas"] = historico[excedente:]
+        log(f"{excedente} alerta(s) antigos movidos para o histórico.", "🗃️")
+        return True
+
+    # ==================================================
+    # 🔄 RECARREGAR ESTADO DO SUPABASE
+    # ==================================================
+    def sincronizar(self) -> None:
+        """Incorpora tickers adicionados/removidos no painel (só se a linha mudou)."""
+        estado = self.estado
+        try:
+            alterado, remoto = self._carregar_se_alterado(self.cfg.state_key)
+            if not alterado:
+                return
+            if not isinstance(remoto, dict):
+                log("Aviso: resposta do Supabase inválida ao tentar recarregar estado.", "⚠️")
+                return
+
+            ativos_removidos = self._removidos()
+            estado["ativos"] = self._ativos_da_nuvem(remoto.get("ativos", []))
+            if ativos_removidos:
+                log(f"Ignorando {len(ativos_removidos)} ativo(s) removido(s): {', '.join(ativos_removidos)}", "🧹")
+
+            atuais = {a["ticker"] for a in estado["ativos"] if "ticker" in a}
+            for campo in ("tempo_acumulado", "em_contagem", "status"):
+                local = estado.get(campo, {})
+                nuvem = remoto.get(campo) or {}
+                novo = {}
+                for t in atuais:
+                    if t in local:
+                        novo[t] = local[t]
+                    elif t in nuvem:
+                        novo[t] = nuvem[t]
+                estado[campo] = novo
+
+            log(f"Estado sincronizado com Supabase ({len(estado['ativos'])} ativos).", "🔁")
+        except Exception as e:
+            log(f"Erro ao recarregar estado do Supabase: {e}", "⚠️")
+
+    def _removidos(self) -> set[str]:
+        """Tickers que o robô já disparou/removeu (a nuvem pode ainda tê-los)."""
+        return {
+            t for t, s in self.estado.get("status", {}).items()
+            if "Removido" in s or "Removendo" in s
+        }
+
+    def _ativos_da_nuvem(self, ativos: list[dict]) -> list[dict]:
+        """Lista de ativos da nuvem (quem manda nela é o painel), sem os já removidos."""
+        removidos = self._removidos()
+        return [a for a in ativos if a.get("ticker") not in removidos]
+
+    # ==================================================
+    # 🔁 CICLO
+    # ==================================================
+    def executar_ciclo(self, now: datetime.datetime | None = None) -> float:
+        """Roda uma iteração completa e devolve os segundos até o próximo prazo."""
+        self.agendador.inicio()
+        self._inicio_ciclo = time.perf_counter()
+        ciclo_atual.set(self.agendador.ciclos + 1)
+        now = now or self.agora()
+        self.sincronizar()
+        TICKERS.set(len(self.estado.get("ativos", [])), robo=self.cfg.nome)
+
+        if not self.dentro_pregao(now):
+            segundos, abre = self.segundos_ate_abertura(now)
+            log(f"🌙 Fora do pregão. Próxima abertura em {formatar_duracao(segundos)} (às {abre.time()}).", "⏸️")
+            return self._proxima_espera()
+
+        estado = self.estado
+        self.abertura_diaria(now)
+
+        log(f"Monitorando {len(estado['ativos'])} ativos{self.estrategia.rotulo_monitor}...", "🟢")
+
+        # Uma única busca por ciclo: o log e a verificação leem a mesma fotografia
+        tickers = [a["ticker"] for a in estado["ativos"]]
+        if self.feed is not None:
+            self.feed.assinar(self.cfg.nome, tickers)
+        if self.feed is not None and self.feed.conectado:
+            # Ticks ainda não avaliados e, depois, o último preço de cada ticker no relógio do feed
+            self._usar_relogio("feed")
+            self.processar_ticks(self.feed.coletar(self.cfg.nome), now)
+            cotacoes = CotacoesCiclo(tickers, ProvedorFeed(self.feed))
+        else:
+            if self.feed is not None:
+                self.feed.coletar(self.cfg.nome)  # feed fora: o ciclo segue por polling
+            self._usar_relogio("polling")
+            cotacoes = CotacoesCiclo(tickers, self.provedor)
+
+        # Linhas por ticker só a cada LOG_AMOSTRAGEM ciclos
+        if self.estrategia.exibe_precos and estado["ativos"] and amostrar("precos"):
+            for ativo in estado["ativos"]:
+                ticker = ativo["ticker"]
+                preco_atual = cotacoes.preco(ticker)
+                if preco_atual > 0:
+                    log(f"{ticker} — preço atual: R$ {preco_atual:.2f}", "💬", ticker=ticker, preco=preco_atual)
+                else:
+                    log(f"{ticker} — sem cotação neste ciclo", "💬", ticker=ticker)
+
+        self.verificar_ativos(cotacoes, now)
+
+        self._salvar(self.cfg.state_key, estado)
+        log("Estado salvo.", "💾")
+        return self._proxima_espera()
+
+    def _proxima_espera(self) -> float:
+        CICLO_SEGUNDOS.observar(time.perf_counter() - self._inicio_ciclo, robo=self.cfg.nome)
+        espera = self.agendador.espera()
+        if self.agendador.ultimo_atraso:
+            CICLO_ATRASOS.inc(robo=self.cfg.nome)
+            log(
+                f"Ciclo passou do intervalo em {self.agendador.ultimo_atraso:.1f}s "
+                f"({self.agendador.atrasos} atraso(s) em {self.agendador.ciclos} ciclos).",
+                "⏱️",
+            )
+        return espera
+
+    def abertura_diaria(self, now: datetime.datetime) -> None:
+        """Envia a mensagem de abertura e zera as contagens uma vez por dia."""
+        estado = self.estado
+        data_hoje = str(now.date())
+        if str(estado.get("ultima_data_abertura_enviada", "")) == data_hoje:
+            return
+
+        self._alertar(self.cfg.nome, "📣 Pregão Aberto", self.cfg.abertura_html, self.cfg.abertura_tg)
+        estado["ultima_data_abertura_enviada"] = data_hoje
+        log("🧹 Limpando contagens do dia anterior (novo pregão iniciado)...", "🔁")
+        estado["tempo_acumulado"].clear()
+        estado["em_contagem"].clear()
+        estado["status"].clear()
+        self._carteira = None
+        self._salvar(self.cfg.state_key, estado)
+        log("Contagens zeradas com sucesso para o novo pregão.", "✅")
+
+    # ==================================================
+    # 🔍 Verificação dos ativos (uma passada vetorizada)
+    # ==================================================
+    def carteira(self) -> CarteiraColunar:
+        """Carteira colunar do estado atual; só é remontada se `ativos` mudou."""
+        c = self._carteira
+        if c is None or c.origem is not self.estado["ativos"]:
+            ultimas = c.ultimas_na_zona() if c is not None else {}
+            c = self._carteira = CarteiraColunar(self.estado, self.estrategia, ultimas)
+        return c
+
+    def verificar_ativos(self, cotacoes: CotacoesCiclo, now: datetime.datetime) -> None:
+        """
+        Avalia todos os ativos com as cotações do ciclo. O tempo na zona soma
+        o intervalo real entre cotações dentro da zona (o instante de cada
+        cotação, `cotacoes.instantes`), e não o intervalo nominal do robô.
+        """
+        carteira = self.carteira()
+        if not len(carteira):
+            return
+        tickers = carteira.tickers
+        self._avaliar(carteira, cotacoes.vetor(tickers), cotacoes.instantes(tickers), now)
+
+    def processar_ticks(self, ticks: list[Tick], now: datetime.datetime) -> None:
+        """
+        Avalia ticks do feed na ordem de chegada; o tempo na zona avança pelo
+        instante de cada tick. Um ticker com vários ticks no lote é avaliado
+        em rodadas (k-ésimo tick de cada ticker na rodada k), para uma saída
+        rápida da zona não se perder.
+        """
+        restantes = ticks
+        while restantes:
+            carteira = self.carteira()
+            if not len(carteira):
+                return
+            posicoes = self._posicoes_feed(carteira)
+            vistos: set[int] = set()
+            precos = np.full(len(carteira), np.nan)
+            instantes = np.full(len(carteira), np.nan)
+            adiados = []
+            for tick in restantes:
+                i = posicoes.get(tick.ticker)
+                if i is None:
+                    continue
+                if i in vistos:
+                    adiados.append(tick)
+                    continue
+                vistos.add(i)
+                precos[i] = tick.preco
+                instantes[i] = tick.instante
+            if vistos:
+                self._avaliar(carteira, precos, instantes, now, avisar_invalidos=False)
+            restantes = adiados
+
+    def _usar_relogio(self, relogio: str) -> None:
+        """
+        O instante dos ticks do feed (no replay, o gravado) e o do polling
+        (relógio da máquina) não se comparam: ao trocar de um para o outro,
+        o intervalo até a última cotação na zona não é somado.
+        """
+        if self._relogio_cotacoes not in (None, relogio) and self._carteira is not None:
+            self._carteira.esquecer_ultimas_na_zona()
+            log(f"Cotações agora por {relogio}: tempo na zona segue a partir da próxima cotação.", "🔁")
+        self._relogio_cotacoes = relogio
+
+    def _posicoes_feed(self, carteira: CarteiraColunar) -> dict[str, int]:
+        if self._posicoes[0] is not carteira:
+            self._posicoes = (carteira, {ticker_yahoo(t): i for i, t in enumerate(carteira.tickers)})
+        return self._posicoes[1]
+
+    def _avaliar(
+        self,
+        carteira: CarteiraColunar,
+        precos: np.ndarray,
+        instante: float | np.ndarray,
+        now: datetime.datetime,
+        avisar_invalidos: bool = True,
+    ) -> None:
+        estrategia = self.estrategia
+        tickers = carteira.tickers
+
+        r = carteira.avaliar(precos, instante, self.cfg.tempo_maximo)
+        carteira.exportar(self.estado, np.concatenate([r.saidas, r.entradas, r.contando]))
+
+        if avisar_invalidos:
+            for i in r.invalidos.tolist():
+                log(f"Preço inválido para {tickers[i]}. Pulando...", "⚠️", ticker=tickers[i])
+        for i in r.saidas.tolist():
+            log(f"{tickers[i]} saiu da zona de STOP.", "❌", logging.INFO, ticker=tickers[i])
+        for i in r.entradas.tolist():
+            log(estrategia.msg_entrada_zona(tickers[i], carteira.ativos[i]["preco"]), "⚠️", logging.INFO, ticker=tickers[i])
+        if len(r.contando) and amostrar("tempo"):
+            for i in r.contando.tolist():
+                log(f"{tickers[i]}: {formatar_duracao(carteira.tempo[i])} acumulados.", "⌛",
+                    ticker=tickers[i], tempo_na_zona=float(carteira.tempo[i]))
+        for i in r.duplicados.tolist():
+            log(f"{tickers[i]} {estrategia.msg_duplicado}", "⏸️", ticker=tickers[i])
+
+        for i in r.disparos.tolist():
+            self.disparar(carteira.ativos[i], float(precos[i]), now)
+
+    # ==================================================
+    # 🚀 Disparo do alerta e limpeza definitiva
+    # ==================================================
+    def disparar(self, ativo: dict, preco_atual: float, now: datetime.datetime) -> None:
+        estado = self.estado
+        estrategia = self.estrategia
+        ticker = ativo["ticker"]
+        preco_alvo = ativo["preco"]
+        operacao = ativo["operacao"]
+
+        estado["status"][ticker] = estrategia.status_disparado
+
+        msg_html, msg_tg = estrategia.mensagens(ticker, operacao, preco_alvo, preco_atual)
+        assunto = self.cfg.assunto_alerta.format(
+            ticker=ticker, operacao=estrategia.operacao_assunto(operacao).upper()
+        )
+        self._alertar(self.cfg.nome, assunto, msg_html, msg_tg)
+
+        registro = {
+            "hora": now.strftime("%Y-%m-%d %H:%M:%S"),
+            "ticker": ticker,
+            "operacao": operacao,
+            "preco_alvo": preco_alvo,
+            "preco_atual": preco_atual
+        }
+        estado["historico_alertas"].append(registro)
+        # Só grava o arquivo local: o envio ao Supabase não atrasa a remoção do ticker
+        self._arquivar_no_disparo(self.cfg.nome, [registro], self.cfg.tz)
+        if self._historico_arquivado:
+            estado["historico_alertas"] = estado["historico_alertas"][-HISTORICO_RECENTE_MAX:]
+        else:
+            self._historico_arquivado = self._aparar_historico()
+
+        estado["status"][ticker] = "✅ Removendo..."
+        log(f"{ticker} marcado como 'Removendo...'", "🗂️", ticker=ticker)
+
+        estado["ativos"] = [a for a in estado["ativos"] if a.get("ticker") != ticker]
+        estado["tempo_acumulado"].pop(ticker, None)
+        estado["em_contagem"].pop(ticker, None)
+        estado["precos_historicos"] = estado.get("precos_historicos", {})
+        estado["precos_historicos"].pop(ticker, None)
+
+        try:
+            remoto = self._apagar(self.cfg.state_key, apenas_ticker=ticker)
+            # O painel pode ter incluído tickers desde a última sincronização:
+            # salvar a lista local apagaria esses tickers na nuvem
+            if isinstance(remoto, dict) and isinstance(remoto.get("ativos"), list):
+                estado["ativos"] = self._ativos_da_nuvem(remoto["ativos"])
+            log(f"{ticker} removido do Supabase e estado atualizado.", "🗑️", ticker=ticker)
+        except Exception as e:
+            log(f"Erro ao limpar {ticker} no Supabase: {e}", "⚠️", ticker=ticker)
+
+        estado["status"][ticker] = estrategia.status_removido
+        self._salvar(self.cfg.state_key, estado)
+        log(f"{ticker} {estrategia.msg_persistido}", "💾", ticker=ticker)
+
+    # ==================================================
+    # 📡 Espera entre ciclos (avaliando os ticks do feed)
+    # ==================================================
+    def aguardar(self, segundos: float) -> None:
+        """
+        Espera até o próximo ciclo. Com feed conectado e dentro do pregão,
+        avalia os ticks assim que chegam (em lotes de MARKET_FEED_JANELA s);
+        o estado continua sendo salvo só no ciclo (e no disparo). Termina
+        antes se ENCERRAR for sinalizado.
+        """
+        feed = self.feed
+        if feed is None:
+            ENCERRAR.wait(segundos)
+            return
+        limite = time.monotonic() + segundos
+        while not ENCERRAR.is_set() and (restante := limite - time.monotonic()) > 0:
+            if not feed.conectado:
+                ENCERRAR.wait(min(restante, 1.0))
+                continue
+            ticks = feed.coletar(self.cfg.nome, timeout=min(restante, PASSO_ESPERA), janela=MARKET_FEED_JANELA)
+            if not ticks:
+                continue
+            now = self.agora()
+            if not self.dentro_pregao(now):
+                continue
+            try:
+                self.abertura_diaria(now)
+                self._usar_relogio("feed")
+                self.processar_ticks(ticks, now)
+            except Exception as e:
+                log(f"Erro ao avaliar ticks do feed: {e}", "⚠️")
+
+    # ==================================================
+    # ♾️ LAÇO PRINCIPAL
+    # ==================================================
+    def run(self) -> None:
+        if not robo_atual.get():
+            robo_atual.set(self.cfg.nome.upper())
+        if servir_metricas():
+            log("Métricas disponíveis em /metrics.", "📈")
+        instalar_descarga_no_sigterm()
+
+        log(f"Robô {self.cfg.rotulo} iniciado.", "🤖")
+        if not self.iniciar():
+            log("Falha ao carregar estado remoto — aguardando reconexão...", "⚠️")
+            while True:
+                time.sleep(60)
+                if self.iniciar():
+                    break
+            log("Estado remoto recuperado com sucesso.", "✅")
+        else:
+            log("Estado carregado com sucesso.", "✅")
+
+        while True:
+            self.aguardar(self.executar_ciclo())
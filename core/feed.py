@@ -0,0 +1,320 @@
+# core/feed.py
+"""
+📡 Feed de cotações em tempo real.
+Uma única conexão (websocket ou long-poll HTTP) recebe os ticks de todos
+os tickers monitorados e os distribui para os robôs inscritos. Entre um
+ciclo e outro o robô avalia os ticks assim que chegam, e o tempo na zona
+avança pelo instante de cada tick — o alerta sai em segundos, não no
+próximo ciclo, sem aumentar o número de requisições.
+
+Protocolo (o mesmo do servidor de replay, services/feed_replay.py):
+- websocket: o cliente manda {"acao": "assinar", "tickers": [...]} e recebe
+  {"ticks": [{"ticker", "preco", "instante"}, ...]};
+- long-poll: GET <url>?tickers=A,B&cursor=N&espera=S&novos=A devolve
+  {"cursor": M, "ticks": [...]} (`novos`: tickers que querem o último tick já visto).
+"""
+from __future__ import annotations
+
+import json
+import threading
+from abc import ABC, abstractmethod
+import time
+from collections import deque
+from dataclasses import dataclass
+
+import requests
+
+from core.config import MARKET_FEED_URL, MARKET_FEED_FILA_MAX
+from core.logger import log
+from core.metrics import FEED_TICKS, FEED_RECONEXOES
+from core.prices import ticker_yahoo
+from core.providers import ProvedorCotacoes
+
+
+@dataclass(frozen=True)
+class Tick:
+    ticker: str       # símbolo do Yahoo (PETR4.SA)
+    preco: float
+    instante: float   # epoch, em segundos
+
+
+def _ticks_de(dados) -> list[Tick]:
+    """Mensagem do feed ({"ticks": [...]}, lista ou um tick só) → ticks."""
+    if isinstance(dados, dict):
+        dados = dados.get("ticks", [dados] if "ticker" in dados else [])
+    ticks = []
+    for d in dados or []:
+        try:
+            ticks.append(Tick(ticker_yahoo(str(d["ticker"])), float(d["preco"]), float(d["instante"])))
+        except (KeyError, TypeError, ValueError):
+            continue
+    return ticks
+
+
+# ==================================================
+# 🧩 Base: assinaturas, filas por robô e reconexão
+# ==================================================
+class FeedCotacoes(ABC):
+    nome = "base"
+
+    def __init__(self, fila_max: int = MARKET_FEED_FILA_MAX):
+        self.fila_max = fila_max
+        self.conectado = False
+        self.relogio = 0.0  # instante do tick mais recente (relógio do feed)
+        self._cond = threading.Condition()
+        self._assinaturas: dict[str, set[str]] = {}
+        self._filas: dict[str, deque] = {}
+        self._ultimos: dict[str, Tick] = {}
+        self._parar = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    # -------- robôs --------
+    def assinar(self, consumidor: str, tickers: list[str]) -> None:
+        """Define os tickers do robô `consumidor` (e conecta na primeira vez)."""
+        simbolos = {ticker_yahoo(t) for t in tickers}
+        with self._cond:
+            antes = self.simbolos()
+            self._assinaturas[consumidor] = simbolos
+            self._filas.setdefault(consumidor, deque(maxlen=self.fila_max))
+            mudou = self.simbolos() != antes
+        if mudou:
+            self._assinatura_alterada()
+        self.iniciar()
+
+    def simbolos(self) -> set[str]:
+        """Todos os tickers assinados (união dos robôs)."""
+        with self._cond:
+            return set().union(*self._assinaturas.values())
+
+    def coletar(self, consumidor: str, timeout: float = 0.0, janela: float = 0.0) -> list[Tick]:
+        """
+        Ticks pendentes do robô, na ordem de chegada. Espera até `timeout`
+        pelo primeiro e, depois dele, mais `janela` segundos juntando o lote
+        (sem passar do `timeout`, quando há um).
+        """
+        limite = time.monotonic() + timeout
+        with self._cond:
+            fila = self._filas.get(consumidor)
+            if fila is None:
+                return []
+            if not fila and timeout > 0:
+                self._cond.wait_for(lambda: fila or self._parar.is_set(), timeout)
+            if not fila:
+                return []
+        if timeout > 0:
+            janela = min(janela, limite - time.monotonic())
+        if janela > 0:
+            self._parar.wait(janela)
+        with self._cond:
+            ticks = list(fila)
+            fila.clear()
+        return ticks
+
+    def ultimos(self, tickers: list[str]) -> dict[str, Tick]:
+        """Último tick conhecido de cada ticker."""
+        with self._cond:
+            return {t: self._ultimos[t] for t in map(ticker_yahoo, tickers) if t in self._ultimos}
+
+    def publicar(self, ticks: list[Tick]) -> None:
+        """Chamado pela conexão: entrega os ticks aos robôs que os assinaram."""
+        if not ticks:
+            return
+        with self._cond:
+            for tick in ticks:
+                anterior = self._ultimos.get(tick.ticker)
+                if anterior is not None and tick.instante < anterior.instante:
+                    continue  # fora de ordem: já temos um tick mais novo
+                self._ultimos[tick.ticker] = tick
+                self.relogio = max(self.relogio, tick.instante)
+                for consumidor, simbolos in self._assinaturas.items():
+                    if tick.ticker in simbolos:
+                        self._filas[consumidor].append(tick)
+            self._cond.notify_all()
+        FEED_TICKS.inc(len(ticks), fonte=self.nome)
+
+    # -------- conexão --------
+    def iniciar(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._laco, name=f"feed-{self.nome}", daemon=True)
+        self._thread.start()
+
+    def parar(self, timeout: float = 5.0) -> None:
+        self._parar.set()
+        with self._cond:
+            self._cond.notify_all()
+        self._fechar()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _laco(self) -> None:
+        espera = 1.0
+        while not self._parar.is_set():
+            try:
+                self._conectar_e_ler()
+                espera = 1.0
+            except Exception as e:
+                if self._parar.is_set():
+                    break
+                FEED_RECONEXOES.inc(fonte=self.nome)
+                log(f"Feed '{self.nome}' caiu: {e} — reconectando em {espera:.0f}s...", "🔌")
+            self.conectado = False
+            self._parar.wait(espera)
+            espera = min(espera * 2, 30.0)
+
+    @abstractmethod
+    def _conectar_e_ler(self) -> None:
+        """Conecta e publica ticks até a conexão cair (erro) ou o feed parar."""
+
+    def _assinatura_alterada(self) -> None:
+        """A união dos tickers mudou (a conexão pode avisar o servidor)."""
+
+    def _fechar(self) -> None:
+        """Derruba a conexão atual (usado ao parar)."""
+
+    def saude(self) -> dict:
+        with self._cond:
+            pendentes = {c: len(f) for c, f in self._filas.items()}
+        return {
+            "nome": self.nome,
+            "ok": self.conectado,
+            "tickers": len(self.simbolos()),
+            "relogio": self.relogio,
+            "pendentes": pendentes,
+        }
+
+
+# ==================================================
+# 🔌 Websocket
+# ==================================================
+class FeedWebSocket(FeedCotacoes):
+    nome = "websocket"
+
+    def __init__(self, url: str, **kwargs):
+        super().__init__(**kwargs)
+        self.url = url
+        self._ws = None
+
+    def _conectar_e_ler(self) -> None:
+        from websockets.sync.client import connect
+
+        with connect(self.url, open_timeout=10, close_timeout=2) as ws:
+            self._ws = ws
+            try:
+                self._enviar_assinatura(ws)
+                self.conectado = True
+                log(f"Feed conectado ({self.url}).", "📡")
+                for mensagem in ws:
+                    self.publicar(_ticks_de(json.loads(mensagem)))
+            finally:
+                self._ws = None
+        if not self._parar.is_set():
+            raise ConnectionError("servidor encerrou a conexão")
+
+    def _enviar_assinatura(self, ws) -> None:
+        ws.send(json.dumps({"acao": "assinar", "tickers": sorted(self.simbolos())}))
+
+    def _assinatura_alterada(self) -> None:
+        ws = self._ws
+        if ws is not None:
+            try:
+                self._enviar_assinatura(ws)
+            except Exception:
+                pass  # a reconexão reenvia a assinatura
+
+    def _fechar(self) -> None:
+        ws = self._ws
+        if ws is not None:
+            ws.close()
+
+
+# ==================================================
+# ⏳ Long-poll HTTP
+# ==================================================
+class FeedLongPoll(FeedCotacoes):
+    nome = "longpoll"
+
+    def __init__(self, url: str, espera: float = 20.0, **kwargs):
+        super().__init__(**kwargs)
+        self.url = url
+        self.espera = espera
+        self._sessao = requests.Session()
+
+    def _conectar_e_ler(self) -> None:
+        cursor = None
+        enviados: set[str] = set()
+        while not self._parar.is_set():
+            simbolos = self.simbolos()
+            params = {"tickers": ",".join(sorted(simbolos)), "espera": self.espera}
+            if cursor is not None:
+                params["cursor"] = cursor
+            novos = simbolos - enviados
+            if novos:
+                params["novos"] = ",".join(sorted(novos))
+            resp = self._sessao.get(self.url, params=params, timeout=self.espera + 10)
+            resp.raise_for_status()
+            dados = resp.json()
+            if not self.conectado:
+                self.conectado = True
+                log(f"Feed conectado ({self.url}).", "📡")
+            enviados = simbolos
+            cursor = dados.get("cursor", cursor)
+            self.publicar(_ticks_de(dados))
+
+    def _fechar(self) -> None:
+        self._sessao.close()
+
+
+# ==================================================
+# 🔁 Fotografia do feed como provedor (ciclo normal do robô)
+# ==================================================
+class ProvedorFeed(ProvedorCotacoes):
+    """
+    Último preço de cada ticker no instante do tick mais recente do feed:
+    sem tick novo o preço continua valendo, então o tempo na zona de um
+    ticker parado também avança.
+    """
+
+    nome = "feed"
+
+    def __init__(self, feed: FeedCotacoes):
+        self.feed = feed
+
+    def cotacoes(self, tickers: list[str]) -> dict[str, float]:
+        ultimos = self.feed.ultimos(tickers)
+        return {t: ultimos[t].preco if t in ultimos else -1.0 for t in map(ticker_yahoo, tickers)}
+
+    def momento(self) -> float:
+        return self.feed.relogio or time.time()
+
+    def saude(self) -> dict:
+        return self.feed.saude()
+
+
+# ==================================================
+# 🏭 Escolha do feed
+# ==================================================
+def criar_feed(url: str | None = None) -> FeedCotacoes | None:
+    """MARKET_FEED_URL: ws(s)://… → websocket, http(s)://… → long-poll, vazio → sem feed."""
+    url = (url if url is not None else MARKET_FEED_URL).strip()
+    if not url:
+        return None
+    if url.startswith(("ws://", "wss://")):
+        return FeedWebSocket(url)
+    return FeedLongPoll(url)
+
+
+_FEED: FeedCotacoes | None = None
+_FEED_CRIADO = False
+_FEED_LOCK = threading.Lock()
+
+
+def feed_compartilhado() -> FeedCotacoes | None:
+    """Uma conexão por processo, compartilhada pelos robôs (None sem MARKET_FEED_URL)."""
+    global _FEED, _FEED_CRIADO
+    with _FEED_LOCK:
+        if not _FEED_CRIADO:
+            _FEED = criar_feed()
+            _FEED_CRIADO = True
+        return _FEED
@@ -1,9 +1,173 @@
 # core/logger.py
+"""
+📝 Logs estruturados.
+`log()` só cria o registro e o coloca numa fila; uma thread (QueueListener)
+formata e escreve no stdout, com flush quando a fila esvazia (e não a cada
+linha). Cada linha leva robô, ciclo e ticker: em JSON (LOG_FORMAT=json) ou
+no formato texto antigo (LOG_FORMAT=texto).
+"""
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+from contextvars import ContextVar
 from datetime import datetime, timezone
-import builtins
 
-def log(msg: str, icon: str = "💬"):
-    """Log bonito e com flush automático (Render-friendly)."""
-    now = datetime.now(timezone.utc).strftime("%H:%M:%S")
-    builtins.print(f"[{now}] {icon} {msg}", flush=True)
+from core.config import LOG_FORMAT, LOG_LEVEL, LOG_AMOSTRAGEM
+
+# Nome do robô em execução (usado quando vários robôs rodam no mesmo processo)
+robo_atual: ContextVar[str] = ContextVar("robo_atual", default="")
+
+# Número do ciclo em execução (0 = fora de um ciclo)
+ciclo_atual: ContextVar[int] = ContextVar("ciclo_atual", default=0)
+
+_logger = logging.getLogger("robos")
+_listener: logging.handlers.QueueListener | None = None
+# Reentrante: `log()` pode configurar sob a trava (configurar_logs também a usa)
+_config_lock = threading.RLock()
+
+
+# ==================================================
+# 🎨 Formatos
+# ==================================================
+class FormatoJSON(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        if getattr(record, "bruto", False):
+            return record.getMessage()
+        evento = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "nivel": record.levelname,
+            "robo": getattr(record, "robo", "") or None,
+            "ciclo": getattr(record, "ciclo", 0) or None,
+            "ticker": getattr(record, "ticker", None),
+            "icone": getattr(record, "icone", None),
+            "msg": record.getMessage(),
+        }
+        evento.update(getattr(record, "campos", None) or {})
+        return json.dumps({k: v for k, v in evento.items() if v is not None}, ensure_ascii=False, default=str)
+
+
+class FormatoTexto(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        if getattr(record, "bruto", False):
+            return record.getMessage()
+        hora = datetime.fromtimestamp(record.created, timezone.utc).strftime("%H:%M:%S")
+        robo = getattr(record, "robo", "")
+        prefixo = f"[{robo}] " if robo else ""
+        icone = getattr(record, "icone", None) or "💬"
+        return f"[{hora}] {prefixo}{icone} {record.getMessage()}"
+
+
+class _ListenerEmLote(logging.handlers.QueueListener):
+    """Escreve cada registro sem flush e só dá flush quando a fila esvazia."""
+
+    def handle(self, record: logging.LogRecord) -> None:
+        super().handle(record)
+        if self.queue.empty():
+            for h in self.handlers:
+                h.flush()
+
+
+class _SaidaSemFlush(logging.StreamHandler):
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+
+
+# ==================================================
+# ⚙️ Configuração (uma vez por processo)
+# ==================================================
+def configurar_logs(formato: str | None = None, nivel: str | None = None, stream=None) -> None:
+    """Liga a fila + thread de escrita. Chamado automaticamente no primeiro `log()`."""
+    global _listener
+    with _config_lock:
+        if _listener is not None:
+            _listener.stop()
+            _logger.handlers.clear()
+
+        saida = _SaidaSemFlush(stream or sys.stdout)
+        saida.setFormatter(FormatoTexto() if (formato or LOG_FORMAT) == "texto" else FormatoJSON())
+
+        fila: queue.SimpleQueue = queue.SimpleQueue()
+        _logger.addHandler(logging.handlers.QueueHandler(fila))
+        _logger.setLevel(nivel or LOG_LEVEL)
+        _logger.propagate = False
+
+        _listener = _ListenerEmLote(fila, saida)
+        _listener.start()
+
+
+def encerrar_logs() -> None:
+    """Esvazia a fila e para a thread de escrita (chamado no atexit)."""
+    global _listener
+    with _config_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+            _logger.handlers.clear()
+
+
+atexit.register(encerrar_logs)
+
+
+# ==================================================
+# ✍️ API
+# ==================================================
+# Nível pelo ícone quando não é informado
+_NIVEL_POR_ICONE = {
+    "⚠️": logging.WARNING, "🔌": logging.WARNING, "⏱️": logging.WARNING,
+    "⛔": logging.WARNING, "🛑": logging.WARNING, "🚫": logging.WARNING,
+    "❌": logging.ERROR,
+}
+
+
+def _garantir_configurado() -> None:
+    """Configura no primeiro uso; com vários robôs (threads) só um configura."""
+    if _listener is None:
+        with _config_lock:
+            if _listener is None:
+                configurar_logs()
+
+
+def log(msg: str, icon: str = "💬", nivel: int | None = None, ticker: str | None = None, **campos) -> None:
+    """Registra um evento (não bloqueia: a escrita acontece em outra thread)."""
+    _garantir_configurado()
+    if nivel is None:
+        nivel = _NIVEL_POR_ICONE.get(icon, logging.INFO)
+    if not _logger.isEnabledFor(nivel):
+        return
+    _logger.log(nivel, msg, extra={
+        "robo": robo_atual.get(),
+        "ciclo": ciclo_atual.get(),
+        "ticker": ticker,
+        "icone": icon,
+        "campos": campos,
+    })
+
+
+def log_bruto(linha: str) -> None:
+    """Repassa uma linha já formatada (ex.: saída de um subprocesso) sem reformatar."""
+    _garantir_configurado()
+    _logger.log(logging.INFO, linha, extra={"bruto": True})
+
+
+_amostras: dict[tuple[str, str], int] = {}
+
 
+def amostrar(chave: str) -> bool:
+    """
+    True uma vez a cada LOG_AMOSTRAGEM chamadas por (robô, chave). Usado
+    nas linhas repetitivas por ticker (preço atual, tempo acumulado).
+    """
+    k = (robo_atual.get(), chave)
+    with _config_lock:
+        n = _amostras.get(k, 0)
+        _amostras[k] = n + 1
+    return n % LOG_AMOSTRAGEM == 0
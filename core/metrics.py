@@ -0,0 +1,238 @@
+# core/metrics.py
+"""
+📈 Métricas no formato texto do Prometheus.
+Contadores, medidores e histogramas com rótulos, em memória, servidos por
+um endpoint HTTP simples (GET /metrics) na porta METRICS_PORT. Não precisa
+de serviço externo: `curl localhost:9100/metrics` já mostra onde o ciclo
+gasta tempo.
+"""
+from __future__ import annotations
+
+import math
+import os
+import threading
+import time
+import urllib.request
+from collections import OrderedDict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from core.config import METRICS_PORT
+
+# Rótulo fixo de processo (o robots_master passa um por subprocesso)
+_PROCESSO = os.getenv("METRICS_PROCESSO", "")
+
+BALDES_PADRAO = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+
+
+def _rotulos(nomes: tuple[str, ...], valores: tuple[str, ...], extra: str = "") -> str:
+    pares = [f'{n}="{v}"' for n, v in zip(nomes, valores)]
+    if _PROCESSO:
+        pares.insert(0, f'processo="{_PROCESSO}"')
+    if extra:
+        pares.append(extra)
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+
+def _num(v: float) -> str:
+    if v == math.inf:
+        return "+Inf"
+    return repr(float(v)) if not float(v).is_integer() else str(int(v))
+
+
+# ==================================================
+# 🧮 Tipos de métrica
+# ==================================================
+class _Metrica:
+    tipo = "untyped"
+
+    def __init__(self, nome: str, ajuda: str, rotulos: tuple[str, ...] = ()):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self._lock = threading.Lock()
+        self._series: dict[tuple[str, ...], object] = {}
+
+    def _chave(self, valores: dict) -> tuple[str, ...]:
+        return tuple(str(valores.get(r, "")) for r in self.rotulos)
+
+    def _cabecalho(self) -> list[str]:
+        return [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} {self.tipo}"]
+
+
+class Contador(_Metrica):
+    tipo = "counter"
+
+    def inc(self, valor: float = 1.0, **rotulos) -> None:
+        k = self._chave(rotulos)
+        with self._lock:
+            self._series[k] = self._series.get(k, 0.0) + valor
+
+    def exportar(self) -> list[str]:
+        with self._lock:
+            itens = list(self._series.items())
+        return self._cabecalho() + [f"{self.nome}{_rotulos(self.rotulos, k)} {_num(v)}" for k, v in itens]
+
+
+class Medidor(_Metrica):
+    tipo = "gauge"
+
+    def set(self, valor: float, **rotulos) -> None:
+        with self._lock:
+            self._series[self._chave(rotulos)] = float(valor)
+
+    def exportar(self) -> list[str]:
+        with self._lock:
+            itens = list(self._series.items())
+        return self._cabecalho() + [f"{self.nome}{_rotulos(self.rotulos, k)} {_num(v)}" for k, v in itens]
+
+
+class Histograma(_Metrica):
+    tipo = "histogram"
+
+    def __init__(self, nome: str, ajuda: str, rotulos: tuple[str, ...] = (), baldes: tuple[float, ...] = BALDES_PADRAO):
+        super().__init__(nome, ajuda, rotulos)
+        self.baldes = tuple(sorted(baldes)) + (math.inf,)
+
+    def observar(self, valor: float, **rotulos) -> None:
+        k = self._chave(rotulos)
+        with self._lock:
+            serie = self._series.get(k)
+            if serie is None:
+                serie = self._series[k] = [[0] * len(self.baldes), 0.0, 0]
+            for i, limite in enumerate(self.baldes):
+                if valor <= limite:
+                    serie[0][i] += 1
+                    break
+            serie[1] += valor
+            serie[2] += 1
+
+    @contextmanager
+    def medir(self, **rotulos):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(time.perf_counter() - inicio, **rotulos)
+
+    def exportar(self) -> list[str]:
+        with self._lock:
+            itens = [(k, (list(s[0]), s[1], s[2])) for k, s in self._series.items()]
+        linhas = self._cabecalho()
+        for k, (contagens, soma, total) in itens:
+            acumulado = 0
+            for limite, c in zip(self.baldes, contagens):
+                acumulado += c
+                le = f'le="{_num(limite)}"'
+                linhas.append(f"{self.nome}_bucket{_rotulos(self.rotulos, k, le)} {acumulado}")
+            linhas.append(f"{self.nome}_sum{_rotulos(self.rotulos, k)} {_num(soma)}")
+            linhas.append(f"{self.nome}_count{_rotulos(self.rotulos, k)} {total}")
+        return linhas
+
+
+# ==================================================
+# 📋 Métricas dos robôs
+# ==================================================
+CICLO_SEGUNDOS = Histograma("robos_ciclo_segundos", "Duração de um ciclo completo do robô.", ("robo",))
+CICLO_ATRASOS = Contador("robos_ciclo_atrasos_total", "Ciclos que passaram do intervalo do robô.", ("robo",))
+TICKERS = Medidor("robos_tickers", "Tickers monitorados pelo robô.", ("robo",))
+
+COTACAO_SEGUNDOS = Histograma("robos_cotacao_segundos", "Latência de uma chamada a uma fonte de cotação.", ("fonte",))
+COTACAO_FALHAS = Contador("robos_cotacao_falhas_total", "Chamadas a uma fonte de cotação que falharam.", ("fonte",))
+COTACAO_SEM_PRECO = Contador("robos_cotacao_sem_preco_total", "Tickers que terminaram o ciclo sem cotação.")
+
+SUPABASE_SEGUNDOS = Histograma("robos_supabase_segundos", "Latência das operações de estado no Supabase.", ("operacao",))
+SUPABASE_BYTES = Contador("robos_supabase_bytes_total", "Bytes de estado enviados/recebidos.", ("operacao", "direcao"))
+ESTADO_AGRUPADAS = Contador(
+    "robos_estado_gravacoes_agrupadas_total", "Gravações do estado absorvidas pelo buffer (sem ida ao Supabase).", ("robo",),
+)
+
+ALERTAS = Contador("robos_alertas_total", "Alertas por canal e resultado.", ("canal", "resultado"))
+ALERTA_ENTREGA_SEGUNDOS = Histograma(
+    "robos_alerta_entrega_segundos", "Tempo entre enfileirar e entregar um alerta.", ("canal",),
+)
+
+FEED_TICKS = Contador("robos_feed_ticks_total", "Ticks recebidos do feed de cotações.", ("fonte",))
+FEED_RECONEXOES = Contador("robos_feed_reconexoes_total", "Quedas da conexão com o feed de cotações.", ("fonte",))
+
+REGISTRO = [
+    CICLO_SEGUNDOS, CICLO_ATRASOS, TICKERS,
+    COTACAO_SEGUNDOS, COTACAO_FALHAS, COTACAO_SEM_PRECO,
+    SUPABASE_SEGUNDOS, SUPABASE_BYTES, ESTADO_AGRUPADAS,
+    ALERTAS, ALERTA_ENTREGA_SEGUNDOS,
+    FEED_TICKS, FEED_RECONEXOES,
+]
+
+
+def exportar() -> str:
+    """Todas as métricas no formato texto do Prometheus."""
+    linhas: list[str] = []
+    for m in REGISTRO:
+        linhas.extend(m.exportar())
+    return "\n".join(linhas) + "\n"
+
+
+def mesclar(textos: list[str]) -> str:
+    """Junta exposições de vários processos (HELP/TYPE uma vez por métrica)."""
+    familias: OrderedDict[str, tuple[list[str], list[str]]] = OrderedDict()
+    for texto in textos:
+        atual = None
+        for linha in texto.splitlines():
+            if linha.startswith("# HELP ") or linha.startswith("# TYPE "):
+                atual = linha.split()[2]
+                cabecalho, _ = familias.setdefault(atual, ([], []))
+                if linha not in cabecalho:
+                    cabecalho.append(linha)
+            elif linha.strip() and atual is not None:
+                familias[atual][1].append(linha)
+    linhas: list[str] = []
+    for cabecalho, amostras in familias.values():
+        linhas.extend(cabecalho)
+        linhas.extend(amostras)
+    return "\n".join(linhas) + "\n"
+
+
+# ==================================================
+# 🌐 Endpoint /metrics
+# ==================================================
+def _buscar_externas(urls: list[str]) -> list[str]:
+    textos = []
+    for url in urls:
+        try:
+            with urllib.request.urlopen(url, timeout=2) as resp:
+                textos.append(resp.read().decode("utf-8"))
+        except Exception:
+            continue  # subprocesso reiniciando: fica fora desta coleta
+    return textos
+
+
+def servir_metricas(porta: int = METRICS_PORT, externas: list[str] | None = None) -> ThreadingHTTPServer | None:
+    """
+    Sobe o endpoint em uma thread daemon. `externas`: URLs /metrics de
+    outros processos (subprocessos do master) mescladas na resposta.
+    Porta 0 ou ocupada → sem endpoint.
+    """
+    if not porta:
+        return None
+
+    class _Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            corpo = mesclar([exportar()] + _buscar_externas(externas or [])).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def log_message(self, *args):
+            pass
+
+    try:
+        servidor = ThreadingHTTPServer(("0.0.0.0", porta), _Handler)
+    except OSError:
+        return None
+    threading.Thread(target=servidor.serve_forever, name="metricas", daemon=True).start()
+    return servidor
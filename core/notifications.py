@@ -1,17 +1,164 @@
 # core/notifications.py
 import smtplib
 import asyncio
+import atexit
+import queue
+import threading
+import time
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from telegram import Bot
-from core.config import EMAIL_SENDER, GMAIL_APP_PASSWORD, TELEGRAM_TOKEN, ROBOTS
+from core.config import (
+    EMAIL_SENDER, GMAIL_APP_PASSWORD, TELEGRAM_TOKEN, TELEGRAM_API_URL, ROBOTS, ALERT_QUEUE_SIZE, ALERT_RETRIES,
+    SMTP_HOST, SMTP_PORT, SMTP_STARTTLS, SMTP_IDLE_TIMEOUT, SMTP_POOL_SIZE,
+)
+from core.logger import log, robo_atual
+from core.metrics import ALERTAS, ALERTA_ENTREGA_SEGUNDOS
+
+# ==================================================
+# 🔌 Pool de conexões SMTP autenticadas
+# ==================================================
+class PoolSMTP:
+    """
+    Mantém conexões SMTP já autenticadas e as reaproveita entre mensagens.
+    Conexões ociosas além de `idle_timeout` são fechadas por uma thread de
+    faxina (antes que o servidor as derrube); se o servidor derrubar a
+    conexão, ela é refeita e a mensagem reenviada uma vez.
+    """
+
+    def __init__(
+        self,
+        host: str = SMTP_HOST,
+        port: int = SMTP_PORT,
+        usuario: str = EMAIL_SENDER,
+        senha: str = GMAIL_APP_PASSWORD,
+        starttls: bool = SMTP_STARTTLS,
+        idle_timeout: float = SMTP_IDLE_TIMEOUT,
+        tamanho: int = SMTP_POOL_SIZE,
+        timeout: float = 30,
+    ):
+        self.host = host
+        self.port = port
+        self.usuario = usuario
+        self.senha = senha
+        self.starttls = starttls
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self._livres: list[tuple[smtplib.SMTP, float]] = []
+        self._lock = threading.Lock()
+        self._vagas = threading.BoundedSemaphore(max(1, tamanho))
+        self._faxina: threading.Thread | None = None
+        self._parar = threading.Event()
+        self.conexoes_abertas = 0   # abertas agora (livres ou em uso)
+        self.conexoes_criadas = 0   # abertas desde o início
+
+    def _conectar(self) -> smtplib.SMTP:
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        smtp.ehlo()
+        if self.starttls:
+            smtp.starttls()
+            smtp.ehlo()
+        if self.usuario and self.senha and smtp.has_extn("auth"):
+            smtp.login(self.usuario, self.senha)
+        with self._lock:
+            self.conexoes_abertas += 1
+            self.conexoes_criadas += 1
+        return smtp
+
+    def _fechar(self, smtp: smtplib.SMTP) -> None:
+        """Encerra a conexão (QUIT vai pela rede: nunca chamar com a trava)."""
+        try:
+            smtp.quit()
+        except Exception:
+            try:
+                smtp.close()
+            except Exception:
+                pass
+        with self._lock:
+            self.conexoes_abertas -= 1
+
+    def _pegar(self) -> smtplib.SMTP:
+        agora = time.monotonic()
+        smtp = None
+        vencidas = []
+        with self._lock:
+            while self._livres:
+                livre, ultimo_uso = self._livres.pop()
+                if agora - ultimo_uso <= self.idle_timeout:
+                    smtp = livre
+                    break
+                vencidas.append(livre)
+        # QUIT fora da trava, como em fechar_ociosas
+        for velha in vencidas:
+            self._fechar(velha)
+        return smtp if smtp is not None else self._conectar()
+
+    def _devolver(self, smtp: smtplib.SMTP) -> None:
+        with self._lock:
+            self._livres.append((smtp, time.monotonic()))
+            if self._faxina is None or not self._faxina.is_alive():
+                self._parar.clear()
+                self._faxina = threading.Thread(target=self._laco_faxina, name="smtp-faxina", daemon=True)
+                self._faxina.start()
+
+    def _laco_faxina(self) -> None:
+        """Fecha as ociosas periodicamente; termina quando não sobra conexão livre."""
+        while not self._parar.wait(max(1.0, self.idle_timeout / 2)):
+            self.fechar_ociosas()
+            with self._lock:
+                if not self._livres:
+                    self._faxina = None
+                    return
+
+    def enviar(self, msg) -> None:
+        """Envia a mensagem por uma conexão do pool (lança exceção se falhar)."""
+        with self._vagas:
+            smtp = self._pegar()
+            try:
+                smtp.send_message(msg)
+            except (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError):
+                # Conexão velha ou derrubada pelo servidor: refaz e tenta mais uma vez
+                self._fechar(smtp)
+                smtp = self._conectar()
+                try:
+                    smtp.send_message(msg)
+                except Exception:
+                    self._fechar(smtp)
+                    raise
+            except Exception:
+                self._fechar(smtp)
+                raise
+            self._devolver(smtp)
+
+    def fechar_ociosas(self) -> int:
+        """Fecha conexões paradas há mais de `idle_timeout` segundos (devolve quantas)."""
+        agora = time.monotonic()
+        with self._lock:
+            ociosas = [smtp for smtp, ultimo_uso in self._livres if agora - ultimo_uso > self.idle_timeout]
+            self._livres = [(smtp, u) for smtp, u in self._livres if agora - u <= self.idle_timeout]
+        # QUIT fora da trava: quem está enviando não espera o servidor responder
+        for smtp in ociosas:
+            self._fechar(smtp)
+        return len(ociosas)
+
+    def fechar(self) -> None:
+        self._parar.set()
+        with self._lock:
+            livres, self._livres = self._livres, []
+        for smtp, _ in livres:
+            self._fechar(smtp)
+
+
+POOL_SMTP = PoolSMTP()
+atexit.register(POOL_SMTP.fechar)
+
 
 # ==================================================
 # ✉️ Função para envio de e-mail (Gmail SMTP)
 # ==================================================
 def enviar_email_html(destinatario, assunto, corpo_html):
     if not EMAIL_SENDER or not GMAIL_APP_PASSWORD:
-        print("⚠️ Email não configurado. Verifique .env")
+        log("Email não configurado. Verifique .env", "⚠️")
         return False
 
     try:
@@ -21,40 +168,139 @@ def enviar_email_html(destinatario, assunto, corpo_html):
         msg["Subject"] = assunto
         msg.attach(MIMEText(corpo_html, "html"))
 
-        with smtplib.SMTP("smtp.gmail.com", 587) as smtp:
-            smtp.starttls()
-            smtp.login(EMAIL_SENDER, GMAIL_APP_PASSWORD)
-            smtp.send_message(msg)
+        POOL_SMTP.enviar(msg)
 
-        print(f"📧 Email enviado para {destinatario}")
+        log(f"Email enviado para {destinatario}", "📧")
         return True
 
     except Exception as e:
-        print(f"❌ Erro ao enviar e-mail: {e}")
+        log(f"Erro ao enviar e-mail: {e}", "❌")
         return False
 
 
 # ==================================================
 # 💬 Função para envio de mensagem Telegram
 # ==================================================
+class ClienteTelegram:
+    """
+    Um único `telegram.Bot` por processo, vivendo em um event loop próprio
+    (thread daemon). Reaproveita o pool HTTPX entre mensagens e permite
+    enviar para vários chats em paralelo.
+    """
+
+    def __init__(self, token: str = TELEGRAM_TOKEN, conexoes: int = 8, timeout: float = 30):
+        self.token = token
+        self.conexoes = conexoes
+        self.timeout = timeout
+        self._bot = None
+        self._loop = None
+        self._lock = threading.Lock()
+        # Envios paralelos no loop: só o primeiro cria (e inicializa) o Bot
+        self._bot_lock = asyncio.Lock()
+
+    def _iniciar(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="telegram-loop", daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    async def _obter_bot(self) -> Bot:
+        if self._bot is not None:
+            return self._bot
+        async with self._bot_lock:
+            if self._bot is None:
+                from telegram.request import HTTPXRequest
+                bot = Bot(
+                    token=self.token,
+                    base_url=TELEGRAM_API_URL,
+                    request=HTTPXRequest(connection_pool_size=self.conexoes),
+                )
+                await bot.initialize()
+                self._bot = bot
+        return self._bot
+
+    async def _enviar(self, chat_id: str, mensagem: str) -> bool:
+        try:
+            bot = await self._obter_bot()
+            await bot.send_message(
+                chat_id=chat_id,
+                text=mensagem,
+                parse_mode="HTML",
+                disable_web_page_preview=True,
+            )
+            log(f"Telegram enviado para {chat_id}", "📲")
+            return True
+        except Exception as e:
+            log(f"Erro Telegram: {e}", "❌")
+            return False
+
+    async def _enviar_varios(self, chat_ids: list[str], mensagem: str) -> list[str]:
+        """
+        Envia para todos os chats em paralelo; devolve os que não receberam.
+        Passado `timeout`, os envios pendentes são cancelados (e só depois
+        contados como falha): nenhum chega atrasado e duplica na nova tentativa.
+        """
+        entregues: set[str] = set()
+
+        async def enviar(chat_id: str) -> None:
+            if await self._enviar(chat_id, mensagem):
+                entregues.add(chat_id)
+
+        try:
+            await asyncio.wait_for(asyncio.gather(*(enviar(c) for c in chat_ids)), self.timeout)
+        except asyncio.TimeoutError:
+            log(f"Telegram não respondeu em {self.timeout:.0f}s — envios pendentes cancelados.", "⚠️")
+        return [c for c in chat_ids if c not in entregues]
+
+    def submeter(self, chat_ids: list[str], mensagem: str):
+        """Agenda o envio no loop do cliente e devolve um concurrent Future (chats que falharam)."""
+        return asyncio.run_coroutine_threadsafe(self._enviar_varios(chat_ids, mensagem), self._iniciar())
+
+    def enviar_falhos(self, chat_ids: list[str], mensagem: str) -> list[str]:
+        """Envia e devolve os chats que não receberam (todos, se o loop nem respondeu)."""
+        futuro = self.submeter(chat_ids, mensagem)
+        try:
+            # O próprio envio já para em `timeout`; a folga cobre o cancelamento
+            return futuro.result(timeout=self.timeout + 5)
+        except Exception as e:
+            futuro.cancel()
+            log(f"Erro Telegram: {e}", "❌")
+            return list(chat_ids)
+
+    def enviar(self, chat_ids: list[str], mensagem: str) -> bool:
+        return not self.enviar_falhos(chat_ids, mensagem)
+
+    def fechar(self) -> None:
+        if self._loop is None:
+            return
+        if self._bot is not None:
+            try:
+                asyncio.run_coroutine_threadsafe(self._bot.shutdown(), self._loop).result(timeout=5)
+            except Exception:
+                pass
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+CLIENTE_TELEGRAM = ClienteTelegram()
+atexit.register(CLIENTE_TELEGRAM.fechar)
+
+
+def _chat_ids(chat_id) -> list[str]:
+    """Aceita um id, uma lista ou ids separados por vírgula."""
+    if isinstance(chat_id, (list, tuple)):
+        return [str(c).strip() for c in chat_id if str(c).strip()]
+    return [c.strip() for c in str(chat_id).split(",") if c.strip()]
+
+
 async def enviar_telegram_async(chat_id: str, mensagem: str):
-    try:
-        bot = Bot(token=TELEGRAM_TOKEN)
-        await bot.send_message(
-            chat_id=chat_id,
-            text=mensagem,
-            parse_mode="HTML",
-            disable_web_page_preview=True,
-        )
-        print(f"📲 Telegram enviado para {chat_id}")
-        return True
-    except Exception as e:
-        print(f"❌ Erro Telegram: {e}")
-        return False
+    futuro = CLIENTE_TELEGRAM.submeter(_chat_ids(chat_id), mensagem)
+    return not await asyncio.wrap_future(futuro)
 
 
 def enviar_telegram(chat_id: str, mensagem: str):
-    asyncio.run(enviar_telegram_async(chat_id, mensagem))
+    return CLIENTE_TELEGRAM.enviar(_chat_ids(chat_id), mensagem)
 
 
 # ==================================================
@@ -65,7 +311,7 @@ def enviar_alerta(robot_name: str, assunto: str, corpo_html: str, corpo_telegram
     Envia um alerta via e-mail e Telegram com base nas configs do robô.
     """
     if robot_name not in ROBOTS:
-        print(f"Robô '{robot_name}' não encontrado nas configurações.")
+        log(f"Robô '{robot_name}' não encontrado nas configurações.", "⚠️")
         return
 
     cfg = ROBOTS[robot_name]
@@ -79,7 +325,7 @@ def enviar_alerta(robot_name: str, assunto: str, corpo_html: str, corpo_telegram
     corpo_tg = corpo_telegram if corpo_telegram else corpo_html
     ok_tg = False
     if chat_id and TELEGRAM_TOKEN:
-        ok_tg = asyncio.run(enviar_telegram_async(chat_id, corpo_tg))
+        ok_tg = enviar_telegram(chat_id, corpo_tg)
 
     status = []
     if ok_email:
@@ -88,7 +334,141 @@ def enviar_alerta(robot_name: str, assunto: str, corpo_html: str, corpo_telegram
         status.append("💬 Telegram")
 
     if status:
-        print(f"✅ Alerta enviado via {', '.join(status)} para {robot_name}")
+        log(f"Alerta enviado via {', '.join(status)} para {robot_name}", "✅")
     else:
-        print(f"⚠️ Nenhum canal ativo para {robot_name}")
+        log(f"Nenhum canal ativo para {robot_name}", "⚠️")
+
+
+# ==================================================
+# 📬 Fila de alertas com workers em segundo plano
+# ==================================================
+class FilaAlertas:
+    """
+    Fila limitada por canal (e-mail e Telegram), cada uma com seu worker.
+    O robô só enfileira e segue o ciclo; o envio, as novas tentativas e as
+    métricas de entrega ficam por conta dos workers.
+    """
+
+    CANAIS = ("email", "telegram")
+
+    def __init__(self, capacidade: int = ALERT_QUEUE_SIZE, tentativas: int = ALERT_RETRIES, espera_base: float = 2.0):
+        self.tentativas = max(1, tentativas)
+        self.espera_base = espera_base
+        self._filas = {c: queue.Queue(maxsize=capacidade) for c in self.CANAIS}
+        self._lock = threading.Lock()
+        self._metricas = {
+            c: {"enfileirados": 0, "enviados": 0, "falhas": 0, "retentativas": 0, "descartados": 0, "latencia_total": 0.0}
+            for c in self.CANAIS
+        }
+        self._workers = []
+        for canal in self.CANAIS:
+            t = threading.Thread(target=self._trabalhar, args=(canal,), name=f"alertas-{canal}", daemon=True)
+            t.start()
+            self._workers.append(t)
+
+    def _contar(self, canal: str, campo: str, valor: float = 1) -> None:
+        with self._lock:
+            self._metricas[canal][campo] += valor
+
+    def _enviar(self, canal: str, destino: str, assunto: str, corpo: str) -> str:
+        """Envia e devolve o destino que ainda falta ("" se todos receberam)."""
+        if canal == "email":
+            return "" if enviar_email_html(destino, assunto, corpo) else destino
+        # Vários chats: a nova tentativa vai só para os que falharam
+        return ",".join(CLIENTE_TELEGRAM.enviar_falhos(_chat_ids(destino), corpo))
+
+    def _trabalhar(self, canal: str) -> None:
+        fila = self._filas[canal]
+        while True:
+            criado_em, robot_name, destino, assunto, corpo = fila.get()
+            robo_atual.set(robot_name.upper())
+            try:
+                for tentativa in range(1, self.tentativas + 1):
+                    try:
+                        destino = self._enviar(canal, destino, assunto, corpo)
+                    except Exception as e:
+                        log(f"Erro no worker de {canal}: {e}", "❌")
+                    if not destino:
+                        latencia = time.monotonic() - criado_em
+                        self._contar(canal, "enviados")
+                        self._contar(canal, "latencia_total", latencia)
+                        ALERTAS.inc(canal=canal, resultado="enviado")
+                        ALERTA_ENTREGA_SEGUNDOS.observar(latencia, canal=canal)
+                        break
+                    if tentativa < self.tentativas:
+                        self._contar(canal, "retentativas")
+                        ALERTAS.inc(canal=canal, resultado="retentativa")
+                        time.sleep(self.espera_base * 2 ** (tentativa - 1))
+                else:
+                    self._contar(canal, "falhas")
+                    ALERTAS.inc(canal=canal, resultado="falha")
+                    log(f"{canal} não entregue para {robot_name} após {self.tentativas} tentativa(s).", "⚠️")
+            finally:
+                fila.task_done()
+
+    def enfileirar(self, robot_name: str, assunto: str, corpo_html: str, corpo_telegram: str = None) -> bool:
+        """Enfileira o alerta nos canais configurados do robô sem bloquear."""
+        if robot_name not in ROBOTS:
+            log(f"Robô '{robot_name}' não encontrado nas configurações.", "⚠️")
+            return False
+
+        cfg = ROBOTS[robot_name]
+        envios = []
+        if cfg.get("EMAIL_RECIPIENT"):
+            envios.append(("email", cfg["EMAIL_RECIPIENT"], corpo_html))
+        if cfg.get("TELEGRAM_CHAT_ID") and TELEGRAM_TOKEN:
+            envios.append(("telegram", cfg["TELEGRAM_CHAT_ID"], corpo_telegram or corpo_html))
+
+        if not envios:
+            log(f"Nenhum canal ativo para {robot_name}", "⚠️")
+            return False
+
+        agora = time.monotonic()
+        aceitos = 0
+        for canal, destino, corpo in envios:
+            try:
+                self._filas[canal].put_nowait((agora, robot_name, destino, assunto, corpo))
+                self._contar(canal, "enfileirados")
+                aceitos += 1
+            except queue.Full:
+                self._contar(canal, "descartados")
+                ALERTAS.inc(canal=canal, resultado="descartado")
+                log(f"Fila de {canal} cheia — alerta de {robot_name} descartado.", "⚠️")
+        return aceitos > 0
+
+    def drenar(self, timeout: float = 30.0) -> bool:
+        """Espera as filas esvaziarem (até `timeout`). Retorna True se esvaziaram."""
+        limite = time.monotonic() + timeout
+        for fila in self._filas.values():
+            while fila.unfinished_tasks:
+                if time.monotonic() >= limite:
+                    return False
+                time.sleep(0.1)
+        return True
+
+    def metricas(self) -> dict:
+        with self._lock:
+            saida = {}
+            for canal, m in self._metricas.items():
+                saida[canal] = dict(m, pendentes=self._filas[canal].qsize())
+                saida[canal]["latencia_media"] = m["latencia_total"] / m["enviados"] if m["enviados"] else 0.0
+            return saida
+
+
+_FILA_ALERTAS = None
+_FILA_LOCK = threading.Lock()
+
+
+def fila_alertas() -> FilaAlertas:
+    """Fila única por processo, criada no primeiro alerta."""
+    global _FILA_ALERTAS
+    with _FILA_LOCK:
+        if _FILA_ALERTAS is None:
+            _FILA_ALERTAS = FilaAlertas()
+            atexit.register(_FILA_ALERTAS.drenar)
+        return _FILA_ALERTAS
+
 
+def enfileirar_alerta(robot_name: str, assunto: str, corpo_html: str, corpo_telegram: str = None) -> bool:
+    """Versão não bloqueante de `enviar_alerta` (usada pelos robôs)."""
+    return fila_alertas().enfileirar(robot_name, assunto, corpo_html, corpo_telegram)
@@ -1,53 +1,580 @@
 # core/prices.py
 from yahooquery import Ticker
 import pandas as pd
+import numpy as np
 import time
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
+from tenacity import Retrying, RetryError, stop_after_attempt, stop_after_delay, retry_if_exception_type
 import requests
+import sqlite3
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, wait
+from core.config import (
+    PRICE_CACHE_TTL, PRICE_CACHE_MAX, PRICE_CACHE_PATH, PRICE_FETCH_WORKERS, PRICE_FETCH_DEADLINE,
+    PRICE_RETRY_ATTEMPTS, PRICE_BREAKER_FAILURES, PRICE_BREAKER_COOLDOWN,
+)
+from core.logger import log
+from core.metrics import COTACAO_SEGUNDOS, COTACAO_FALHAS, COTACAO_SEM_PRECO
+
+# Sessão HTTP única por processo (reaproveita conexões entre robôs e ciclos)
+HTTP = requests.Session()
+
+URL_YAHOO_V7 = "https://query1.finance.yahoo.com/v7/finance/quote"
+
+
+# ==================================================
+# 🔌 Disjuntor por fonte (circuit breaker)
+# ==================================================
+class Disjuntor:
+    """
+    Depois de `limite_falhas` erros seguidos a fonte é pulada por
+    `tempo_aberto` segundos; passado esse tempo, uma chamada de teste
+    decide se ela volta (sucesso) ou fica fora de novo (falha).
+    """
+
+    def __init__(self, nome: str, limite_falhas: int = PRICE_BREAKER_FAILURES, tempo_aberto: float = PRICE_BREAKER_COOLDOWN):
+        self.nome = nome
+        self.limite_falhas = limite_falhas
+        self.tempo_aberto = tempo_aberto
+        self.falhas_seguidas = 0
+        self.aberto_ate = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def aberto(self) -> bool:
+        return time.monotonic() < self.aberto_ate
+
+    def permite(self) -> bool:
+        return not self.aberto
+
+    def sucesso(self) -> None:
+        with self._lock:
+            self.falhas_seguidas = 0
+            self.aberto_ate = 0.0
+
+    def falha(self) -> None:
+        with self._lock:
+            self.falhas_seguidas += 1
+            if self.falhas_seguidas >= self.limite_falhas:
+                self.aberto_ate = time.monotonic() + self.tempo_aberto
+                log(f"Fonte '{self.nome}' fora por {self.tempo_aberto:.0f}s ({self.falhas_seguidas} falhas seguidas).", "🔌")
+
+
+# ==================================================
+# 🛰️ Fontes de cotação (todas aceitam vários tickers)
+# ==================================================
+# `timeout` de uma fonte é o orçamento da chamada inteira; nenhuma
+# requisição isolada passa de TIMEOUT_FONTE
+TIMEOUT_FONTE = 10.0
+
+
+def _fonte_price(simbolos: list[str], timeout: float) -> dict[str, float]:
+    dados = Ticker(simbolos, timeout=min(TIMEOUT_FONTE, timeout)).price
+    precos = {}
+    if isinstance(dados, dict):
+        for t in simbolos:
+            info = dados.get(t)
+            p = info.get("regularMarketPrice") if isinstance(info, dict) else None
+            if p is not None:
+                precos[t] = float(p)
+    return precos
+
+
+def _fonte_v7(simbolos: list[str], timeout: float) -> dict[str, float]:
+    resp = HTTP.get(URL_YAHOO_V7, params={"symbols": ",".join(simbolos)}, timeout=min(TIMEOUT_FONTE, timeout))
+    resp.raise_for_status()
+    precos = {}
+    for item in resp.json()["quoteResponse"]["result"]:
+        t = item.get("symbol")
+        p = item.get("regularMarketPrice")
+        if t in simbolos and p:
+            precos[t] = float(p)
+    return precos
+
+
+def _fonte_history(simbolos: list[str], timeout: float) -> dict[str, float]:
+    """Uma requisição por ticker, todas dentro do mesmo orçamento `timeout`."""
+    limite = time.monotonic() + timeout
+    precos = {}
+    for t in simbolos:
+        restante = limite - time.monotonic()
+        if restante <= 0.5:
+            break  # o que faltar fica para a próxima fonte/rodada
+        hist = Ticker(t, timeout=min(TIMEOUT_FONTE, restante)).history(period="1d")
+        if isinstance(hist, pd.DataFrame) and not hist.empty:
+            precos[t] = float(hist["close"].iloc[-1])
+    return precos
+
+
+# Ordem padrão (sem medições recentes): price → API v7 direta → history
+FONTES = {
+    "price": _fonte_price,
+    "v7": _fonte_v7,
+    "history": _fonte_history,
+}
+DISJUNTORES = {nome: Disjuntor(nome) for nome in FONTES}
+
+
+# ==================================================
+# 🧭 Gerenciador de fontes (mais rápida e saudável primeiro)
+# ==================================================
+class GerenciadorFontes:
+    """
+    Guarda as últimas `janela` chamadas de cada fonte (latência e erro) e
+    ordena as fontes pela latência média, penalizada pela taxa de erro.
+    Fontes com disjuntor aberto ficam de fora; fontes sem medições
+    recentes (mais velhas que `validade` segundos) voltam para a ordem
+    padrão, para serem medidas de novo. A ausência de cada ticker é
+    acompanhada à parte: um ticker que nenhuma fonte cota (delistado,
+    digitado errado) não derruba as fontes.
+    """
+
+    def __init__(self, fontes: dict, disjuntores: dict, janela: int = 20, validade: float = 300.0,
+                 penalidade_erro: float = 4.0, relogio=time.monotonic):
+        self.fontes = fontes
+        self.disjuntores = disjuntores
+        self.janela = janela
+        self.validade = validade
+        self.penalidade_erro = penalidade_erro
+        self.relogio = relogio
+        self._amostras: dict[str, deque] = {nome: deque(maxlen=janela) for nome in fontes}
+        self._ausente_em: dict[str, set[str]] = {}  # ticker → fontes que responderam sem ele
+        self._lock = threading.Lock()
+
+    def registrar(self, nome: str, latencia: float, ok: bool) -> None:
+        with self._lock:
+            self._amostras[nome].append((self.relogio(), latencia, ok))
+
+    def sem_cotacao(self) -> list[str]:
+        """Tickers que todas as fontes já devolveram sem preço (desde a última cotação)."""
+        with self._lock:
+            return sorted(t for t, fontes in self._ausente_em.items() if len(fontes) >= len(self.fontes))
+
+    def _anotar_ausentes(self, nome: str, simbolos: list[str], achados: dict[str, float]) -> list[str]:
+        """
+        Registra quem a fonte `nome` devolveu sem preço e retorna os que
+        ainda podem ser cotados (antes desta resposta nem todas as fontes
+        tinham deixado o ticker de fora).
+        """
+        cotaveis = []
+        with self._lock:
+            for t in simbolos:
+                if t in achados:
+                    self._ausente_em.pop(t, None)
+                    continue
+                fontes = self._ausente_em.setdefault(t, set())
+                if len(fontes) < len(self.fontes):
+                    cotaveis.append(t)
+                fontes.add(nome)
+        return cotaveis
+
+    def estatisticas(self, nome: str) -> dict:
+        """Latência média (s) e taxa de erro das amostras ainda válidas."""
+        limite = self.relogio() - self.validade
+        with self._lock:
+            amostras = [a for a in self._amostras[nome] if a[0] >= limite]
+        if not amostras:
+            return {"amostras": 0, "latencia": None, "taxa_erro": 0.0}
+        return {
+            "amostras": len(amostras),
+            "latencia": sum(a[1] for a in amostras) / len(amostras),
+            "taxa_erro": sum(1 for a in amostras if not a[2]) / len(amostras),
+        }
+
+    def ordem(self, nomes: tuple[str, ...] | None = None) -> list[str]:
+        """Fontes disponíveis, da melhor para a pior."""
+        nomes = tuple(nomes or self.fontes)
+        medidas, sem_medida = [], []
+        for posicao, nome in enumerate(nomes):
+            if not self.disjuntores[nome].permite():
+                continue
+            est = self.estatisticas(nome)
+            if est["latencia"] is None:
+                sem_medida.append((posicao, nome))
+            else:
+                custo = est["latencia"] * (1 + self.penalidade_erro * est["taxa_erro"])
+                medidas.append((custo, posicao, nome))
+        medidas.sort()
+        # Fonte sem medição entra na sua posição padrão (a primeira vez sempre é testada)
+        ordem = [nome for _, _, nome in medidas]
+        for posicao, nome in sem_medida:
+            ordem.insert(min(posicao, len(ordem)), nome)
+        return ordem
+
+    def chamar(self, nome: str, simbolos: list[str], timeout: float) -> dict[str, float]:
+        """
+        Chama a fonte medindo latência. Conta como falha — a mesma
+        verificação vale para a ordem e para o disjuntor — o erro e o lote
+        de vários tickers cotáveis que volta vazio; um ticker sozinho sem
+        preço é só anotado como ausente (ver `sem_cotacao`).
+        """
+        inicio = self.relogio()
+        achados: dict[str, float] = {}
+        erro: Exception | None = None
+        try:
+            achados = self.fontes[nome](simbolos, timeout=timeout)
+        except Exception as e:
+            erro = e
+        latencia = self.relogio() - inicio
+        cotaveis = self._anotar_ausentes(nome, simbolos, achados) if erro is None else []
+        # yahooquery não levanta erro quando a fonte não devolve nada
+        ok = erro is None and (bool(achados) or len(cotaveis) < 2)
+
+        self.registrar(nome, latencia, ok)
+        if ok:
+            self.disjuntores[nome].sucesso()
+        else:
+            self.disjuntores[nome].falha()
+            COTACAO_FALHAS.inc(fonte=nome)
+        COTACAO_SEGUNDOS.observar(latencia, fonte=nome)
+        if erro is not None:
+            raise erro
+        return achados
+
+    def saude(self) -> dict:
+        return {
+            nome: dict(
+                self.estatisticas(nome),
+                aberto=self.disjuntores[nome].aberto,
+                falhas_seguidas=self.disjuntores[nome].falhas_seguidas,
+            )
+            for nome in self.fontes
+        }
+
+
+GERENCIADOR_FONTES = GerenciadorFontes(FONTES, DISJUNTORES)
+
+
+class SemCotacao(Exception):
+    """Nenhuma fonte devolveu preço para os tickers pedidos (dispara nova rodada)."""
+
+
+def _buscar(
+    simbolos: list[str],
+    orcamento: float,
+    tentativas: int = PRICE_RETRY_ATTEMPTS,
+    fontes: tuple[str, ...] = tuple(FONTES),
+) -> dict[str, float]:
+    """
+    Percorre as fontes, da mais rápida e saudável para a pior (ver
+    `GerenciadorFontes`; as com disjuntor aberto ficam de fora), até cobrir os
+    tickers, repetindo a rodada enquanto houver orçamento. Nunca passa de
+    `orcamento` segundos, nem nas esperas entre rodadas.
+    """
+    limite = time.monotonic() + orcamento
+    precos: dict[str, float] = {}
+    faltando = list(simbolos)
+
+    def _espera(estado_retry) -> float:
+        # backoff exponencial curto, limitado ao que resta do orçamento
+        return max(0.0, min(0.5 * 2 ** (estado_retry.attempt_number - 1), limite - time.monotonic() - 1.0))
+
+    try:
+        for tentativa in Retrying(
+            stop=stop_after_attempt(max(1, tentativas)) | stop_after_delay(orcamento),
+            wait=_espera,
+            retry=retry_if_exception_type(SemCotacao),
+        ):
+            with tentativa:
+                for nome in GERENCIADOR_FONTES.ordem(fontes):
+                    restante = limite - time.monotonic()
+                    if not faltando or restante <= 0.5:
+                        break
+                    try:
+                        achados = GERENCIADOR_FONTES.chamar(nome, faltando, timeout=restante)
+                    except Exception as e:
+                        log(f"Fonte '{nome}' falhou ({len(faltando)} ticker(s)): {e}", "⚠️")
+                        continue
+                    precos.update(achados)
+                    faltando = [t for t in faltando if t not in precos]
+                if faltando:
+                    raise SemCotacao(faltando)
+    except RetryError:
+        pass
+
+    return precos
+
 
 # ==================================================
 # ⚙️ Função principal de preço atual
 # ==================================================
+def obter_preco_atual(ticker_symbol: str, orcamento: float = PRICE_FETCH_DEADLINE) -> float:
+    """
+    Retorna o preço atual do ativo (fontes na ordem do `GERENCIADOR_FONTES`).
+    As novas tentativas respeitam o `orcamento` em segundos; -1.0 se falhar.
+    """
+    return _buscar([ticker_symbol], orcamento).get(ticker_symbol, -1.0)
+
+
+# ==================================================
+# ⚡ Cache de cotações compartilhado (TTL + LRU)
+# ==================================================
+class CacheCotacoes:
+    """
+    Cache em memória de cotações, com validade (TTL), descarte do
+    menos usado (LRU) e contadores de acertos/erros.
+    Serve todos os robôs quando rodam no mesmo processo.
+    """
+
+    def __init__(self, ttl: float = PRICE_CACHE_TTL, max_itens: int = PRICE_CACHE_MAX):
+        self.ttl = ttl
+        self.max_itens = max_itens
+        self.hits = 0
+        self.misses = 0
+        self._itens: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obter(self, tickers: list[str]) -> dict[str, float]:
+        """Retorna somente os tickers com cotação válida no cache."""
+        return {t: preco for t, (preco, _) in self.obter_com_instantes(tickers).items()}
+
+    def obter_com_instantes(self, tickers: list[str]) -> dict[str, tuple[float, float]]:
+        """Como `obter`, com o instante (epoch) em que cada cotação foi buscada."""
+        agora = time.time()
+        achados = {}
+        with self._lock:
+            for t in tickers:
+                item = self._itens.get(t)
+                if item and agora - item[1] <= self.ttl:
+                    self._itens.move_to_end(t)
+                    achados[t] = item
+                    self.hits += 1
+                else:
+                    self._itens.pop(t, None)
+                    self.misses += 1
+        return achados
+
+    def gravar(self, precos: dict[str, float], instante: float | None = None) -> None:
+        """Grava as cotações buscadas em `instante` (padrão: agora)."""
+        agora = instante or time.time()
+        with self._lock:
+            for t, p in precos.items():
+                if p > 0:
+                    self._itens[t] = (p, agora)
+                    self._itens.move_to_end(t)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+
+    def estatisticas(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "taxa_acerto": self.hits / total if total else 0.0,
+            "itens": len(self),
+        }
+
+    def __len__(self) -> int:
+        return len(self._itens)
+
+
+class CacheCotacoesArquivo(CacheCotacoes):
+    """
+    Mesmo cache, porém gravado em um arquivo SQLite local para ser
+    compartilhado entre os subprocessos do `robots_master`.
+    """
 
-@retry(
-    stop=stop_after_attempt(5),
-    wait=wait_exponential(multiplier=1, min=2, max=30),
-    retry=retry_if_exception_type(Exception),
+    def __init__(self, caminho: str, ttl: float = PRICE_CACHE_TTL, max_itens: int = PRICE_CACHE_MAX):
+        super().__init__(ttl, max_itens)
+        self.caminho = caminho
+        with self._conectar() as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS cotacoes ("
+                "ticker TEXT PRIMARY KEY, preco REAL, gravado_em REAL, usado_em REAL)"
+            )
+
+    def _conectar(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.caminho, timeout=5)
+
+    def obter_com_instantes(self, tickers: list[str]) -> dict[str, tuple[float, float]]:
+        if not tickers:
+            return {}
+        agora = time.time()
+        marcas = ",".join("?" * len(tickers))
+        try:
+            with self._lock, self._conectar() as con:
+                linhas = con.execute(
+                    f"SELECT ticker, preco, gravado_em FROM cotacoes WHERE ticker IN ({marcas}) AND gravado_em >= ?",
+                    (*tickers, agora - self.ttl),
+                ).fetchall()
+                achados = {t: (p, g) for t, p, g in linhas}
+                if achados:
+                    con.executemany(
+                        "UPDATE cotacoes SET usado_em = ? WHERE ticker = ?",
+                        [(agora, t) for t in achados],
+                    )
+        except sqlite3.Error as e:
+            log(f"Erro ao ler cache de cotações: {e}", "⚠️")
+            achados = {}
+
+        self.hits += len(achados)
+        self.misses += len(tickers) - len(achados)
+        return achados
+
+    def gravar(self, precos: dict[str, float], instante: float | None = None) -> None:
+        agora = time.time()
+        linhas = [(t, p, instante or agora, agora) for t, p in precos.items() if p > 0]
+        if not linhas:
+            return
+        try:
+            with self._lock, self._conectar() as con:
+                con.executemany("INSERT OR REPLACE INTO cotacoes VALUES (?, ?, ?, ?)", linhas)
+                con.execute(
+                    "DELETE FROM cotacoes WHERE ticker NOT IN "
+                    "(SELECT ticker FROM cotacoes ORDER BY usado_em DESC LIMIT ?)",
+                    (self.max_itens,),
+                )
+        except sqlite3.Error as e:
+            log(f"Erro ao gravar cache de cotações: {e}", "⚠️")
+
+    def __len__(self) -> int:
+        try:
+            with self._conectar() as con:
+                return con.execute("SELECT COUNT(*) FROM cotacoes").fetchone()[0]
+        except sqlite3.Error:
+            return 0
+
+
+CACHE_COTACOES: CacheCotacoes = (
+    CacheCotacoesArquivo(PRICE_CACHE_PATH) if PRICE_CACHE_PATH else CacheCotacoes()
 )
-def obter_preco_atual(ticker_symbol: str) -> float:
+
+
+# ==================================================
+# 🧵 Busca individual concorrente (com prazo)
+# ==================================================
+# Pool único por processo: limita as requisições simultâneas de todos os robôs
+_POOL_BUSCAS = ThreadPoolExecutor(max_workers=PRICE_FETCH_WORKERS, thread_name_prefix="precos")
+
+
+def obter_precos_concorrente(tickers: list[str], prazo: float = PRICE_FETCH_DEADLINE) -> dict[str, float]:
     """
-    Retorna o preço atual do ativo usando YahooQuery.
-    Se falhar, tenta várias vezes antes de desistir.
+    Busca cada ticker com `obter_preco_atual` em paralelo (até
+    PRICE_FETCH_WORKERS ao mesmo tempo). Quem não responder dentro de
+    `prazo` segundos volta com -1.0; o ciclo não espera pelo mais lento.
+    O prazo é um só para todos: quem espera na fila do pool começa com o
+    que sobrou dele, e não com `prazo` cheio.
     """
-    try:
-        tk = Ticker(ticker_symbol)
-        p = tk.price.get(ticker_symbol, {}).get("regularMarketPrice")
-        if p is not None:
-            return float(p)
+    limite = time.monotonic() + prazo
 
-        # fallback se o campo regularMarketPrice não existir
-        hist = tk.history(period="1d")
-        if isinstance(hist, pd.DataFrame) and not hist.empty:
-            preco = hist["close"].iloc[-1]
-            return float(preco)
+    def _buscar_ate_o_limite(ticker: str) -> float:
+        restante = limite - time.monotonic()
+        if restante <= 0.5:
+            return -1.0
+        return obter_preco_atual(ticker, restante)
 
-    except Exception as e:
-        print(f"⚠️ Erro ao obter preço de {ticker_symbol}: {e}")
+    futuros = {t: _POOL_BUSCAS.submit(_buscar_ate_o_limite, t) for t in tickers}
+    wait(futuros.values(), timeout=max(0.0, limite - time.monotonic()))
 
-    # última tentativa via API pública do Yahoo Finance (fallback bruto)
-    try:
-        url = f"https://query1.finance.yahoo.com/v7/finance/quote?symbols={ticker_symbol}"
-        resp = requests.get(url, timeout=10)
-        if resp.status_code == 200:
-            data = resp.json()
-            p = data["quoteResponse"]["result"][0]["regularMarketPrice"]
-            if p:
-                return float(p)
-    except Exception as e:
-        print(f"⚠️ Erro fallback Yahoo API: {e}")
+    precos = {}
+    for t, f in futuros.items():
+        if f.done() and not f.exception():
+            precos[t] = f.result()
+        else:
+            if not f.done():
+                f.cancel()
+                log(f"{t} não respondeu em {prazo:.0f}s — ignorado neste ciclo.", "⚠️")
+            precos[t] = -1.0
+    return precos
+
+
+# ==================================================
+# 📦 Cotação em lote (vários tickers, uma requisição)
+# ==================================================
+def obter_precos(tickers: list[str]) -> dict[str, float]:
+    """
+    Retorna {ticker: preço} para todos os tickers, lendo primeiro o
+    cache compartilhado e buscando o restante em um único
+    `Ticker([...]).price` do YahooQuery (API v7 em lote como failover).
+    Tudo dentro do orçamento PRICE_FETCH_DEADLINE.
+    Tickers sem cotação são informados um a um e voltam com -1.0,
+    sem afetar os demais.
+    """
+    return obter_precos_com_instantes(tickers)[0]
+
+
+def obter_precos_com_instantes(tickers: list[str]) -> tuple[dict[str, float], dict[str, float]]:
+    """
+    Como `obter_precos`, devolvendo também o instante (epoch) de cada
+    cotação: o da busca original para quem veio do cache, agora para o resto.
+    """
+    simbolos = list(dict.fromkeys(t for t in tickers if t))
+    precos: dict[str, float] = {t: -1.0 for t in simbolos}
+    instantes: dict[str, float] = {}
+    for t, (preco, instante) in CACHE_COTACOES.obter_com_instantes(simbolos).items():
+        precos[t] = preco
+        instantes[t] = instante
+    simbolos = [t for t in simbolos if precos[t] <= 0]
+    if not simbolos:
+        return precos, instantes
+
+    # Todo o restante cabe no orçamento do ciclo
+    limite = time.monotonic() + PRICE_FETCH_DEADLINE
+
+    # Uma rodada em lote pelas fontes que aceitam vários tickers por requisição
+    precos.update(_buscar(simbolos, PRICE_FETCH_DEADLINE / 2, tentativas=1, fontes=("price", "v7")))
+
+    # o que ainda faltar: busca individual concorrente, com o que sobrou do orçamento
+    faltando = [t for t in simbolos if precos[t] <= 0]
+    restante = limite - time.monotonic()
+    if faltando and restante > 1:
+        precos.update(obter_precos_concorrente(faltando, prazo=restante))
+
+    for t in simbolos:
+        if precos[t] <= 0:
+            COTACAO_SEM_PRECO.inc()
+            log(f"Sem cotação para {t}.", "⚠️")
+
+    agora = time.time()
+    instantes.update((t, agora) for t in simbolos)
+    CACHE_COTACOES.gravar({t: precos[t] for t in simbolos}, agora)
+    return precos, instantes
+
+
+# ==================================================
+# 📸 Fotografia das cotações de um ciclo
+# ==================================================
+def ticker_yahoo(ticker: str) -> str:
+    """Converte 'PETR4' em 'PETR4.SA' (mantém quem já tem o sufixo)."""
+    return ticker if ticker.endswith(".SA") else f"{ticker}.SA"
+
+
+class CotacoesCiclo:
+    """
+    Cotações buscadas uma única vez por ciclo e lidas tanto pelo log
+    quanto pela verificação dos alvos (mesmo preço, mesmo instante).
+    Cada cotação guarda o seu instante: uma que veio do cache vale pelo
+    momento em que foi buscada, não pelo ciclo que a leu.
+    """
+
+    def __init__(self, tickers: list[str], provedor=None):
+        """`provedor`: um `core.providers.ProvedorCotacoes` (padrão: Yahoo direto)."""
+        simbolos = [ticker_yahoo(t) for t in tickers]
+        if provedor is None:
+            self._precos, self._instantes = obter_precos_com_instantes(simbolos)
+            self.momento = time.time()
+        else:
+            self._precos = provedor.cotacoes(simbolos)
+            self._instantes = provedor.instantes()
+            self.momento = provedor.momento()
+
+    def preco(self, ticker: str) -> float:
+        """Preço do ticker nesta fotografia (-1.0 se não houver cotação)."""
+        return self._precos.get(ticker_yahoo(ticker), -1.0)
+
+    def vetor(self, tickers: list[str]) -> np.ndarray:
+        """Preços dos tickers, na ordem pedida, como vetor NumPy (-1.0 sem cotação)."""
+        precos = self._precos
+        return np.fromiter((precos.get(ticker_yahoo(t), -1.0) for t in tickers), dtype=float, count=len(tickers))
+
+    def instantes(self, tickers: list[str]) -> np.ndarray:
+        """Instante (epoch) de cada cotação, na ordem pedida (usado na contagem de tempo na zona)."""
+        instantes, momento = self._instantes, self.momento
+        return np.fromiter((instantes.get(ticker_yahoo(t), momento) for t in tickers), dtype=float, count=len(tickers))
 
-    # Se tudo falhar
-    return -1.0
+    def __len__(self) -> int:
+        return len(self._precos)
 
 
 # ==================================================
@@ -59,7 +586,7 @@ def testar_ticker(ticker: str):
     """
     preco = obter_preco_atual(ticker)
     if preco > 0:
-        print(f"✅ {ticker}: R$ {preco:.2f}")
+        log(f"{ticker}: R$ {preco:.2f}", "✅")
     else:
-        print(f"❌ Falha ao obter preço de {ticker}")
+        log(f"Falha ao obter preço de {ticker}", "❌")
 
@@ -0,0 +1,240 @@
+# core/providers.py
+"""
+📡 Provedores de cotações.
+Os robôs dependem de um `ProvedorCotacoes` (cotações em lote, histórico e
+saúde), e não do Yahoo diretamente. Assim dá para rodar offline com ticks
+gravados (replay) ou sintéticos e trocar a fonte sem mexer nos robôs.
+"""
+from __future__ import annotations
+
+import os
+import random
+import time
+import zlib
+from abc import ABC, abstractmethod
+
+import pandas as pd
+
+from core.prices import obter_precos_com_instantes, ticker_yahoo, GERENCIADOR_FONTES, CACHE_COTACOES
+
+
+# ==================================================
+# 🧩 Interface
+# ==================================================
+class ProvedorCotacoes(ABC):
+    nome = "base"
+
+    @abstractmethod
+    def cotacoes(self, tickers: list[str]) -> dict[str, float]:
+        """{ticker: preço} para os tickers pedidos (-1.0 se não houver)."""
+
+    def momento(self) -> float:
+        """Instante (epoch) das últimas cotações devolvidas."""
+        return time.time()
+
+    def instantes(self) -> dict[str, float]:
+        """Instante de cada cotação da última chamada, quando difere de `momento()`."""
+        return {}
+
+    def historico(self, ticker: str, periodo: str = "1d", intervalo: str = "1m") -> pd.DataFrame:
+        """Barras com índice de data/hora e coluna `close` (vazio: provedor sem histórico)."""
+        return pd.DataFrame(columns=["close"])
+
+    def saude(self) -> dict:
+        return {"nome": self.nome, "ok": True}
+
+
+# ==================================================
+# 🌐 Yahoo (produção)
+# ==================================================
+class ProvedorYahoo(ProvedorCotacoes):
+    nome = "yahoo"
+
+    def __init__(self):
+        self._instantes: dict[str, float] = {}
+        self._momento = time.time()
+
+    def cotacoes(self, tickers: list[str]) -> dict[str, float]:
+        # Cotação vinda do cache vale pelo instante em que foi buscada
+        precos, self._instantes = obter_precos_com_instantes(tickers)
+        self._momento = time.time()
+        return precos
+
+    def momento(self) -> float:
+        return self._momento
+
+    def instantes(self) -> dict[str, float]:
+        return self._instantes
+
+    def historico(self, ticker: str, periodo: str = "1d", intervalo: str = "1m") -> pd.DataFrame:
+        from yahooquery import Ticker
+
+        hist = Ticker(ticker).history(period=periodo, interval=intervalo)
+        if not isinstance(hist, pd.DataFrame) or hist.empty:
+            return pd.DataFrame(columns=["close"])
+        if isinstance(hist.index, pd.MultiIndex):
+            hist = hist.xs(ticker, level="symbol")
+        return hist[["close"]]
+
+    def saude(self) -> dict:
+        fontes = GERENCIADOR_FONTES.saude()
+        return {
+            "nome": self.nome,
+            "ok": not all(f["aberto"] for f in fontes.values()),
+            "fontes": fontes,
+            "ordem": GERENCIADOR_FONTES.ordem(),
+            "sem_cotacao": GERENCIADOR_FONTES.sem_cotacao(),
+            "cache": CACHE_COTACOES.estatisticas(),
+        }
+
+
+# ==================================================
+# 📼 Replay de ticks gravados (CSV/Parquet)
+# ==================================================
+def ler_ticks(caminho: str | None = None, ticks: pd.DataFrame | None = None) -> pd.DataFrame:
+    """
+    Ticks gravados (CSV/Parquet ou DataFrame) com colunas `ticker`,
+    `timestamp` e `preco` (ou `symbol`/`close`), normalizados: símbolo do
+    Yahoo, timestamp em UTC e ordem cronológica.
+    """
+    if ticks is None:
+        if caminho is None:
+            raise ValueError("Informe `caminho` ou `ticks` para o replay.")
+        ticks = pd.read_parquet(caminho) if str(caminho).endswith(".parquet") else pd.read_csv(caminho)
+
+    ticks = ticks.rename(columns={"close": "preco", "symbol": "ticker"})
+    ticks = ticks[["ticker", "timestamp", "preco"]].copy()
+    ticks["ticker"] = ticks["ticker"].astype(str).map(ticker_yahoo)
+    ticks["timestamp"] = pd.to_datetime(ticks["timestamp"], utc=True)
+    return ticks.sort_values("timestamp", kind="stable")
+
+
+class ProvedorReplay(ProvedorCotacoes):
+    """
+    Lê ticks de um arquivo com colunas `ticker`, `timestamp` e `preco`
+    (ou `close`). Cada chamada a `cotacoes()` avança o relógio do replay
+    para o próximo instante gravado e devolve o último preço conhecido de
+    cada ticker até ali.
+    """
+
+    nome = "replay"
+
+    def __init__(self, caminho: str | None = None, ticks: pd.DataFrame | None = None, repetir: bool = False):
+        ticks = ler_ticks(caminho, ticks)
+
+        # Tabela larga: uma linha por instante, último preço conhecido de cada ticker
+        self._largo = ticks.pivot_table(index="timestamp", columns="ticker", values="preco", aggfunc="last").ffill()
+        self._instantes = self._largo.index
+        self._ticks = ticks
+        self.repetir = repetir
+        self.posicao = -1
+
+    def avancar(self) -> bool:
+        """Vai para o próximo instante. Retorna False no fim do arquivo."""
+        if self.posicao + 1 < len(self._instantes):
+            self.posicao += 1
+            return True
+        if self.repetir and len(self._instantes):
+            self.posicao = 0
+            return True
+        return False
+
+    @property
+    def fim(self) -> bool:
+        return self.posicao >= len(self._instantes) - 1 and not self.repetir
+
+    def cotacoes(self, tickers: list[str]) -> dict[str, float]:
+        self.avancar()
+        if self.posicao < 0:
+            return {t: -1.0 for t in tickers}
+        linha = self._largo.iloc[self.posicao]
+        precos = {}
+        for t in tickers:
+            p = linha.get(ticker_yahoo(t))
+            precos[t] = float(p) if p is not None and pd.notna(p) else -1.0
+        return precos
+
+    def momento(self) -> float:
+        if self.posicao < 0:
+            return time.time()
+        return self._instantes[self.posicao].timestamp()
+
+    def historico(self, ticker: str, periodo: str = "1d", intervalo: str = "1m") -> pd.DataFrame:
+        dados = self._ticks[self._ticks["ticker"] == ticker_yahoo(ticker)]
+        return dados.set_index("timestamp")[["preco"]].rename(columns={"preco": "close"})
+
+    def saude(self) -> dict:
+        return {
+            "nome": self.nome,
+            "ok": not self.fim,
+            "instantes": len(self._instantes),
+            "posicao": self.posicao,
+        }
+
+
+# ==================================================
+# 🎲 Sintético determinístico
+# ==================================================
+class ProvedorSintetico(ProvedorCotacoes):
+    """
+    Passeio aleatório por ticker, reproduzível (mesma semente → mesmos
+    preços). Cada chamada a `cotacoes()` avança `passo` segundos.
+    """
+
+    nome = "sintetico"
+
+    def __init__(self, semente: int = 42, volatilidade: float = 0.002, passo: float = 60.0, inicio: float = 1_700_000_000.0):
+        self.semente = semente
+        self.volatilidade = volatilidade
+        self.passo = passo
+        self.inicio = inicio
+        self.passos = 0
+        self._precos: dict[str, float] = {}
+        self._rngs: dict[str, random.Random] = {}
+
+    def _rng(self, ticker: str) -> random.Random:
+        rng = self._rngs.get(ticker)
+        if rng is None:
+            rng = random.Random(self.semente * 1_000_003 + zlib.crc32(ticker.encode()))
+            self._rngs[ticker] = rng
+            self._precos[ticker] = round(rng.uniform(5, 100), 2)
+        return rng
+
+    def cotacoes(self, tickers: list[str]) -> dict[str, float]:
+        self.passos += 1
+        precos = {}
+        for t in tickers:
+            rng = self._rng(t)
+            self._precos[t] = round(self._precos[t] * (1 + rng.gauss(0, self.volatilidade)), 4)
+            precos[t] = self._precos[t]
+        return precos
+
+    def momento(self) -> float:
+        return self.inicio + self.passos * self.passo
+
+    def historico(self, ticker: str, periodo: str = "1d", intervalo: str = "1m") -> pd.DataFrame:
+        rng = random.Random(self.semente * 1_000_003 + zlib.crc32(ticker.encode()))
+        preco = rng.uniform(5, 100)
+        barras = 390 if periodo == "1d" else 390 * 5
+        instantes = pd.date_range(pd.Timestamp(self.inicio, unit="s", tz="UTC"), periods=barras, freq="1min")
+        closes = []
+        for _ in range(barras):
+            preco *= 1 + rng.gauss(0, self.volatilidade)
+            closes.append(round(preco, 4))
+        return pd.DataFrame({"close": closes}, index=instantes)
+
+
+# ==================================================
+# 🏭 Escolha do provedor
+# ==================================================
+def criar_provedor(nome: str | None = None) -> ProvedorCotacoes:
+    """
+    MARKET_DATA_PROVIDER = yahoo (padrão) | replay | sintetico.
+    O replay lê o arquivo de MARKET_DATA_REPLAY_PATH.
+    """
+    nome = (nome or os.getenv("MARKET_DATA_PROVIDER", "yahoo")).strip().lower()
+    if nome == "replay":
+        return ProvedorReplay(os.getenv("MARKET_DATA_REPLAY_PATH"))
+    if nome == "sintetico":
+        return ProvedorSintetico(semente=int(os.getenv("MARKET_DATA_SEED", "42")))
+    return ProvedorYahoo()
@@ -1,5 +1,6 @@
 # core/schedule.py
 import datetime
+import time
 from zoneinfo import ZoneInfo
 from core.config import TZ, HORARIO_INICIO_PREGAO, HORARIO_FIM_PREGAO
 
@@ -63,3 +64,45 @@ def formatar_duracao(segundos: int) -> str:
     """Formata segundos em HH:MM:SS (ex: 3:15:08)."""
     return str(datetime.timedelta(seconds=segundos))
 
+
+# ==================================================
+# ⏱️ AGENDADOR SEM DERIVA (relógio monotônico)
+# ==================================================
+class Agendador:
+    """
+    Mantém os ciclos em prazos fixos: início, início + intervalo, ...
+    O tempo gasto no ciclo (busca, retries, Supabase) é descontado da espera.
+    Se o ciclo passar do prazo, o próximo começa na hora e o atraso é contado.
+    """
+
+    def __init__(self, intervalo: float, relogio=time.monotonic):
+        self.intervalo = intervalo
+        self._relogio = relogio
+        self.prazo = None           # instante (monotônico) do ciclo atual
+        self.ciclos = 0
+        self.atrasos = 0
+        self.ultimo_atraso = 0.0
+        self.atraso_total = 0.0
+
+    def inicio(self) -> None:
+        """Chamar no começo de cada ciclo."""
+        if self.prazo is None:
+            self.prazo = self._relogio()
+
+    def espera(self) -> float:
+        """Chamar no fim de cada ciclo: segundos até o próximo prazo (0 se atrasado)."""
+        agora = self._relogio()
+        if self.prazo is None:
+            self.prazo = agora
+        self.prazo += self.intervalo
+        self.ciclos += 1
+
+        if agora <= self.prazo:
+            self.ultimo_atraso = 0.0
+            return self.prazo - agora
+
+        self.ultimo_atraso = agora - self.prazo
+        self.atrasos += 1
+        self.atraso_total += self.ultimo_atraso
+        self.prazo = agora
+        return 0.0
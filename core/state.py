@@ -1,23 +1,46 @@
 # core/state.py (versão segura)
 from __future__ import annotations
+import atexit
 import json
-from typing import Optional
+import os
+import signal
+import threading
+import time
+from typing import Callable, Optional
 from supabase import create_client, Client
-from core.config import ROBOTS
+from core.config import ROBOTS, STATE_WRITE_BEHIND, STATE_JOURNAL_DIR
+from core.logger import log
+from core.metrics import SUPABASE_SEGUNDOS, SUPABASE_BYTES, ESTADO_AGRUPADAS
 import datetime
 
 # ==================================================
-# 🔗 Conexões Supabase dinâmicas por robô
+# 🔗 Conexões Supabase por robô (criadas sob demanda)
 # ==================================================
+# Cada processo só cria o cliente do(s) robô(s) que de fato usa; o cliente
+# fica em cache e reaproveita o pool HTTP nas chamadas seguintes.
 SUPABASES: dict[str, Client] = {}
-for nome, cfg in ROBOTS.items():
+_SUPABASES_LOCK = threading.Lock()
+
+
+def _cliente_supabase(nome: str) -> Optional[Client]:
+    sb = SUPABASES.get(nome)
+    if sb is not None:
+        return sb
+
+    cfg = ROBOTS.get(nome, {})
     url = cfg.get("SUPABASE_URL")
     key = cfg.get("SUPABASE_KEY")
-    if url and key:
-        try:
-            SUPABASES[nome] = create_client(url, key)
-        except Exception as e:
-            print(f"⚠️ Erro ao criar cliente Supabase para '{nome}': {e}")
+    if not (url and key):
+        return None
+
+    with _SUPABASES_LOCK:
+        if nome not in SUPABASES:
+            try:
+                SUPABASES[nome] = create_client(url, key)
+            except Exception as e:
+                log(f"Erro ao criar cliente Supabase para '{nome}': {e}", "⚠️")
+                return None
+        return SUPABASES[nome]
 
 # ==================================================
 # 🗂️ Mapeamento fixo das tabelas Supabase
@@ -38,11 +61,66 @@ DEFAULT_STATE = {
     "status": {},
 }
 
+# ==================================================
+# 🧾 Controle de alterações (o que a nuvem já tem)
+# ==================================================
+# Por chave: {campo: JSON canônico do valor que está no Supabase}
+_PERSISTIDO: dict[str, dict[str, str]] = {}
+
+# Por chave: `updated_at` da linha que temos em memória (None = desconhecido)
+_VERSAO: dict[str, Optional[str]] = {}
+
+# Campos de auditoria: mudam a cada escrita e não contam como alteração
+_CAMPOS_AUDITORIA = ("_last_writer", "_last_writer_ts")
+
+# Funções SQL opcionais (ver sql/kv_state_functions.sql); viram False se não existirem no banco
+_RPC_DISPONIVEL = {"kv_state_merge": True, "kv_state_remove_ticker": True}
+
+
+def _rpc(sb: Client, funcao: str, params: dict):
+    """
+    Chama uma função SQL do Supabase. Se ela não estiver instalada no banco,
+    marca como indisponível para não tentar de novo. Propaga o erro.
+    """
+    try:
+        return sb.rpc(funcao, params).execute()
+    except Exception as e:
+        if funcao in str(e) or "PGRST202" in str(e):
+            _RPC_DISPONIVEL[funcao] = False
+        raise
+
+
+def _registrar_escrita(chave: str, res) -> None:
+    """
+    Atualiza a versão conhecida após uma escrita nossa. Só adota o novo
+    `updated_at` se ninguém (ex.: o painel) escreveu desde a nossa leitura;
+    caso contrário força um recarregamento no próximo ciclo.
+    """
+    dados = res.data if isinstance(getattr(res, "data", None), dict) else {}
+    if dados.get("anterior") is not None and dados.get("anterior") == _VERSAO.get(chave):
+        _VERSAO[chave] = dados.get("updated_at")
+    else:
+        _VERSAO[chave] = None
+
+
+def _bytes(dados) -> int:
+    """Tamanho aproximado do JSON trafegado (para as métricas)."""
+    return len(json.dumps(dados, ensure_ascii=False, default=str).encode("utf-8"))
+
+
+def _impressao(estado: dict) -> dict[str, str]:
+    return {
+        campo: json.dumps(valor, sort_keys=True, ensure_ascii=False, default=str)
+        for campo, valor in estado.items()
+        if campo not in _CAMPOS_AUDITORIA
+    }
+
+
 def _sb_and_table(nome_robo: str) -> tuple[Client, str, str]:
     # Garante compatibilidade tanto com "curto" quanto com "curto_przo_v1"
     base_name = nome_robo.replace("_przo_v1", "").strip().lower()
     
-    sb: Optional[Client] = SUPABASES.get(base_name)
+    sb: Optional[Client] = _cliente_supabase(base_name)
     if not sb:
         raise ValueError(f"Supabase não configurado para '{nome_robo}'.")
     
@@ -53,6 +131,15 @@ def _sb_and_table(nome_robo: str) -> tuple[Client, str, str]:
     chave = f"{base_name}_przo_v1"
     return sb, tabela, chave
 
+
+def cliente_do_robo(nome_robo: str) -> Client:
+    """
+    Cliente Supabase do robô ('curto' ou 'curto_przo_v1'), para outras
+    tabelas do mesmo projeto (ex.: histórico de alertas).
+    Lança ValueError se o robô não estiver configurado.
+    """
+    return _sb_and_table(nome_robo)[0]
+
 # ==================================================
 # 📥 Carregar
 # ==================================================
@@ -61,102 +148,454 @@ def carregar_estado_duravel(nome_robo: str) -> Optional[dict]:
     Carrega o estado do robô a partir do registro-único (k = '<robo>_przo_v1').
     Retorna None se falhar (para evitar sobrescrever a nuvem por engano).
     """
-    print(f"🔄 Carregando estado do robô '{nome_robo}'...")
+    log(f"Carregando estado do robô '{nome_robo}'...", "🔄")
     try:
         sb, tabela, chave = _sb_and_table(nome_robo)
     except Exception as e:
-        print(f"⚠️ {e}")
+        log(f"{e}", "⚠️")
         return None
 
     try:
-        res = sb.table(tabela).select("k,v,updated_at").eq("k", chave).execute()
-        if res.data:
-            estado = res.data[0]["v"]
+        with _trava(chave):
+            with SUPABASE_SEGUNDOS.medir(operacao="carregar"):
+                res = sb.table(tabela).select("k,v,updated_at").eq("k", chave).execute()
+            SUPABASE_BYTES.inc(_bytes(res.data), operacao="carregar", direcao="recebido")
+            estado = res.data[0]["v"] if res.data else None
             if isinstance(estado, dict):
-                print(f"✅ Estado carregado ({len(estado)} chaves).")
-                return estado
-        print("ℹ️ Nenhum estado encontrado — usando defaults temporários.")
-        return DEFAULT_STATE.copy()
+                _PERSISTIDO[chave] = _impressao(estado)
+                _VERSAO[chave] = res.data[0].get("updated_at")
+                log(f"Estado carregado ({len(estado)} chaves).", "✅")
     except Exception as e:
-        print(f"⚠️ Erro ao carregar estado de {nome_robo}: {e}")
+        log(f"Erro ao carregar estado de {nome_robo}: {e}", "⚠️")
         return None
 
+    if not isinstance(estado, dict):
+        log("Nenhum estado encontrado — usando defaults temporários.", "ℹ️")
+        estado = DEFAULT_STATE.copy()
+    _reaplicar_diario(nome_robo, chave, estado)
+    return estado
+
+def carregar_estado_se_alterado(nome_robo: str) -> tuple[bool, Optional[dict]]:
+    """
+    Consulta só o `updated_at` da linha e recarrega o estado completo apenas
+    se ele mudou desde a última leitura/escrita deste processo.
+    Retorna (False, None) se nada mudou; (True, estado) caso contrário
+    (estado None em caso de falha, como em `carregar_estado_duravel`).
+    """
+    try:
+        sb, tabela, chave = _sb_and_table(nome_robo)
+    except Exception as e:
+        log(f"{e}", "⚠️")
+        return True, None
+
+    versao = _VERSAO.get(chave)
+    if versao is not None:
+        try:
+            with SUPABASE_SEGUNDOS.medir(operacao="versao"):
+                res = sb.table(tabela).select("updated_at").eq("k", chave).execute()
+            if res.data and res.data[0].get("updated_at") == versao:
+                return False, None
+        except Exception as e:
+            log(f"Erro ao verificar versão do estado de {nome_robo}: {e}", "⚠️")
+
+    return True, carregar_estado_duravel(nome_robo)
+
+
 # ==================================================
-# 💾 Salvar (SEGURO)
-# ==================================================
-# ==================================================
-# 💾 Salvar (SEGURO)
+# 💾 Salvar (SEGURO, só o que mudou)
 # ==================================================
+def _diferencas(chave: str, atual: dict[str, str]) -> Optional[tuple[list[str], list[str]]]:
+    """(alterados, removidos) em relação ao que a nuvem tem; None se nada mudou."""
+    anterior = _PERSISTIDO.get(chave)
+    if anterior is None:
+        return list(atual), []
+    alterados = [c for c, v in atual.items() if anterior.get(c) != v]
+    removidos = [c for c in anterior if c not in atual]
+    if not alterados and not removidos:
+        return None
+    return alterados, removidos
+
+
 def salvar_estado_duravel(nome_robo: str, estado: dict) -> None:
+    """
+    Persiste o estado do robô. Se nada mudou desde o último load/save, não
+    acessa a rede. Com STATE_WRITE_BEHIND > 0 a gravação entra no buffer:
+    várias chamadas dentro da janela viram uma só ida ao Supabase, feita
+    em segundo plano, e o diário local garante a gravação mesmo se o
+    processo cair antes do envio.
+    """
+
     try:
-        sb, tabela, chave = _sb_and_table(nome_robo)
+        _, _, chave = _sb_and_table(nome_robo)
     except Exception as e:
-        print(f"⚠️ {e}")
+        log(f"{e}", "⚠️")
         return
 
     if not isinstance(estado, dict) or not estado:
-        print(f"⛔ Estado vazio — salvamento ignorado ({nome_robo}).")
+        log(f"Estado vazio — salvamento ignorado ({nome_robo}).", "⛔")
         return
 
     ativos = estado.get("ativos", [])
     status = estado.get("status", {})
     if not ativos and not status:
-        print(f"🛑 Ignorado: estado sem ativos e sem status ({nome_robo}).")
+        log(f"Ignorado: estado sem ativos e sem status ({nome_robo}).", "🛑")
+        return
+
+    if STATE_WRITE_BEHIND <= 0:
+        _gravar_estado(nome_robo, estado)
         return
 
+    diferencas = _diferencas(chave, _impressao(estado))
+    with _PENDENTES_COND:
+        if diferencas is None:
+            # Voltou a ser igual ao que a nuvem tem: nada a enviar
+            if _PENDENTES.pop(chave, None) is not None:
+                _apagar_diario(chave)
+            return
+        alterados, removidos = diferencas
+        texto = _texto_diario({"nome_robo": nome_robo, "alterados": alterados, "removidos": removidos, "estado": estado})
+        _gravar_diario(chave, texto)
+        pendente = _PENDENTES.get(chave)
+        if pendente is not None:
+            pendente["texto"] = texto
+            ESTADO_AGRUPADAS.inc(robo=chave.replace("_przo_v1", ""))
+        else:
+            _PENDENTES[chave] = {
+                "nome_robo": nome_robo,
+                "texto": texto,
+                "prazo": time.monotonic() + STATE_WRITE_BEHIND,
+                "tentativas": 0,
+            }
+            _PENDENTES_COND.notify_all()
+    _iniciar_escritor()
+
+
+def _gravar_estado(nome_robo: str, estado: dict) -> bool:
+    """
+    Envia o estado ao Supabase: só os blocos alterados via RPC
+    `kv_state_merge` ou, sem ela, upsert completo. False se falhou.
+    """
+    try:
+        sb, tabela, chave = _sb_and_table(nome_robo)
+    except Exception as e:
+        log(f"{e}", "⚠️")
+        return False
+
+    ativos = estado.get("ativos", [])
+    atual = _impressao(estado)
+    diferencas = _diferencas(chave, atual)
+    if diferencas is None:
+        return True
+    alterados, removidos = diferencas
+    anterior = _PERSISTIDO.get(chave)
+
     estado["_last_writer"] = "robot_render"
     estado["_last_writer_ts"] = datetime.datetime.utcnow().isoformat()
 
     try:
-        sb.table(tabela).upsert({"k": chave, "v": estado}).execute()
+        if anterior is not None and not removidos and _RPC_DISPONIVEL["kv_state_merge"]:
+            patch = {c: estado[c] for c in (*alterados, *_CAMPOS_AUDITORIA)}
+            try:
+                with SUPABASE_SEGUNDOS.medir(operacao="salvar_parcial"):
+                    res = _rpc(sb, "kv_state_merge", {"p_tabela": tabela, "p_k": chave, "p_patch": patch})
+                SUPABASE_BYTES.inc(_bytes(patch), operacao="salvar_parcial", direcao="enviado")
+                _PERSISTIDO[chave] = atual
+                _registrar_escrita(chave, res)
+                log(f"Estado de '{nome_robo}' atualizado ({', '.join(alterados)}).", "💾")
+                return True
+            except Exception as e:
+                log(f"RPC kv_state_merge falhou ({e}) — usando upsert completo.", "⚠️")
+
+        with SUPABASE_SEGUNDOS.medir(operacao="salvar_completo"):
+            sb.table(tabela).upsert({"k": chave, "v": estado}).execute()
+        SUPABASE_BYTES.inc(_bytes(estado), operacao="salvar_completo", direcao="enviado")
+        _PERSISTIDO[chave] = atual
+        _VERSAO[chave] = None
         if ativos:
             resumo = ", ".join([f"{a['ticker']} (R$ {a.get('preco', 0):.2f})" for a in ativos])
-            print(f"💾 Estado de '{nome_robo}' salvo com sucesso ({len(ativos)} ativo(s)): {resumo}.")
+            log(f"Estado de '{nome_robo}' salvo com sucesso ({len(ativos)} ativo(s)): {resumo}.", "💾")
         else:
-            print(f"💾 Estado de '{nome_robo}' salvo com sucesso (nenhum ativo registrado).")
+            log(f"Estado de '{nome_robo}' salvo com sucesso (nenhum ativo registrado).", "💾")
+        return True
     except Exception as e:
-        print(f"⚠️ Erro ao salvar estado de {nome_robo}: {e}")
+        log(f"Erro ao salvar estado de {nome_robo}: {e}", "⚠️")
+        return False
+
+
+# ==================================================
+# 📒 Buffer de gravação (write-behind) e diário local
+# ==================================================
+# Por chave: última gravação ainda não enviada {nome_robo, texto (JSON), prazo, tentativas}
+_PENDENTES: dict[str, dict] = {}
+_PENDENTES_COND = threading.Condition()
+_ESCRITOR: Optional[threading.Thread] = None
+
+# Por chave: serializa carga, envio e remoção (a nuvem vê as gravações na ordem)
+_TRAVAS: dict[str, threading.Lock] = {}
+
+
+def _trava(chave: str) -> threading.Lock:
+    with _SUPABASES_LOCK:
+        return _TRAVAS.setdefault(chave, threading.Lock())
+
+
+def _arquivo_diario(chave: str) -> str:
+    return os.path.join(STATE_JOURNAL_DIR, f"{chave}.json")
+
+
+def _texto_diario(registro: dict) -> str:
+    """Registro do diário em JSON, carimbado com o instante (UTC) da gravação."""
+    registro["gravado_em"] = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    return json.dumps(registro, ensure_ascii=False, default=str)
+
+
+def _instante(texto: Optional[str]) -> Optional[datetime.datetime]:
+    try:
+        instante = datetime.datetime.fromisoformat(str(texto).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return instante if instante.tzinfo else instante.replace(tzinfo=datetime.timezone.utc)
+
+
+def _gravar_diario(chave: str, texto: str) -> None:
+    try:
+        os.makedirs(STATE_JOURNAL_DIR, exist_ok=True)
+        temporario = _arquivo_diario(chave) + ".tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            f.write(texto)
+        os.replace(temporario, _arquivo_diario(chave))
+    except OSError as e:
+        log(f"Não foi possível gravar o diário do estado ({chave}): {e}", "⚠️")
+
+
+def _apagar_diario(chave: str) -> None:
+    try:
+        os.remove(_arquivo_diario(chave))
+    except OSError:
+        pass
+
+
+def _reaplicar_diario(nome_robo: str, chave: str, estado: dict) -> None:
+    """
+    Gravação que ficou no diário de uma execução anterior (processo caiu
+    antes do envio): aplica os blocos alterados sobre o estado recém-carregado
+    e agenda o envio. Se a linha na nuvem é mais nova que o diário (o painel
+    ou outra instância gravou depois), o diário é descartado.
+    """
+    with _PENDENTES_COND:
+        if chave in _PENDENTES:
+            return  # gravação desta execução, ainda no buffer
+        try:
+            with open(_arquivo_diario(chave), encoding="utf-8") as f:
+                registro = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            log(f"Diário do estado ilegível ({chave}): {e}", "⚠️")
+            return
+
+    gravado_em = _instante(registro.get("gravado_em"))
+    remoto_em = _instante(_VERSAO.get(chave)) if _VERSAO.get(chave) else None
+    if gravado_em is not None and remoto_em is not None and remoto_em > gravado_em:
+        log(f"Diário local de '{nome_robo}' é mais antigo que o estado na nuvem — descartado.", "📒")
+        _apagar_diario(chave)
+        return
+
+    salvo = registro.get("estado") or {}
+    alterados = [c for c in registro.get("alterados", []) if c in salvo and c not in _CAMPOS_AUDITORIA]
+    for campo in alterados:
+        estado[campo] = salvo[campo]
+    for campo in registro.get("removidos", []):
+        estado.pop(campo, None)
+    log(f"Gravação pendente de '{nome_robo}' recuperada do diário local ({', '.join(alterados) or 'sem blocos'}).", "📒")
+    if not (alterados or registro.get("removidos")):
+        _apagar_diario(chave)
+    elif STATE_WRITE_BEHIND > 0:
+        salvar_estado_duravel(nome_robo, estado)  # o buffer apaga o diário após o envio
+    elif _gravar_estado(nome_robo, estado):
+        _apagar_diario(chave)
+
+
+def _descarregar(chave: str) -> None:
+    """Envia a gravação pendente da chave (se houver)."""
+    with _trava(chave):
+        with _PENDENTES_COND:
+            pendente = _PENDENTES.pop(chave, None)
+        if pendente is None:
+            return
+        ok = _gravar_estado(pendente["nome_robo"], json.loads(pendente["texto"])["estado"])
+        with _PENDENTES_COND:
+            if chave in _PENDENTES:
+                # Chegou gravação mais nova: o diário já é dela, mas o carimbo
+                # precisa passar o updated_at desta gravação
+                mais_nova = _PENDENTES[chave]
+                mais_nova["texto"] = _texto_diario(json.loads(mais_nova["texto"]))
+                _gravar_diario(chave, mais_nova["texto"])
+                return
+            if ok:
+                _apagar_diario(chave)
+                return
+            # Falhou: volta para o buffer (o diário continua valendo)
+            pendente["tentativas"] += 1
+            pendente["prazo"] = time.monotonic() + min(60.0, STATE_WRITE_BEHIND * 2 ** pendente["tentativas"])
+            _PENDENTES[chave] = pendente
+            _PENDENTES_COND.notify_all()
+
+
+def _laco_escritor() -> None:
+    while True:
+        with _PENDENTES_COND:
+            while True:
+                agora = time.monotonic()
+                prontos = [c for c, p in _PENDENTES.items() if p["prazo"] <= agora]
+                if prontos:
+                    break
+                proximo = min((p["prazo"] for p in _PENDENTES.values()), default=None)
+                _PENDENTES_COND.wait(None if proximo is None else proximo - agora)
+        for chave in prontos:
+            try:
+                _descarregar(chave)
+            except Exception as e:
+                log(f"Erro no envio do estado em segundo plano ({chave}): {e}", "⚠️")
+
+
+def _iniciar_escritor() -> None:
+    global _ESCRITOR
+    with _PENDENTES_COND:
+        if _ESCRITOR is None or not _ESCRITOR.is_alive():
+            _ESCRITOR = threading.Thread(target=_laco_escritor, name="estado-escritor", daemon=True)
+            _ESCRITOR.start()
+
+
+def descarregar_estados(nome_robo: Optional[str] = None) -> None:
+    """
+    Envia agora as gravações pendentes (de um robô ou de todos), sem
+    esperar a janela. Chamado no encerramento do processo.
+    """
+    with _PENDENTES_COND:
+        chaves = list(_PENDENTES)
+    if nome_robo is not None:
+        alvo = f"{nome_robo.replace('_przo_v1', '').strip().lower()}_przo_v1"
+        chaves = [c for c in chaves if c == alvo]
+    for chave in chaves:
+        _descarregar(chave)
+
+
+atexit.register(descarregar_estados)
+
+_SIGTERM_INSTALADO = False
+
+
+def instalar_descarga_no_sigterm(ao_encerrar: Optional[Callable[[], None]] = None) -> None:
+    """
+    O Render encerra o serviço com SIGTERM (e SIGKILL logo depois); o
+    atexit não roda no SIGTERM padrão. Chama `ao_encerrar` (ex.: parar as
+    esperas dos robôs), envia as gravações pendentes e sai.
+    Só pode ser chamada na thread principal (ignorada fora dela).
+    """
+    global _SIGTERM_INSTALADO
+    if _SIGTERM_INSTALADO:
+        return
+    anterior = signal.getsignal(signal.SIGTERM)
+
+    def _ao_sigterm(signum, frame):
+        log("SIGTERM recebido — enviando gravações pendentes do estado...", "🛑")
+        if ao_encerrar is not None:
+            ao_encerrar()
+        descarregar_estados()
+        if callable(anterior):
+            anterior(signum, frame)
+        raise SystemExit(0)
+
+    try:
+        signal.signal(signal.SIGTERM, _ao_sigterm)
+        _SIGTERM_INSTALADO = True
+    except ValueError:
+        pass  # fora da thread principal
 
 
 # ==================================================
 # 🧹 Apagar (SEMPRE GRANULAR)
 # ==================================================
-def apagar_estado_duravel(nome_robo: str, apenas_ticker: Optional[str] = None) -> None:
+def apagar_estado_duravel(nome_robo: str, apenas_ticker: Optional[str] = None) -> Optional[dict]:
     """
     Remoção segura:
       - Sem `apenas_ticker`: bloqueada (proteção contra wipe total).
       - Com `apenas_ticker`: remove o ticker e todos os vestígios dele do estado.
+    Usa a função atômica `kv_state_remove_ticker` (uma ida ao banco, com a
+    linha travada); sem ela, cai no SELECT + UPSERT antigo.
+    Retorna o estado que ficou na nuvem (None se desconhecido): a lista de
+    `ativos` dele é a que vale, pois o painel pode ter incluído tickers
+    desde a última leitura do robô.
     """
     try:
         sb, tabela, chave = _sb_and_table(nome_robo)
     except Exception as e:
-        print(f"⚠️ {e}")
-        return
+        log(f"{e}", "⚠️")
+        return None
+
+    # Bloqueia tentativa de apagar tudo
+    if not apenas_ticker:
+        log(f"Ação bloqueada: tentativa de apagar o estado completo de '{nome_robo}'.", "🚫")
+        return None
+
+    ticker = apenas_ticker.strip().upper()
+    log(f"Limpando '{ticker}' do estado remoto '{nome_robo}'...", "🧹")
+
+    with _trava(chave):
+        remoto = _apagar_remoto(sb, tabela, chave, nome_robo, ticker)
+        # Gravação no buffer feita antes da remoção não pode trazer o ticker de
+        # volta, nem enviar a lista de ativos antiga por cima da do painel
+        with _PENDENTES_COND:
+            pendente = _PENDENTES.get(chave)
+            if pendente is not None:
+                registro = json.loads(pendente["texto"])
+                _limpar_ticker(registro["estado"], ticker)
+                if isinstance(remoto, dict) and isinstance(remoto.get("ativos"), list):
+                    registro["estado"]["ativos"] = remoto["ativos"]
+                pendente["texto"] = _texto_diario(registro)
+                _gravar_diario(chave, pendente["texto"])
+    return remoto
+
+
+def _limpar_ticker(estado: dict, ticker: str) -> None:
+    """Remove o ticker e todos os vestígios dele dos blocos do estado."""
+    for campo in ("ativos", "historico_alertas"):
+        if isinstance(estado.get(campo), list):
+            estado[campo] = [a for a in estado[campo] if str(a.get("ticker", "")).upper() != ticker]
+
+    for campo in ("tempo_acumulado", "em_contagem", "status", "precos_historicos", "ultimo_update_tempo"):
+        if isinstance(estado.get(campo), dict):
+            estado[campo].pop(ticker, None)
+
+
+def _apagar_remoto(sb: Client, tabela: str, chave: str, nome_robo: str, ticker: str) -> Optional[dict]:
+    """Remove o ticker da linha na nuvem; devolve o estado que ficou lá."""
+    if _RPC_DISPONIVEL["kv_state_remove_ticker"]:
+        try:
+            with SUPABASE_SEGUNDOS.medir(operacao="remover_ticker"):
+                res = _rpc(sb, "kv_state_remove_ticker", {"p_tabela": tabela, "p_k": chave, "p_ticker": ticker})
+            SUPABASE_BYTES.inc(_bytes(res.data), operacao="remover_ticker", direcao="recebido")
+            if isinstance(res.data, dict) and isinstance(res.data.get("v"), dict):
+                _PERSISTIDO[chave] = _impressao(res.data["v"])
+                _registrar_escrita(chave, res)
+                log(f"Ticker '{ticker}' removido completamente de '{nome_robo}'.", "✅")
+                return res.data["v"]
+            log(f"Nenhum estado encontrado para '{nome_robo}'.", "ℹ️")
+            return None
+        except Exception as e:
+            log(f"RPC kv_state_remove_ticker falhou ({e}) — usando leitura + upsert.", "⚠️")
 
     try:
         res = sb.table(tabela).select("k,v").eq("k", chave).execute()
         if not res.data:
-            print(f"ℹ️ Nenhum estado encontrado para '{nome_robo}'.")
-            return
+            log(f"Nenhum estado encontrado para '{nome_robo}'.", "ℹ️")
+            return None
 
         estado = res.data[0]["v"] or {}
 
-        # Bloqueia tentativa de apagar tudo
-        if not apenas_ticker:
-            print(f"🚫 Ação bloqueada: tentativa de apagar o estado completo de '{nome_robo}'.")
-            return
-
-        ticker = apenas_ticker.strip().upper()
-        print(f"🧹 Limpando '{ticker}' do estado remoto '{nome_robo}'...")
-
         # Limpa o ticker em todos os blocos principais
-        for campo in ("ativos", "historico_alertas"):
-            if isinstance(estado.get(campo), list):
-                estado[campo] = [a for a in estado[campo] if a.get("ticker", "").upper() != ticker]
-
-        for campo in ("tempo_acumulado", "em_contagem", "status", "precos_historicos", "ultimo_update_tempo"):
-            if isinstance(estado.get(campo), dict):
-                estado[campo].pop(ticker, None)
+        _limpar_ticker(estado, ticker)
 
         # Marca último escritor
         estado["_last_writer"] = "robot_render_cleanup"
@@ -164,13 +603,11 @@ def apagar_estado_duravel(nome_robo: str, apenas_ticker: Optional[str] = None) -
 
         # Persiste
         sb.table(tabela).upsert({"k": chave, "v": estado}).execute()
-        print(f"✅ Ticker '{ticker}' removido completamente de '{nome_robo}'.")
+        _PERSISTIDO[chave] = _impressao(estado)
+        _VERSAO[chave] = None
+        log(f"Ticker '{ticker}' removido completamente de '{nome_robo}'.", "✅")
+        return estado
 
     except Exception as e:
-        print(f"⚠️ Erro ao tentar apagar estado de {nome_robo}: {e}")
-
-
-
-
-
-
+        log(f"Erro ao tentar apagar estado de {nome_robo}: {e}", "⚠️")
+        return None
@@ -0,0 +1,236 @@
+# services/feed_replay.py
+"""
+📼 Servidor de replay do feed de cotações.
+Toca um arquivo de ticks (mesmo formato do ProvedorReplay: `ticker`,
+`timestamp`, `preco`/`close`) pelos dois protocolos de core/feed.py —
+websocket e long-poll HTTP — mantendo os instantes originais dos ticks.
+Como o robô conta o tempo na zona pelo instante do tick, o resultado não
+depende da velocidade do replay (0 = o mais rápido possível). O relógio
+do replay só começa na primeira assinatura.
+
+Uso:
+    python -m services.feed_replay ticks.csv --velocidade 60
+    MARKET_FEED_URL=ws://127.0.0.1:8765 python -m services.robots.robot_curto
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+from core.logger import log
+from core.prices import ticker_yahoo
+from core.providers import ler_ticks
+
+
+class ServidorReplay:
+    def __init__(
+        self,
+        caminho: str | None = None,
+        ticks: pd.DataFrame | None = None,
+        velocidade: float = 0.0,
+        host: str = "127.0.0.1",
+        porta_ws: int = 0,
+        porta_http: int = 0,
+    ):
+        dados = ler_ticks(caminho, ticks)
+        self.ticks = [
+            {"ticker": t, "preco": float(p), "instante": ts.timestamp()}
+            for t, ts, p in zip(dados["ticker"], dados["timestamp"], dados["preco"])
+        ]
+        self.velocidade = velocidade
+        self.host = host
+        self.emitidos = 0  # ticks já tocados (também é o cursor do long-poll)
+        self.terminou = False
+        self._cond = threading.Condition()
+        self._parar = threading.Event()
+        self._assinado = threading.Event()
+        self._porta_ws = porta_ws
+        self._porta_http = porta_http
+        self._ws = None
+        self._http = None
+
+    # ==================================================
+    # ▶️ Relógio do replay
+    # ==================================================
+    def _tocar(self) -> None:
+        while not self._assinado.wait(0.5):
+            if self._parar.is_set():
+                return
+        inicio_real = time.monotonic()
+        inicio_replay = self.ticks[0]["instante"] if self.ticks else 0.0
+        for n, tick in enumerate(self.ticks, start=1):
+            if self.velocidade > 0:
+                alvo = inicio_real + (tick["instante"] - inicio_replay) / self.velocidade
+                if self._parar.wait(max(0.0, alvo - time.monotonic())):
+                    return
+            elif self._parar.is_set():
+                return
+            with self._cond:
+                self.emitidos = n
+                self._cond.notify_all()
+        with self._cond:
+            self.terminou = True
+            self._cond.notify_all()
+
+    def _novos(self, cursor: int, tickers: set[str], espera: float) -> tuple[int, list[dict]]:
+        """Ticks depois de `cursor` dos `tickers` (espera até `espera` s por algum)."""
+        with self._cond:
+            self._cond.wait_for(lambda: self.emitidos > cursor or self.terminou or self._parar.is_set(), espera)
+            fim = self.emitidos
+        return fim, [t for t in self.ticks[cursor:fim] if t["ticker"] in tickers]
+
+    def _ultimos(self, tickers: set[str]) -> tuple[int, list[dict]]:
+        """Último tick já tocado de cada ticker (fotografia na assinatura) e o cursor."""
+        if tickers:
+            self._assinado.set()
+        with self._cond:
+            fim = self.emitidos
+        ultimos = {}
+        for t in self.ticks[:fim]:
+            if t["ticker"] in tickers:
+                ultimos[t["ticker"]] = t
+        return fim, list(ultimos.values())
+
+    # ==================================================
+    # 🔌 Websocket
+    # ==================================================
+    def _conexao_ws(self, ws) -> None:
+        assinatura: set[str] = set()
+        cursor: list[int | None] = [None]  # só anda depois da primeira assinatura
+        trava = threading.Lock()
+
+        def ler_assinaturas():
+            for mensagem in ws:
+                try:
+                    pedido = json.loads(mensagem)
+                except ValueError:
+                    continue
+                if pedido.get("acao") != "assinar":
+                    continue
+                tickers = {ticker_yahoo(str(t)) for t in pedido.get("tickers", [])}
+                with trava:
+                    fim, fotografia = self._ultimos(tickers - assinatura)
+                    assinatura.clear()
+                    assinatura.update(tickers)
+                    if cursor[0] is None:
+                        cursor[0] = fim
+                if fotografia:
+                    ws.send(json.dumps({"ticks": fotografia}))
+
+        leitor = threading.Thread(target=ler_assinaturas, daemon=True)
+        leitor.start()
+        try:
+            while leitor.is_alive() and not self._parar.is_set():
+                with trava:
+                    tickers, inicio = set(assinatura), cursor[0]
+                if inicio is None:
+                    self._parar.wait(0.1)
+                    continue
+                fim, ticks = self._novos(inicio, tickers, espera=0.5)
+                with trava:
+                    cursor[0] = fim
+                if ticks:
+                    ws.send(json.dumps({"ticks": ticks}))
+                if self.terminou and fim >= len(self.ticks):
+                    self._parar.wait(0.5)
+        except Exception:
+            pass  # cliente desconectou
+
+    # ==================================================
+    # ⏳ Long-poll HTTP
+    # ==================================================
+    def _handler_http(self):
+        servidor = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                if url.path.rstrip("/") not in ("", "/ticks"):
+                    self.send_error(404)
+                    return
+                q = parse_qs(url.query)
+
+                def lista(campo: str) -> set[str]:
+                    return {ticker_yahoo(t) for t in q.get(campo, [""])[0].split(",") if t}
+
+                tickers = lista("tickers")
+                espera = min(float(q.get("espera", ["20"])[0]), 60.0)
+                fim, fotografia = servidor._ultimos(lista("novos") | (tickers if "cursor" not in q else set()))
+                if "cursor" in q:
+                    cursor, ticks = servidor._novos(int(q["cursor"][0]), tickers, espera)
+                else:
+                    cursor, ticks = fim, []
+                ticks = fotografia + ticks
+                corpo = json.dumps({"cursor": cursor, "ticks": ticks}).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+
+            def log_message(self, *args):
+                pass
+
+        return _Handler
+
+    # ==================================================
+    # 🚀 Subir / derrubar
+    # ==================================================
+    def iniciar(self) -> "ServidorReplay":
+        from websockets.sync.server import serve
+
+        self._ws = serve(self._conexao_ws, self.host, self._porta_ws)
+        self._http = ThreadingHTTPServer((self.host, self._porta_http), self._handler_http())
+        self._http.daemon_threads = True
+        threading.Thread(target=self._ws.serve_forever, name="replay-ws", daemon=True).start()
+        threading.Thread(target=self._http.serve_forever, name="replay-http", daemon=True).start()
+        threading.Thread(target=self._tocar, name="replay-relogio", daemon=True).start()
+        return self
+
+    def parar(self) -> None:
+        self._parar.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._ws is not None:
+            self._ws.shutdown()
+        if self._http is not None:
+            self._http.shutdown()
+
+    @property
+    def url_ws(self) -> str:
+        return f"ws://{self.host}:{self._ws.socket.getsockname()[1]}"
+
+    @property
+    def url_http(self) -> str:
+        return f"http://{self.host}:{self._http.server_address[1]}/ticks"
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Toca um arquivo de ticks como feed de cotações.")
+    parser.add_argument("ticks", help="CSV/Parquet com ticker, timestamp e preco (ou close)")
+    parser.add_argument("--velocidade", type=float, default=1.0, help="segundos de replay por segundo real (0 = sem espera)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta-ws", type=int, default=8765)
+    parser.add_argument("--porta-http", type=int, default=8766)
+    args = parser.parse_args(argv)
+
+    servidor = ServidorReplay(args.ticks, velocidade=args.velocidade, host=args.host,
+                              porta_ws=args.porta_ws, porta_http=args.porta_http).iniciar()
+    log(f"Replay de {len(servidor.ticks)} ticks em {servidor.url_ws} e {servidor.url_http}", "📼")
+    try:
+        while True:
+            time.sleep(60)
+    except KeyboardInterrupt:
+        servidor.parar()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,15 +3,20 @@
 """
 🧠 Master Controller — Robôs 1Milhão Invest (Render Edition)
 Executa todos os 6 robôs simultaneamente em subprocessos independentes.
-Garante flush imediato e logging visível no Render.
+Cada robô já escreve linhas de log completas (robô, ciclo, horário); o
+master só as repassa pela mesma fila de logs, sem reformatar.
 """
 
+import signal
 import subprocess
 import threading
 import time
 import sys
 import os
-from datetime import datetime
+
+from core.config import METRICS_PORT
+from core.logger import log, log_bruto, robo_atual
+from core.metrics import servir_metricas
 
 ROBOTS = [
     ("CURTO", "services.robots.robot_curto"),
@@ -22,39 +27,79 @@ ROBOTS = [
     ("LOSS_CLUBE", "services.robots.robot_loss_clube"),
 ]
 
+# Cache de cotações em arquivo, compartilhado pelos 6 subprocessos
+os.environ.setdefault("PRICE_CACHE_PATH", "/tmp/robots_cotacoes.sqlite")
+
+# Subprocesso atual de cada robô (o SIGTERM do master é repassado a eles)
+PROCESSOS: dict[str, subprocess.Popen] = {}
+
+# Métricas: cada subprocesso serve na porta METRICS_PORT + n; o master
+# serve METRICS_PORT com tudo mesclado (rótulo `processo` por robô)
+PORTAS_METRICAS = {nome: METRICS_PORT + i + 1 for i, (nome, _) in enumerate(ROBOTS)} if METRICS_PORT else {}
+
 # ==================================================
 # 🧩 Função auxiliar para rodar subprocesso e logar stdout/stderr
 # ==================================================
 def iniciar_robo(nome_exibicao, modulo_import):
+    robo_atual.set(nome_exibicao)
     while True:
         try:
-            print(f"\n🚀 Iniciando robô [{nome_exibicao}]...\n", flush=True)
+            log(f"Iniciando robô [{nome_exibicao}]...", "🚀")
 
             # Executa cada robô como subprocesso real (Render capta stdout)
+            env = dict(os.environ)
+            if PORTAS_METRICAS:
+                env["METRICS_PORT"] = str(PORTAS_METRICAS[nome_exibicao])
+                env["METRICS_PROCESSO"] = nome_exibicao
             proc = subprocess.Popen(
                 [sys.executable, "-m", modulo_import],
+                env=env,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
                 bufsize=1,
                 universal_newlines=True
             )
+            PROCESSOS[nome_exibicao] = proc
 
-            # Prefixa cada linha de saída com o nome do robô
+            # As linhas já vêm formatadas pelo core.logger do robô
             for line in proc.stdout:
-                timestamp = datetime.utcnow().strftime("%H:%M:%S")
-                print(f"[{timestamp}] [{nome_exibicao}] {line.rstrip()}", flush=True)
+                log_bruto(line.rstrip("\n"))
 
             proc.wait()
-            print(f"🔁 Robô [{nome_exibicao}] terminou — reiniciando em 60s...\n", flush=True)
+            log(f"Robô [{nome_exibicao}] terminou — reiniciando em 60s...", "🔁")
             time.sleep(60)
 
         except KeyboardInterrupt:
-            print(f"🛑 [{nome_exibicao}] interrompido manualmente.")
+            log(f"[{nome_exibicao}] interrompido manualmente.", "🛑")
             break
         except Exception as e:
-            print(f"⚠️ Erro no robô [{nome_exibicao}]: {e}", flush=True)
+            log(f"Erro no robô [{nome_exibicao}]: {e}", "⚠️")
             time.sleep(30)
 
+# ==================================================
+# 🛑 Encerramento (Render manda SIGTERM só para o master)
+# ==================================================
+# Prazo único para todos os robôs saírem (o Render dá 30s antes do SIGKILL)
+ESPERA_ENCERRAMENTO = 20
+
+
+def encerrar(signum, frame):
+    """Repassa o SIGTERM: cada robô envia as gravações pendentes antes de sair."""
+    log("SIGTERM recebido — encerrando os robôs...", "🛑")
+    processos = [proc for proc in PROCESSOS.values() if proc.poll() is None]
+    for proc in processos:
+        proc.terminate()
+    limite = time.monotonic() + ESPERA_ENCERRAMENTO
+    for proc in processos:
+        try:
+            proc.wait(timeout=max(0.0, limite - time.monotonic()))
+        except subprocess.TimeoutExpired:
+            proc.kill()
+    raise SystemExit(0)
+
+
+signal.signal(signal.SIGTERM, encerrar)
+
 # ==================================================
 # 🚀 Inicialização principal
 # ==================================================
@@ -65,14 +110,17 @@ for nome, modulo in ROBOTS:
     t.start()
     time.sleep(3)
 
-print("\n🧠 Todos os robôs foram iniciados com sucesso.\n", flush=True)
-print("📡 Monitorando execução contínua... Pressione Ctrl+C para encerrar.\n", flush=True)
+robo_atual.set("MASTER")
+if servir_metricas(METRICS_PORT, [f"http://127.0.0.1:{p}/metrics" for p in PORTAS_METRICAS.values()]):
+    log(f"Métricas de todos os robôs em :{METRICS_PORT}/metrics.", "📈")
+log("Todos os robôs foram iniciados com sucesso.", "🧠")
+log("Monitorando execução contínua... Pressione Ctrl+C para encerrar.", "📡")
 
 try:
     while True:
         vivos = [n for n, t in zip([r[0] for r in ROBOTS], threads) if t.is_alive()]
-        print(f"[{time.strftime('%H:%M:%S')}] Robôs ativos: {', '.join(vivos)}", flush=True)
+        log(f"Robôs ativos: {', '.join(vivos)}", "📡")
         time.sleep(120)
 except KeyboardInterrupt:
-    print("\n🛑 Encerrando master manualmente...")
+    log("Encerrando master manualmente...", "🛑")
 
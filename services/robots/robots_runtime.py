@@ -0,0 +1,111 @@
+# services/robots/robots_runtime.py
+# -*- coding: utf-8 -*-
+"""
+🧠 Runtime único — Robôs 1Milhão Invest
+Executa os 6 robôs como tarefas asyncio em um só processo Python,
+compartilhando os clientes HTTP, Supabase e Telegram (uma importação de
+`core` para todos) e, com MARKET_FEED_URL, uma única conexão de feed. Cada robô é um `RobotEngine` supervisionado
+isoladamente: se um cair, só ele é reiniciado, como no `robots_master`.
+
+Uso: python -m services.robots.robots_runtime
+"""
+
+import asyncio
+import contextvars
+import functools
+import importlib
+from concurrent.futures import ThreadPoolExecutor
+
+from core.engine import ENCERRAR, RobotEngine
+from core.logger import log, robo_atual
+from core.metrics import servir_metricas
+from core.state import instalar_descarga_no_sigterm
+
+ROBOTS = [
+    ("CURTO", "services.robots.robot_curto"),
+    ("CURTISSIMO", "services.robots.robot_curtissimo"),
+    ("CLUBE", "services.robots.robot_clube"),
+    ("LOSS_CURTO", "services.robots.robot_loss_curto"),
+    ("LOSS_CURTISSIMO", "services.robots.robot_loss_curtissimo"),
+    ("LOSS_CLUBE", "services.robots.robot_loss_clube"),
+]
+
+ESPERA_REINICIO = 60     # segundos antes de reiniciar um robô que falhou
+ESPERA_ESTADO = 60       # segundos entre tentativas de carregar o estado inicial
+INTERVALO_STATUS = 120   # segundos entre os relatórios de robôs ativos
+
+# Um worker por robô: um ciclo lento nunca segura o ciclo dos outros
+EXECUTOR = ThreadPoolExecutor(max_workers=len(ROBOTS) + 2, thread_name_prefix="robo")
+
+
+async def em_thread(func, *args):
+    """
+    Como `asyncio.to_thread` (leva o contexto, com o robô atual dos logs),
+    mas no EXECUTOR: o asyncio.run não espera por ele ao sair.
+    """
+    contexto = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(EXECUTOR, functools.partial(contexto.run, func, *args))
+
+
+def encerrar() -> None:
+    """SIGTERM: as esperas dos robôs terminam e o pool é largado sem esperar o ciclo em curso."""
+    ENCERRAR.set()
+    EXECUTOR.shutdown(wait=False, cancel_futures=True)
+
+
+# ==================================================
+# 🛡️ Supervisor por robô (reinício isolado)
+# ==================================================
+async def rodar_robo(engine: RobotEngine):
+    """Laço do robô como tarefa: o ciclo (bloqueante) roda no pool, a espera não."""
+    log(f"Robô {engine.cfg.rotulo} iniciado.", "🤖")
+    while not await em_thread(engine.iniciar):
+        log("Falha ao carregar estado remoto — aguardando reconexão...", "⚠️")
+        await asyncio.sleep(ESPERA_ESTADO)
+    log("Estado carregado com sucesso.", "✅")
+
+    while not ENCERRAR.is_set():
+        espera = await em_thread(engine.executar_ciclo)
+        if engine.feed is not None:
+            # Feed compartilhado: os ticks são avaliados durante a espera
+            await em_thread(engine.aguardar, espera)
+        else:
+            await asyncio.sleep(espera)
+
+
+async def supervisionar(nome_exibicao: str, modulo_import: str):
+    robo_atual.set(nome_exibicao)
+    while not ENCERRAR.is_set():
+        log(f"Iniciando robô [{nome_exibicao}]...", "🚀")
+        try:
+            config = importlib.import_module(modulo_import).CONFIG
+            await rodar_robo(RobotEngine(config))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log(f"Erro no robô [{nome_exibicao}]: {e!r} — reiniciando em {ESPERA_REINICIO}s...", "⚠️")
+        await asyncio.sleep(ESPERA_REINICIO)
+
+
+async def main():
+    if servir_metricas():
+        log("Métricas de todos os robôs disponíveis em /metrics.", "📈")
+
+    tarefas = {}
+    for nome, modulo in ROBOTS:
+        tarefas[nome] = asyncio.create_task(supervisionar(nome, modulo), name=nome)
+        await asyncio.sleep(3)
+
+    log("Todos os robôs foram iniciados no mesmo processo.", "🧠")
+    while True:
+        vivos = [n for n, t in tarefas.items() if not t.done()]
+        log(f"Robôs ativos: {', '.join(vivos)}", "📡")
+        await asyncio.sleep(INTERVALO_STATUS)
+
+
+if __name__ == "__main__":
+    instalar_descarga_no_sigterm(encerrar)
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        log("Encerrando runtime manualmente...", "🛑")
@@ -0,0 +1,38 @@
+-- sql/alert_history.sql
+-- Histórico de alertas fora do estado quente (ver core/alert_history.py).
+-- Rodar uma vez em cada projeto Supabase (SQL Editor).
+
+-- ==================================================
+-- 🗃️ alertas_historico: só inserção, consultado pelo painel
+-- ==================================================
+create table if not exists alertas_historico (
+  id           bigserial primary key,
+  robo         text        not null,
+  ticker       text        not null,
+  operacao     text,
+  preco_alvo   double precision,
+  preco_atual  double precision,
+  disparado_em timestamptz not null default now(),
+  hora         text,                     -- horário local do robô, como no estado
+  dados        jsonb       not null default '{}'::jsonb
+);
+
+create index if not exists alertas_historico_robo_data_idx
+  on alertas_historico (robo, disparado_em desc);
+
+create index if not exists alertas_historico_ticker_data_idx
+  on alertas_historico (ticker, disparado_em desc);
+
+-- Um alerta por (robô, ticker, instante): o robô reenvia pendentes com
+-- "on conflict do nothing" sem duplicar linhas.
+-- Se já houver duplicatas, remova-as antes de criar o índice:
+--   delete from alertas_historico a using alertas_historico b
+--    where a.id > b.id and a.robo = b.robo and a.ticker = b.ticker
+--      and a.disparado_em = b.disparado_em;
+create unique index if not exists alertas_historico_unico_idx
+  on alertas_historico (robo, ticker, disparado_em);
+
+-- Append-only: clientes podem inserir e ler, nunca alterar ou apagar
+revoke update, delete, truncate on alertas_historico from anon, authenticated;
+grant select, insert on alertas_historico to anon, authenticated;
+grant usage on sequence alertas_historico_id_seq to anon, authenticated;
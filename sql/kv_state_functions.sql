@@ -0,0 +1,140 @@
+-- sql/kv_state_functions.sql
+-- Funções usadas por core/state.py. Rodar uma vez em cada projeto Supabase
+-- (SQL Editor). Sem elas os robôs continuam funcionando com upsert completo.
+-- Requer a coluna `v` do tipo jsonb nas tabelas kv_state_*.
+
+-- ==================================================
+-- ⏱️ kv_state_touch: updated_at muda em toda escrita
+-- ==================================================
+-- O robô só relê o estado quando `updated_at` muda. O painel grava com um
+-- upsert simples (sem mexer em updated_at); sem este gatilho a inclusão de
+-- um ticker pelo painel passaria despercebida até o robô reiniciar.
+create or replace function kv_state_touch()
+returns trigger
+language plpgsql
+as $$
+begin
+  new.updated_at := now();
+  return new;
+end;
+$$;
+
+do $$
+declare
+  v_tabela text;
+begin
+  foreach v_tabela in array array[
+    'kv_state_clube', 'kv_state_curto', 'kv_state_curtissimo',
+    'kv_state_lossclube', 'kv_state_losscurto', 'kv_state_losscurtissimo'
+  ] loop
+    if to_regclass(v_tabela) is not null then
+      execute format('drop trigger if exists kv_state_touch on %I', v_tabela);
+      execute format(
+        'create trigger kv_state_touch before insert or update on %I
+           for each row execute function kv_state_touch()',
+        v_tabela
+      );
+    end if;
+  end loop;
+end;
+$$;
+
+-- ==================================================
+-- 💾 kv_state_merge: grava só os blocos alterados do estado
+-- ==================================================
+-- Substitui as chaves de primeiro nível presentes em `p_patch`
+-- (ex.: {"tempo_acumulado": {...}}) e mantém as demais como estão.
+-- Retorna {"anterior": updated_at antes, "updated_at": updated_at depois},
+-- usado pelo robô para saber se alguém escreveu entre a leitura e a escrita.
+-- Roda com as permissões de quem chama (security invoker): as mesmas do
+-- upsert direto que o robô já faz, com o RLS das tabelas valendo.
+create or replace function kv_state_merge(p_tabela text, p_k text, p_patch jsonb)
+returns jsonb
+language plpgsql
+security invoker
+set search_path = public
+as $$
+declare
+  v_anterior timestamptz;
+  v_atual timestamptz;
+begin
+  if p_tabela not like 'kv\_state\_%' then
+    raise exception 'tabela inválida: %', p_tabela;
+  end if;
+
+  execute format('select updated_at from %I where k = $1 for update', p_tabela)
+    into v_anterior using p_k;
+
+  execute format(
+    'insert into %I as t (k, v, updated_at) values ($1, $2, now())
+     on conflict (k) do update
+       set v = coalesce(t.v, ''{}''::jsonb) || excluded.v,
+           updated_at = now()
+     returning updated_at',
+    p_tabela
+  ) into v_atual using p_k, p_patch;
+
+  return jsonb_build_object('anterior', v_anterior, 'updated_at', v_atual);
+end;
+$$;
+
+revoke execute on function kv_state_merge(text, text, jsonb) from public;
+grant execute on function kv_state_merge(text, text, jsonb) to anon, authenticated, service_role;
+
+-- ==================================================
+-- 🧹 kv_state_remove_ticker: remove um ticker do estado em uma só chamada
+-- ==================================================
+-- Mesma limpeza de apagar_estado_duravel, feita no banco com a linha
+-- travada (sem corrida com o painel). Retorna {"v": estado resultante,
+-- "anterior": updated_at antes, "updated_at": updated_at depois}.
+-- Como kv_state_merge, roda com as permissões de quem chama.
+create or replace function kv_state_remove_ticker(p_tabela text, p_k text, p_ticker text)
+returns jsonb
+language plpgsql
+security invoker
+set search_path = public
+as $$
+declare
+  v_ticker text := upper(trim(p_ticker));
+  v_estado jsonb;
+  v_campo text;
+  v_anterior timestamptz;
+begin
+  if p_tabela not like 'kv\_state\_%' then
+    raise exception 'tabela inválida: %', p_tabela;
+  end if;
+
+  execute format('select v, updated_at from %I where k = $1 for update', p_tabela)
+    into v_estado, v_anterior using p_k;
+  if v_estado is null then
+    return null;
+  end if;
+
+  foreach v_campo in array array['ativos', 'historico_alertas'] loop
+    if jsonb_typeof(v_estado -> v_campo) = 'array' then
+      v_estado := jsonb_set(v_estado, array[v_campo], coalesce(
+        (select jsonb_agg(e) from jsonb_array_elements(v_estado -> v_campo) e
+          where upper(coalesce(e ->> 'ticker', '')) <> v_ticker),
+        '[]'::jsonb));
+    end if;
+  end loop;
+
+  foreach v_campo in array array['tempo_acumulado', 'em_contagem', 'status', 'precos_historicos', 'ultimo_update_tempo'] loop
+    if jsonb_typeof(v_estado -> v_campo) = 'object' then
+      v_estado := jsonb_set(v_estado, array[v_campo], (v_estado -> v_campo) - v_ticker);
+    end if;
+  end loop;
+
+  v_estado := v_estado || jsonb_build_object(
+    '_last_writer', 'robot_render_cleanup',
+    '_last_writer_ts', to_char(now() at time zone 'utc', 'YYYY-MM-DD"T"HH24:MI:SS.US')
+  );
+
+  execute format('update %I set v = $2, updated_at = now() where k = $1', p_tabela)
+    using p_k, v_estado;
+  return jsonb_build_object('v', v_estado, 'anterior', v_anterior, 'updated_at', now());
+end;
+$$;
+
+revoke execute on function kv_state_remove_ticker(text, text, text) from public;
+grant execute on function kv_state_remove_ticker(text, text, text) to anon, authenticated, service_role;
@@ -0,0 +1,78 @@
+# tests/conftest.py
+"""
+Serviços locais (benchmarks/sinks.py) no lugar do Supabase, do SMTP e do
+Telegram. O ambiente é montado antes de qualquer `import core.*`, pois o
+core/config.py lê as variáveis na importação.
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.ciclo import CHAVE_FALSA  # noqa: E402
+from benchmarks.sinks import Trafego, PostgRESTFalso, SumidouroSMTP, SumidouroTelegram  # noqa: E402
+
+TRAFEGO = Trafego()
+SUPABASE = PostgRESTFalso(TRAFEGO)
+SMTP = SumidouroSMTP(TRAFEGO)
+TELEGRAM = SumidouroTelegram(TRAFEGO)
+_TEMPORARIOS = tempfile.mkdtemp(prefix="testes_robot_")
+
+os.environ.update({
+    "SUPABASE_URL_CURTO": SUPABASE.url,
+    "SUPABASE_KEY_CURTO": CHAVE_FALSA,
+    "EMAIL_SENDER": "teste@localhost",
+    "GMAIL_APP_PASSWORD": "teste",
+    "EMAIL_RECIPIENT_CURTO": "destino@localhost",
+    "SMTP_HOST": "127.0.0.1",
+    "SMTP_PORT": str(SMTP.porta),
+    "SMTP_STARTTLS": "0",
+    "TELEGRAM_TOKEN": "123456:TESTE",
+    "TELEGRAM_API_URL": TELEGRAM.url,
+    "TELEGRAM_CHAT_ID_CURTO": "1",
+    "ALERT_HISTORY_SPOOL": os.path.join(_TEMPORARIOS, "alertas_pendentes"),
+    "STATE_JOURNAL_DIR": os.path.join(_TEMPORARIOS, "estado_pendente"),
+    "STATE_WRITE_BEHIND": "0",
+    "PRICE_CACHE_PATH": "",
+    "MARKET_FEED_URL": "",
+    "LOG_LEVEL": "WARNING",
+    "METRICS_PORT": "0",
+})
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(_TEMPORARIOS, ignore_errors=True)
+
+
+@pytest.fixture
+def supabase():
+    """PostgREST falso limpo, com o controle de versões do core/state.py zerado."""
+    from core import state
+
+    with SUPABASE._lock:
+        SUPABASE.kv.clear()
+        SUPABASE.linhas.clear()
+    state._PERSISTIDO.clear()
+    state._VERSAO.clear()
+    with state._PENDENTES_COND:
+        state._PENDENTES.clear()
+    shutil.rmtree(os.environ["STATE_JOURNAL_DIR"], ignore_errors=True)
+    shutil.rmtree(os.environ["ALERT_HISTORY_SPOOL"], ignore_errors=True)
+    TRAFEGO.zerar()
+    yield SUPABASE
+    with state._PENDENTES_COND:
+        state._PENDENTES.clear()
+
+
+@pytest.fixture
+def smtp():
+    return SMTP
+
+
+@pytest.fixture
+def telegram():
+    return TELEGRAM
@@ -0,0 +1,60 @@
+# tests/test_alert_history.py
+import os
+
+import pytest
+
+from core import alert_history
+from services.robots.robot_curto import CONFIG
+
+
+def _registro(ticker: str, hora: str = "2025-03-10 14:30:00") -> dict:
+    return {"hora": hora, "ticker": ticker, "operacao": "compra", "preco_alvo": 10.0, "preco_atual": 10.5}
+
+
+def _linhas(supabase) -> list[tuple]:
+    return [(l["robo"], l["ticker"], l["disparado_em"]) for l in supabase.linhas[alert_history.TABELA_HISTORICO]]
+
+
+def _fora(nome_robo):
+    raise ValueError("Supabase fora do ar")
+
+
+def _arquivos_pendentes() -> list[str]:
+    pasta = os.environ["ALERT_HISTORY_SPOOL"]
+    return sorted(os.listdir(pasta)) if os.path.isdir(pasta) else []
+
+
+def test_reenvio_do_mesmo_alerta_nao_duplica(supabase):
+    assert alert_history.arquivar_alertas("curto", [_registro("PETR4")], CONFIG.tz)
+    assert alert_history.arquivar_alertas("curto", [_registro("PETR4"), _registro("VALE3")], CONFIG.tz)
+
+    assert sorted(t for _, t, _ in _linhas(supabase)) == ["PETR4", "VALE3"]
+
+
+def test_disparo_grava_local_e_envia_em_segundo_plano(supabase):
+    assert alert_history.arquivar_em_segundo_plano("curto", [_registro("PETR4")], CONFIG.tz)
+    assert alert_history.drenar_historico(timeout=10)
+
+    assert [t for _, t, _ in _linhas(supabase)] == ["PETR4"]
+    assert _arquivos_pendentes() == []
+
+
+def test_supabase_fora_mantem_pendentes_ate_o_proximo_envio(supabase, monkeypatch):
+    monkeypatch.setattr(alert_history, "cliente_do_robo", _fora)
+    assert not alert_history.arquivar_alertas("curto", [_registro("PETR4")], CONFIG.tz)
+    assert _linhas(supabase) == []
+    assert _arquivos_pendentes()
+
+    monkeypatch.undo()
+    assert alert_history.arquivar_alertas("curto", [_registro("VALE3")], CONFIG.tz)
+
+    assert sorted(t for _, t, _ in _linhas(supabase)) == ["PETR4", "VALE3"]
+    assert _arquivos_pendentes() == []
+
+
+@pytest.mark.parametrize("guardar", [True, False])
+def test_aparo_sem_guardar_pendentes_nao_deixa_arquivo(supabase, monkeypatch, guardar):
+    monkeypatch.setattr(alert_history, "cliente_do_robo", _fora)
+    alert_history.arquivar_alertas("curto", [_registro("PETR4")], CONFIG.tz, guardar_pendentes=guardar)
+
+    assert bool(_arquivos_pendentes()) is guardar
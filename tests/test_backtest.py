@@ -0,0 +1,81 @@
+# tests/test_backtest.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.backtest import simular
+from core.carteira import CarteiraColunar
+from core.prices import ticker_yahoo
+from services.robots import robot_clube, robot_loss_clube
+
+ATIVOS = [
+    {"ticker": "AAA", "preco": 10.0, "operacao": "compra"},
+    {"ticker": "BBB", "preco": 20.0, "operacao": "venda"},
+    {"ticker": "CCC", "preco": 5.0, "operacao": "compra"},
+]
+# Fim de um pregão e começo do seguinte (clube: 03:00–23:59 em Lisboa = UTC em janeiro)
+MINUTOS = pd.date_range("2025-01-02 23:40", "2025-01-02 23:59", freq="1min", tz="UTC").append(
+    pd.date_range("2025-01-03 03:00", "2025-01-03 03:20", freq="1min", tz="UTC"))
+
+
+def _na_zona(ticker: str, ts: pd.Timestamp) -> bool | None:
+    """Roteiro de cada ticker: True/False = dentro/fora da zona, None = sem barra."""
+    hm = ts.strftime("%d %H:%M")
+    if ticker == "AAA":
+        # buraco logo depois da entrada; na zona na virada do dia (a contagem zera)
+        if "02 23:50" <= hm <= "02 23:53":
+            return None
+        return hm in ("02 23:49", "02 23:54", "02 23:59") or hm >= "03 03:00"
+    if ticker == "BBB":
+        # entra e sai até o fim do dia; fica na zona a partir das 03:10
+        return hm >= "03 03:10" or (hm < "03" and ts.minute % 2 == 0)
+    # CCC só começa a negociar às 23:47, já na zona
+    return None if hm < "02 23:47" else True
+
+
+def _barras(estrategia) -> pd.DataFrame:
+    linhas = []
+    for a in ATIVOS:
+        compra = np.array(a["operacao"] == "compra")
+        for ts in MINUTOS:
+            dentro = _na_zona(a["ticker"], ts)
+            if dentro is None:
+                continue
+            preco = next(p for p in (a["preco"] * 1.01, a["preco"] * 0.99)
+                         if bool(estrategia.zona(np.array(p), np.array(a["preco"]), compra)) == dentro)
+            linhas.append({"ticker": ticker_yahoo(a["ticker"]), "timestamp": ts, "close": preco})
+    return pd.DataFrame(linhas)
+
+
+def _disparos_do_motor(barras: pd.DataFrame, cfg) -> dict[str, pd.Timestamp]:
+    """O motor ciclo a ciclo: uma cotação por intervalo, contagens zeradas a cada pregão."""
+    largo = barras.pivot_table(index="timestamp", columns="ticker", values="close", aggfunc="last")
+    tickers = [ticker_yahoo(a["ticker"]) for a in ATIVOS]
+    disparos: dict[str, pd.Timestamp] = {}
+    carteira, dia = None, None
+    for instante in pd.date_range(largo.index[0].ceil(f"{cfg.intervalo}s"), largo.index[-1], freq=f"{cfg.intervalo}s"):
+        local = instante.tz_convert(cfg.tz)
+        if not cfg.inicio_pregao <= local.time() <= cfg.fim_pregao:
+            continue
+        if local.date() != dia:  # abertura_diaria
+            dia = local.date()
+            carteira = CarteiraColunar({"ativos": ATIVOS}, cfg.estrategia)
+        precos = largo.reindex([instante], method="ffill").loc[instante, tickers].to_numpy(dtype=float)
+        r = carteira.avaliar(precos, instante.timestamp(), cfg.tempo_maximo)
+        for i in r.disparos.tolist():
+            disparos.setdefault(ATIVOS[i]["ticker"], local)
+    return disparos
+
+
+@pytest.mark.parametrize("robo", [robot_clube, robot_loss_clube], ids=["clube", "loss_clube"])
+def test_simular_dispara_nos_mesmos_instantes_que_o_motor(robo):
+    barras = _barras(robo.CONFIG.estrategia)
+
+    simulados = simular(barras, ATIVOS, robo.CONFIG)
+    motor = _disparos_do_motor(barras, robo.CONFIG)
+
+    assert dict(zip(simulados["ticker"], simulados["disparo"])) == motor
+    # o buraco não conta como tempo na zona e a virada do dia zera a contagem
+    assert {t: d.strftime("%d %H:%M") for t, d in motor.items()} == {
+        "AAA": "03 03:02", "BBB": "03 03:12", "CCC": "02 23:49",
+    }
@@ -0,0 +1,155 @@
+# tests/test_carteira.py
+import numpy as np
+import pytest
+
+from core.carteira import CarteiraColunar
+from core.engine import EstrategiaAlvo, EstrategiaStop
+
+T0 = 1_735_822_800.0  # 2025-01-02 13:00 UTC
+
+
+def _carteira(estrategia=None, ativos=None) -> CarteiraColunar:
+    estado = {
+        "ativos": ativos or [{"ticker": "PETR4", "preco": 30.0, "operacao": "compra"}],
+        "tempo_acumulado": {},
+        "em_contagem": {},
+        "status": {},
+    }
+    return CarteiraColunar(estado, estrategia or EstrategiaAlvo())
+
+
+@pytest.mark.parametrize("invalido", [-1.0, np.nan])
+def test_ciclos_sem_cotacao_nao_contam_como_tempo_na_zona(invalido):
+    c = _carteira()
+
+    c.avaliar([31.0], T0, tempo_maximo=120)
+    c.avaliar([invalido], T0 + 60, tempo_maximo=120)
+    c.avaliar([invalido], T0 + 120, tempo_maximo=120)
+    r = c.avaliar([31.0], T0 + 180, tempo_maximo=120)
+
+    assert c.tempo[0] == 60.0
+    assert len(r.disparos) == 0
+
+
+# (estratégia, operação, preço na zona, preço fora da zona) com alvo 30
+CASOS = [
+    (EstrategiaAlvo(), "compra", 31.0, 29.0),
+    (EstrategiaAlvo(), "venda", 29.0, 31.0),
+    (EstrategiaStop(), "compra", 29.0, 31.0),
+    (EstrategiaStop(), "venda", 31.0, 29.0),
+]
+IDS = ["alvo-compra", "alvo-venda", "stop-compra", "stop-venda"]
+
+
+@pytest.mark.parametrize("estrategia,operacao,dentro,fora", CASOS, ids=IDS)
+def test_entrada_contagem_e_disparo(estrategia, operacao, dentro, fora):
+    c = _carteira(estrategia, [{"ticker": "PETR4", "preco": 30.0, "operacao": operacao}])
+
+    r = c.avaliar([fora], T0, tempo_maximo=120)
+    assert len(r.entradas) == len(r.contando) == 0
+    assert not c.em_contagem[0]
+
+    r = c.avaliar([dentro], T0 + 60, tempo_maximo=120)
+    assert r.entradas.tolist() == [0]
+    assert c.tempo[0] == 0.0
+
+    r = c.avaliar([dentro], T0 + 120, tempo_maximo=120)
+    assert r.contando.tolist() == [0] and len(r.disparos) == 0
+    assert c.tempo[0] == 60.0
+
+    r = c.avaliar([dentro], T0 + 180, tempo_maximo=120)
+    assert r.disparos.tolist() == [0]
+    assert c.tempo[0] == 120.0
+
+
+@pytest.mark.parametrize("estrategia,operacao,dentro,fora", CASOS, ids=IDS)
+def test_saida_e_reentrada_na_zona(estrategia, operacao, dentro, fora):
+    c = _carteira(estrategia, [{"ticker": "PETR4", "preco": 30.0, "operacao": operacao}])
+    c.avaliar([dentro], T0, tempo_maximo=600)
+    c.avaliar([dentro], T0 + 60, tempo_maximo=600)
+
+    r = c.avaliar([fora], T0 + 120, tempo_maximo=600)
+    r_volta = c.avaliar([dentro], T0 + 180, tempo_maximo=600)
+    c.avaliar([dentro], T0 + 240, tempo_maximo=600)
+
+    if estrategia.zera_ao_sair:
+        # STOP: sair zera a contagem e a volta é uma nova entrada
+        assert r.saidas.tolist() == [0]
+        assert r_volta.entradas.tolist() == [0]
+        assert c.tempo[0] == 60.0
+    else:
+        # alvo: o tempo já contado fica, mas o período fora da zona não soma
+        assert len(r.saidas) == 0
+        assert r_volta.contando.tolist() == [0]
+        assert c.tempo[0] == 120.0
+
+
+def test_saida_do_stop_marca_fora_da_zona_no_estado():
+    estrategia = EstrategiaStop()
+    estado = {"ativos": [{"ticker": "PETR4", "preco": 30.0, "operacao": "compra"}]}
+    c = CarteiraColunar(estado, estrategia)
+    c.avaliar([29.0], T0, tempo_maximo=600)
+    c.avaliar([29.0], T0 + 60, tempo_maximo=600)
+
+    r = c.avaliar([31.0], T0 + 120, tempo_maximo=600)
+    c.exportar(estado, r.saidas)
+
+    assert estado["status"] == {"PETR4": estrategia.status_fora}
+    assert estado["em_contagem"] == {"PETR4": False}
+    assert estado["tempo_acumulado"] == {"PETR4": 0.0}
+
+
+@pytest.mark.parametrize("invalido", [0.0, -1.0, np.nan])
+def test_preco_invalido_nao_mexe_na_contagem(invalido):
+    c = _carteira(ativos=[
+        {"ticker": "PETR4", "preco": 30.0, "operacao": "compra"},
+        {"ticker": "VALE3", "preco": 60.0, "operacao": "compra"},
+    ])
+    c.avaliar([31.0, 61.0], T0, tempo_maximo=600)
+    c.avaliar([31.0, 61.0], T0 + 60, tempo_maximo=600)
+
+    r = c.avaliar([invalido, 61.0], T0 + 120, tempo_maximo=600)
+
+    assert r.invalidos.tolist() == [0]
+    assert r.contando.tolist() == [1]
+    assert c.em_contagem[0] and c.tempo[0] == 60.0
+    assert c.tempo[1] == 120.0
+
+
+def test_operacao_desconhecida_nunca_entra_na_zona():
+    c = _carteira(ativos=[{"ticker": "PETR4", "preco": 30.0, "operacao": "outra"}])
+
+    for k in range(5):
+        r = c.avaliar([31.0], T0 + 60 * k, tempo_maximo=60)
+
+    assert len(r.entradas) == len(r.disparos) == 0
+    assert not c.em_contagem[0]
+
+
+@pytest.mark.parametrize("status", ["🚀 Disparado", "✅ Removendo...", "✅ Ativado (removido)"])
+def test_ja_disparado_vira_duplicado_e_nao_dispara_de_novo(status):
+    estado = {
+        "ativos": [{"ticker": "PETR4", "preco": 30.0, "operacao": "compra"}],
+        "tempo_acumulado": {"PETR4": 60.0},
+        "em_contagem": {"PETR4": True},
+        "status": {"PETR4": status},
+    }
+    c = CarteiraColunar(estado, EstrategiaAlvo(), {"PETR4": T0})
+
+    r = c.avaliar([31.0], T0 + 60, tempo_maximo=120)
+
+    assert c.tempo[0] == 120.0
+    assert r.duplicados.tolist() == [0]
+    assert len(r.disparos) == 0
+
+
+def test_tick_atrasado_nao_volta_no_tempo():
+    c = _carteira()
+    c.avaliar([31.0], T0, tempo_maximo=600)
+    c.avaliar([31.0], T0 + 60, tempo_maximo=600)
+
+    c.avaliar([31.0], T0 + 30, tempo_maximo=600)  # tick fora de ordem
+    c.avaliar([31.0], T0 + 90, tempo_maximo=600)
+
+    assert c.tempo[0] == 90.0
+    assert c.ultimas_na_zona() == {"PETR4": T0 + 90}
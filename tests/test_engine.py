@@ -0,0 +1,124 @@
+# tests/test_engine.py
+import datetime
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from core import engine as modulo_engine
+from core.engine import RobotEngine
+from core.feed import FeedCotacoes, Tick
+from core.providers import ProvedorCotacoes
+from services.robots.robot_clube import CONFIG
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TICK_GRAVADO = 1_735_822_800.0  # instante de um tick de replay (2025-01-02 13:00 UTC)
+
+
+class FeedManual(FeedCotacoes):
+    nome = "manual"
+
+    def _conectar_e_ler(self) -> None:
+        self.conectado = True
+        self._parar.wait()
+
+
+class ProvedorFixo(ProvedorCotacoes):
+    nome = "fixo"
+
+    def __init__(self, preco: float):
+        self.preco = preco
+
+    def cotacoes(self, tickers: list[str]) -> dict[str, float]:
+        return {t: self.preco for t in tickers}
+
+
+def _engine(feed: FeedCotacoes, provedor: ProvedorCotacoes) -> tuple[RobotEngine, list]:
+    agora = datetime.datetime.now(CONFIG.tz).replace(hour=12, minute=0)
+    estado = {
+        "ativos": [{"ticker": "PETR4", "preco": 30.0, "operacao": "compra"}],
+        "ultima_data_abertura_enviada": str(agora.date()),
+    }
+    disparos = []
+    engine = RobotEngine(
+        CONFIG,
+        carregar=lambda k: estado,
+        carregar_se_alterado=lambda k: (False, None),
+        salvar=lambda *a, **k: None,
+        apagar=lambda *a, **k: None,
+        alertar=lambda *a: disparos.append(a),
+        arquivar=lambda *a, **k: True,
+        arquivar_no_disparo=lambda *a, **k: True,
+        provedor=provedor,
+        feed=feed,
+    )
+    engine.agora = lambda: agora
+    assert engine.iniciar()
+    return engine, disparos
+
+
+def test_troca_do_feed_para_o_polling_nao_soma_a_diferenca_dos_relogios():
+    feed = FeedManual()
+    engine, disparos = _engine(feed, ProvedorFixo(31.0))
+    try:
+        feed.assinar(CONFIG.nome, ["PETR4"])
+        while not feed.conectado:
+            time.sleep(0.01)
+        feed.publicar([Tick("PETR4.SA", 31.0, TICK_GRAVADO)])
+        engine.executar_ciclo()
+        assert engine.estado["em_contagem"]["PETR4"]
+
+        # o feed cai: o ciclo segue por polling, no relógio da máquina
+        feed.conectado = False
+        engine.executar_ciclo()
+        engine.executar_ciclo()
+    finally:
+        feed.parar()
+
+    assert engine.estado["tempo_acumulado"]["PETR4"] < CONFIG.tempo_maximo
+    assert disparos == []
+
+
+@pytest.mark.parametrize("com_feed", [False, True], ids=["polling", "feed"])
+def test_aguardar_termina_quando_o_runtime_encerra(com_feed, monkeypatch):
+    monkeypatch.setattr(modulo_engine, "PASSO_ESPERA", 0.5)
+    feed = FeedManual() if com_feed else None
+    engine, _ = _engine(feed, ProvedorFixo(31.0))
+    if feed is not None:
+        feed.assinar(CONFIG.nome, ["PETR4"])
+    threading.Timer(0.3, modulo_engine.ENCERRAR.set).start()
+    try:
+        inicio = time.monotonic()
+        engine.aguardar(120)
+        decorrido = time.monotonic() - inicio
+    finally:
+        modulo_engine.ENCERRAR.clear()
+        if feed is not None:
+            feed.parar()
+
+    assert decorrido < modulo_engine.PASSO_ESPERA + 1
+
+
+def test_sigterm_encerra_o_runtime_sem_esperar_o_proximo_ciclo(supabase):
+    supabase.semear("kv_state_curto", "curto_przo_v1", {
+        "ativos": [], "tempo_acumulado": {}, "em_contagem": {}, "status": {}, "historico_alertas": [],
+    })
+    codigo = (
+        "import asyncio, os, signal, threading\n"
+        "from services.robots import robots_runtime as rt\n"
+        "rt.ROBOTS[:] = [('CURTO', 'services.robots.robot_curto')]\n"
+        "rt.instalar_descarga_no_sigterm(rt.encerrar)\n"
+        "threading.Timer(4, os.kill, (os.getpid(), signal.SIGTERM)).start()\n"
+        "asyncio.run(rt.main())\n"
+    )
+    # feed fora do ar: o robô passa a espera entre ciclos em engine.aguardar, numa thread do pool
+    env = dict(os.environ, MARKET_FEED_URL="http://127.0.0.1:9/ticks")
+    inicio = time.monotonic()
+    proc = subprocess.run([sys.executable, "-c", codigo], env=env, cwd=RAIZ, timeout=60,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    assert proc.returncode == 0
+    assert time.monotonic() - inicio < 4 + modulo_engine.PASSO_ESPERA + 10
@@ -0,0 +1,98 @@
+# tests/test_feed.py
+import time
+
+import pandas as pd
+import pytest
+
+from core.feed import FeedCotacoes, FeedLongPoll, FeedWebSocket, Tick
+
+pytest.importorskip("websockets")
+from services.feed_replay import ServidorReplay  # noqa: E402
+
+INICIO = pd.Timestamp("2025-01-02 13:00", tz="UTC")
+
+
+def _ticks() -> pd.DataFrame:
+    linhas = []
+    for i in range(30):
+        for ticker, base in (("PETR4", 30.0), ("VALE3", 60.0), ("ITUB4", 25.0)):
+            linhas.append({"ticker": ticker, "timestamp": INICIO + pd.Timedelta(seconds=10 * i), "preco": base + i / 10})
+    return pd.DataFrame(linhas)
+
+
+class FeedManual(FeedCotacoes):
+    nome = "manual"
+
+    def _conectar_e_ler(self) -> None:
+        self.conectado = True
+        self._parar.wait()
+
+
+@pytest.fixture
+def replay():
+    servidor = ServidorReplay(ticks=_ticks(), velocidade=0).iniciar()
+    yield servidor
+    servidor.parar()
+
+
+def _coletar_tudo(feed: FeedCotacoes, esperados: int, consumidor: str = "curto", prazo: float = 10.0) -> list[Tick]:
+    recebidos = []
+    limite = time.monotonic() + prazo
+    while len(recebidos) < esperados and time.monotonic() < limite:
+        recebidos += feed.coletar(consumidor, timeout=0.5)
+    return recebidos
+
+
+@pytest.mark.parametrize("protocolo", ["websocket", "longpoll"])
+def test_feed_recebe_todos_os_ticks_do_replay(replay, protocolo):
+    feed = FeedWebSocket(replay.url_ws) if protocolo == "websocket" else FeedLongPoll(replay.url_http, espera=1)
+    try:
+        feed.assinar("curto", ["PETR4", "VALE3"])
+        recebidos = _coletar_tudo(feed, esperados=60)
+    finally:
+        feed.parar()
+
+    assert replay.terminou
+    assert {t.ticker for t in recebidos} == {"PETR4.SA", "VALE3.SA"}
+    # a fotografia da assinatura e os ticks novos não se repetem
+    assert len(recebidos) == len({(t.ticker, t.instante) for t in recebidos}) == 60
+    ultimos = feed.ultimos(["PETR4", "VALE3", "ITUB4"])
+    assert set(ultimos) == {"PETR4.SA", "VALE3.SA"}
+    assert ultimos["PETR4.SA"].preco == pytest.approx(32.9)
+    assert feed.relogio == (INICIO + pd.Timedelta(seconds=290)).timestamp()
+
+
+def test_replay_entrega_a_fotografia_a_quem_assina_depois(replay):
+    feed = FeedLongPoll(replay.url_http, espera=1)
+    try:
+        feed.assinar("curto", ["PETR4"])
+        _coletar_tudo(feed, esperados=30)
+        feed.assinar("loss", ["ITUB4"])
+        atrasados = _coletar_tudo(feed, esperados=1, consumidor="loss")
+    finally:
+        feed.parar()
+
+    assert [(t.ticker, t.preco) for t in atrasados] == [("ITUB4.SA", pytest.approx(27.9))]
+
+
+def test_janela_nao_passa_do_timeout():
+    feed = FeedManual()
+    try:
+        feed.assinar("curto", ["PETR4"])
+        feed.publicar([Tick("PETR4.SA", 30.0, time.time())])
+        inicio = time.monotonic()
+        ticks = feed.coletar("curto", timeout=0.2, janela=5.0)
+        decorrido = time.monotonic() - inicio
+    finally:
+        feed.parar()
+
+    assert len(ticks) == 1
+    assert decorrido < 1.0
+
+
+def test_feed_sem_conexao_nao_instancia():
+    class SemConexao(FeedCotacoes):
+        pass
+
+    with pytest.raises(TypeError):
+        SemConexao()
@@ -0,0 +1,168 @@
+# tests/test_fontes.py
+import pytest
+
+from core.prices import Disjuntor, GerenciadorFontes
+
+
+class Relogio:
+    """Relógio manual: as fontes falsas avançam o tempo pela latência delas."""
+
+    def __init__(self):
+        self.agora = 1000.0
+
+    def __call__(self) -> float:
+        return self.agora
+
+
+LOTE = ["PETR4.SA", "VALE3.SA"]
+
+
+def _fonte(relogio: Relogio, latencia: float, falhas_a_cada: int = 0, erro: bool = False, inexistentes=()):
+    """
+    Fonte falsa: demora `latencia` s e devolve vazio (ou levanta) a cada
+    `falhas_a_cada` chamadas; `inexistentes` nunca têm preço.
+    """
+    chamadas = [0]
+
+    def buscar(simbolos, timeout):
+        chamadas[0] += 1
+        relogio.agora += latencia
+        if falhas_a_cada and chamadas[0] % falhas_a_cada == 0:
+            if erro:
+                raise ConnectionError("fonte fora")
+            return {}
+        return {t: 10.0 for t in simbolos if t not in inexistentes}
+
+    return buscar
+
+
+def _gerenciador(relogio: Relogio, fontes: dict, limite_falhas: int = 3) -> GerenciadorFontes:
+    disjuntores = {nome: Disjuntor(nome, limite_falhas=limite_falhas, tempo_aberto=600) for nome in fontes}
+    return GerenciadorFontes(fontes, disjuntores, relogio=relogio)
+
+
+def _rodar(g: GerenciadorFontes, vezes: int) -> None:
+    for _ in range(vezes):
+        for nome in g.fontes:
+            try:
+                g.chamar(nome, LOTE, timeout=5)
+            except ConnectionError:
+                pass
+
+
+def test_ordem_por_latencia_penalizada_pela_taxa_de_erro():
+    relogio = Relogio()
+    g = _gerenciador(relogio, {
+        "lenta": _fonte(relogio, 1.0),
+        "instavel": _fonte(relogio, 0.05, falhas_a_cada=2),   # 50% vazia
+        "rapida": _fonte(relogio, 0.1),
+    }, limite_falhas=100)
+
+    _rodar(g, 10)
+
+    est = g.estatisticas("instavel")
+    assert est["amostras"] == 10
+    assert est["latencia"] == pytest.approx(0.05)
+    assert est["taxa_erro"] == pytest.approx(0.5)
+    # custo: rapida 0.1 < instavel 0.05 × (1 + 4 × 0.5) = 0.15 < lenta 1.0
+    assert g.ordem() == ["rapida", "instavel", "lenta"]
+
+
+def test_lote_vazio_conta_como_falha_no_ranking_e_no_disjuntor():
+    relogio = Relogio()
+    g = _gerenciador(relogio, {
+        "vazia": _fonte(relogio, 0.01, falhas_a_cada=1),
+        "boa": _fonte(relogio, 0.5),
+    })
+
+    for _ in range(3):
+        assert g.chamar("vazia", LOTE, timeout=5) == {}
+
+    assert g.estatisticas("vazia")["taxa_erro"] == 1.0
+    assert g.disjuntores["vazia"].aberto
+    assert g.ordem() == ["boa"]
+
+
+def test_erro_conta_como_falha_e_e_propagado():
+    relogio = Relogio()
+    g = _gerenciador(relogio, {"fora": _fonte(relogio, 0.2, falhas_a_cada=1, erro=True)})
+
+    with pytest.raises(ConnectionError):
+        g.chamar("fora", ["PETR4.SA"], timeout=5)
+
+    est = g.estatisticas("fora")
+    assert est["taxa_erro"] == 1.0
+    assert est["latencia"] == pytest.approx(0.2)
+    assert g.disjuntores["fora"].falhas_seguidas == 1
+
+
+def test_sucesso_zera_as_falhas_seguidas():
+    relogio = Relogio()
+    g = _gerenciador(relogio, {"alterna": _fonte(relogio, 0.1, falhas_a_cada=2)})
+
+    _rodar(g, 5)
+
+    assert not g.disjuntores["alterna"].aberto
+    assert g.estatisticas("alterna")["taxa_erro"] == pytest.approx(0.4)
+
+
+def test_pedido_sem_tickers_nao_e_falha():
+    relogio = Relogio()
+    g = _gerenciador(relogio, {"vazia": _fonte(relogio, 0.1, falhas_a_cada=1)})
+
+    assert g.chamar("vazia", [], timeout=5) == {}
+    assert g.estatisticas("vazia")["taxa_erro"] == 0.0
+    assert g.disjuntores["vazia"].falhas_seguidas == 0
+
+
+def test_fonte_sem_medicoes_recentes_volta_para_a_posicao_padrao():
+    relogio = Relogio()
+    g = _gerenciador(relogio, {
+        "primeira": _fonte(relogio, 2.0),
+        "segunda": _fonte(relogio, 0.1),
+    })
+    _rodar(g, 3)
+    assert g.ordem() == ["segunda", "primeira"]
+
+    relogio.agora += g.validade + 1
+    assert g.ordem() == ["primeira", "segunda"]
+
+
+def test_ticker_sem_cotacao_em_nenhuma_fonte_nao_abre_os_disjuntores():
+    relogio = Relogio()
+    inexistentes = {"XXXX9.SA", "YYYY9.SA"}
+    g = _gerenciador(relogio, {
+        nome: _fonte(relogio, 0.1, inexistentes=inexistentes) for nome in ("price", "v7", "history")
+    })
+
+    # o ciclo de um robô: lote e, para quem faltou, rodadas individuais por todas as fontes
+    for _ in range(3):
+        g.chamar("price", [*LOTE, *inexistentes], timeout=5)
+        for ticker in sorted(inexistentes):
+            for _ in range(3):
+                for nome in g.ordem():
+                    assert g.chamar(nome, [ticker], timeout=5) == {}
+        # o lote só com os que nenhuma fonte cota também não é falha da fonte
+        for nome in g.ordem():
+            assert g.chamar(nome, sorted(inexistentes), timeout=5) == {}
+
+    assert not any(d.aberto for d in g.disjuntores.values())
+    assert g.ordem() == ["price", "v7", "history"]
+    assert g.chamar("price", LOTE, timeout=5) == {t: 10.0 for t in LOTE}
+    assert g.sem_cotacao() == sorted(inexistentes)
+
+
+def test_ticker_volta_a_ser_cotavel_quando_uma_fonte_o_devolve():
+    relogio = Relogio()
+    g = _gerenciador(relogio, {
+        "price": _fonte(relogio, 0.1, inexistentes={"XXXX9.SA"}),
+        "v7": _fonte(relogio, 0.1, inexistentes={"XXXX9.SA"}),
+    })
+    g.chamar("price", ["XXXX9.SA"], timeout=5)
+    g.chamar("v7", ["XXXX9.SA"], timeout=5)
+    assert g.sem_cotacao() == ["XXXX9.SA"]
+
+    g.fontes["v7"] = _fonte(relogio, 0.1)
+    g.chamar("v7", ["XXXX9.SA"], timeout=5)
+
+    assert g.sem_cotacao() == []
@@ -0,0 +1,49 @@
+# tests/test_logger.py
+import threading
+
+from core import logger
+from core.config import LOG_AMOSTRAGEM
+
+
+def _em_paralelo(alvo, n_threads: int = 8) -> None:
+    barreira = threading.Barrier(n_threads)
+
+    def rodar():
+        barreira.wait()
+        alvo()
+
+    threads = [threading.Thread(target=rodar) for _ in range(n_threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(10)
+
+
+def test_primeiro_log_em_varias_threads_configura_uma_vez(monkeypatch):
+    logger.encerrar_logs()
+    chamadas = []
+    original = logger.configurar_logs
+
+    def contar(*args, **kwargs):
+        chamadas.append(1)
+        original(*args, **kwargs)
+
+    monkeypatch.setattr(logger, "configurar_logs", contar)
+    _em_paralelo(lambda: logger.log("teste", "🧪"))
+
+    assert len(chamadas) == 1
+    assert len(logger._logger.handlers) == 1
+
+
+def test_amostragem_nao_perde_contagens_entre_threads():
+    chave = "teste-paralelo"
+    por_thread = 500
+
+    def amostrar_varias():
+        for _ in range(por_thread):
+            logger.amostrar(chave)
+
+    _em_paralelo(amostrar_varias)
+
+    assert logger._amostras[(logger.robo_atual.get(), chave)] == 8 * por_thread
+    assert LOG_AMOSTRAGEM >= 1
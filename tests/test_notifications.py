@@ -0,0 +1,79 @@
+# tests/test_notifications.py
+import asyncio
+import time
+
+from core import notifications
+from core.notifications import ClienteTelegram, FilaAlertas
+
+
+class TelegramFalso:
+    """Falha uma vez em cada chat de `instaveis`; registra quem recebeu cada tentativa."""
+
+    def __init__(self, instaveis: set[str]):
+        self.instaveis = set(instaveis)
+        self.tentativas: list[list[str]] = []
+
+    def enviar_falhos(self, chat_ids, mensagem):
+        self.tentativas.append(list(chat_ids))
+        falhos = [c for c in chat_ids if c in self.instaveis]
+        self.instaveis -= set(falhos)
+        return falhos
+
+
+def test_nova_tentativa_vai_so_para_os_chats_que_falharam(monkeypatch):
+    falso = TelegramFalso({"2"})
+    monkeypatch.setattr(notifications, "CLIENTE_TELEGRAM", falso)
+    monkeypatch.setitem(notifications.ROBOTS["curto"], "EMAIL_RECIPIENT", "")
+    monkeypatch.setitem(notifications.ROBOTS["curto"], "TELEGRAM_CHAT_ID", "1, 2, 3")
+    fila = FilaAlertas(tentativas=3, espera_base=0.01)
+
+    assert fila.enfileirar("curto", "assunto", "<b>html</b>", "texto")
+    assert fila.drenar(timeout=10)
+
+    assert falso.tentativas == [["1", "2", "3"], ["2"]]
+    m = fila.metricas()["telegram"]
+    assert (m["enviados"], m["retentativas"], m["falhas"]) == (1, 1, 0)
+
+
+def test_envios_paralelos_criam_um_unico_bot(monkeypatch, telegram):
+    criados = []
+    Original = notifications.Bot
+
+    class BotContado(Original):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            criados.append(self)
+
+    monkeypatch.setattr(notifications, "Bot", BotContado)
+    cliente = ClienteTelegram(token="123456:TESTE")
+    try:
+        falhos = cliente.enviar_falhos([str(i) for i in range(1, 9)], "oi")
+    finally:
+        cliente.fechar()
+
+    assert falhos == []
+    assert len(criados) == 1
+
+
+def test_enviar_telegram_async_devolve_true_quando_todos_recebem(telegram):
+    assert asyncio.run(notifications.enviar_telegram_async("1,2", "oi")) is True
+
+
+def test_envio_que_passa_do_timeout_e_cancelado_antes_de_contar_como_falha():
+    cliente = ClienteTelegram(token="123456:TESTE", timeout=0.3)
+    entregues = []
+
+    async def enviar(chat_id, mensagem):
+        await asyncio.sleep(1.0 if chat_id == "lento" else 0)
+        entregues.append(chat_id)
+        return True
+
+    cliente._enviar = enviar
+    try:
+        falhos = cliente.enviar_falhos(["1", "lento", "2"], "oi")
+        time.sleep(1.0)  # tempo de sobra para o envio lento chegar, se não tivesse sido cancelado
+    finally:
+        cliente.fechar()
+
+    assert falhos == ["lento"]
+    assert sorted(entregues) == ["1", "2"]
@@ -0,0 +1,111 @@
+# tests/test_prices.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from core import prices
+from core.prices import CacheCotacoes, CacheCotacoesArquivo, CotacoesCiclo, Disjuntor, GerenciadorFontes
+
+
+@pytest.fixture(params=["memoria", "arquivo"])
+def cache(request, tmp_path, monkeypatch):
+    c = CacheCotacoes() if request.param == "memoria" else CacheCotacoesArquivo(str(tmp_path / "cotacoes.sqlite"))
+    monkeypatch.setattr(prices, "CACHE_COTACOES", c)
+    return c
+
+
+def test_cache_devolve_o_instante_da_busca_original(cache):
+    buscado_em = time.time() - 12
+    cache.gravar({"PETR4.SA": 30.5, "VALE3.SA": 61.0}, buscado_em)
+
+    achados = cache.obter_com_instantes(["PETR4.SA", "VALE3.SA", "ITUB4.SA"])
+
+    assert achados["PETR4.SA"] == (30.5, pytest.approx(buscado_em))
+    assert set(achados) == {"PETR4.SA", "VALE3.SA"}
+    assert cache.obter(["PETR4.SA"]) == {"PETR4.SA": 30.5}
+
+
+def test_cotacao_vinda_do_cache_mantem_seu_instante_no_ciclo(cache):
+    buscado_em = time.time() - 12
+    cache.gravar({"PETR4.SA": 30.5}, buscado_em)
+
+    cotacoes = CotacoesCiclo(["PETR4"])
+
+    assert cotacoes.preco("PETR4") == 30.5
+    assert cotacoes.instantes(["PETR4"])[0] == pytest.approx(buscado_em)
+    assert cotacoes.momento > buscado_em + 10
+
+
+def test_cache_vencido_nao_e_usado(cache):
+    cache.gravar({"PETR4.SA": 30.5}, time.time() - cache.ttl - 5)
+
+    assert cache.obter_com_instantes(["PETR4.SA"]) == {}
+
+
+@pytest.fixture
+def fonte_lenta(monkeypatch):
+    """
+    Todas as fontes viram uma fonte falsa: tickers em `demoras` levam esse
+    tanto de segundos (sem passar do `timeout` recebido), os demais respondem
+    na hora. Guarda o `timeout` que cada ticker recebeu.
+    """
+    demoras: dict[str, float] = {}
+    orcamentos: dict[str, float] = {}
+    trava = threading.Lock()
+
+    def buscar(simbolos, timeout):
+        with trava:
+            orcamentos.update((t, timeout) for t in simbolos)
+        demora = max((demoras.get(t, 0.0) for t in simbolos), default=0.0)
+        if demora:
+            time.sleep(min(demora, timeout))
+            if demora > timeout:
+                raise TimeoutError("fonte lenta")
+        return {t: 10.0 for t in simbolos}
+
+    fontes = {nome: buscar for nome in prices.FONTES}
+    disjuntores = {nome: Disjuntor(nome, limite_falhas=1000) for nome in fontes}
+    monkeypatch.setattr(prices, "GERENCIADOR_FONTES", GerenciadorFontes(fontes, disjuntores))
+    return demoras, orcamentos
+
+
+def test_busca_concorrente_devolve_o_parcial_no_prazo(fonte_lenta):
+    demoras, _ = fonte_lenta
+    demoras["LENTO3.SA"] = 5.0
+
+    inicio = time.monotonic()
+    precos = prices.obter_precos_concorrente(["PETR4.SA", "LENTO3.SA", "VALE3.SA"], prazo=1.0)
+    decorrido = time.monotonic() - inicio
+
+    assert precos == {"PETR4.SA": 10.0, "LENTO3.SA": -1.0, "VALE3.SA": 10.0}
+    assert decorrido < 1.5
+
+
+def test_quem_espera_na_fila_usa_o_que_sobrou_do_prazo(fonte_lenta, monkeypatch):
+    demoras, orcamentos = fonte_lenta
+    demoras["LENTO3.SA"] = 0.8
+    monkeypatch.setattr(prices, "_POOL_BUSCAS", ThreadPoolExecutor(max_workers=1))
+
+    inicio = time.monotonic()
+    precos = prices.obter_precos_concorrente(["LENTO3.SA", "PETR4.SA"], prazo=2.0)
+    decorrido = time.monotonic() - inicio
+
+    assert precos == {"LENTO3.SA": 10.0, "PETR4.SA": 10.0}
+    # o prazo é um só: PETR4 saiu da fila depois do LENTO3 com ~1.2s, não com 2s
+    assert orcamentos["LENTO3.SA"] == pytest.approx(2.0, abs=0.1)
+    assert orcamentos["PETR4.SA"] <= 2.0 - 0.8 + 0.05
+    assert decorrido < 2.0
+
+
+def test_quem_sai_da_fila_depois_do_prazo_nem_busca(fonte_lenta, monkeypatch):
+    demoras, orcamentos = fonte_lenta
+    demoras["LENTO3.SA"] = 1.0
+    monkeypatch.setattr(prices, "_POOL_BUSCAS", ThreadPoolExecutor(max_workers=1))
+
+    precos = prices.obter_precos_concorrente(["LENTO3.SA", "PETR4.SA"], prazo=1.2)
+    time.sleep(0.3)  # deixa o PETR4 sair da fila
+
+    assert precos == {"LENTO3.SA": 10.0, "PETR4.SA": -1.0}
+    assert "PETR4.SA" not in orcamentos
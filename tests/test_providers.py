@@ -0,0 +1,29 @@
+# tests/test_providers.py
+import pytest
+
+from core.feed import FeedCotacoes, ProvedorFeed
+from core.providers import ProvedorCotacoes
+
+
+class FeedParado(FeedCotacoes):
+    nome = "parado"
+
+    def _conectar_e_ler(self) -> None:
+        self._parar.wait()
+
+
+def test_provedor_sem_cotacoes_nao_instancia():
+    class SemCotacoes(ProvedorCotacoes):
+        pass
+
+    with pytest.raises(TypeError):
+        SemCotacoes()
+
+
+def test_historico_padrao_e_vazio_com_a_coluna_close():
+    provedor = ProvedorFeed(FeedParado())
+
+    hist = provedor.historico("PETR4.SA")
+
+    assert hist.empty
+    assert list(hist.columns) == ["close"]
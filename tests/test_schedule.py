@@ -0,0 +1,71 @@
+# tests/test_schedule.py
+import pytest
+
+from core.schedule import Agendador
+
+
+class Relogio:
+    """Relógio monotônico manual."""
+
+    def __init__(self):
+        self.agora = 500.0
+
+    def __call__(self) -> float:
+        return self.agora
+
+
+def _ciclo(agendador: Agendador, relogio: Relogio, duracao: float) -> float:
+    """Um ciclo que leva `duracao` s; devolve a espera e já a cumpre."""
+    agendador.inicio()
+    relogio.agora += duracao
+    espera = agendador.espera()
+    relogio.agora += espera
+    return espera
+
+
+def test_desconta_a_duracao_do_ciclo_sem_deriva():
+    relogio = Relogio()
+    agendador = Agendador(60, relogio=relogio)
+    inicio = relogio.agora
+
+    esperas = [_ciclo(agendador, relogio, duracao) for duracao in (5.0, 12.5, 0.0, 59.9)]
+
+    assert esperas == pytest.approx([55.0, 47.5, 60.0, 0.1])
+    assert relogio.agora == pytest.approx(inicio + 4 * 60)
+    assert agendador.ciclos == 4
+    assert agendador.atrasos == 0 and agendador.ultimo_atraso == 0.0
+
+
+def test_ciclo_atrasado_nao_espera_e_conta_o_atraso():
+    relogio = Relogio()
+    agendador = Agendador(60, relogio=relogio)
+
+    assert _ciclo(agendador, relogio, 75.0) == 0.0
+    assert agendador.ultimo_atraso == pytest.approx(15.0)
+    assert agendador.atrasos == 1
+
+    # o próximo prazo conta a partir do fim do ciclo atrasado (sem rajada para compensar)
+    fim_do_atrasado = relogio.agora
+    assert _ciclo(agendador, relogio, 10.0) == pytest.approx(50.0)
+    assert relogio.agora == pytest.approx(fim_do_atrasado + 60)
+    assert agendador.ultimo_atraso == 0.0
+
+    _ciclo(agendador, relogio, 90.0)
+    assert agendador.atrasos == 2
+    assert agendador.atraso_total == pytest.approx(15.0 + 30.0)
+
+
+def test_ciclo_exatamente_no_prazo_nao_e_atraso():
+    relogio = Relogio()
+    agendador = Agendador(60, relogio=relogio)
+
+    assert _ciclo(agendador, relogio, 60.0) == 0.0
+    assert agendador.atrasos == 0
+
+
+def test_espera_sem_inicio_comeca_a_contar_no_fim_do_ciclo():
+    relogio = Relogio()
+    agendador = Agendador(30, relogio=relogio)
+
+    assert agendador.espera() == pytest.approx(30.0)
+    assert agendador.prazo == pytest.approx(relogio.agora + 30)
@@ -0,0 +1,107 @@
+# tests/test_smtp.py
+import threading
+import time
+from email.mime.text import MIMEText
+
+from core.notifications import PoolSMTP
+
+
+def _mensagem(i: int) -> MIMEText:
+    msg = MIMEText(f"<b>alerta {i}</b>", "html")
+    msg["From"] = "teste@localhost"
+    msg["To"] = "destino@localhost"
+    msg["Subject"] = f"alerta {i}"
+    return msg
+
+
+def _pool(smtp, **kwargs) -> PoolSMTP:
+    return PoolSMTP(host="127.0.0.1", port=smtp.porta, usuario="teste@localhost", senha="teste",
+                    starttls=False, **kwargs)
+
+
+def test_mensagens_seguidas_reaproveitam_a_conexao(smtp):
+    pool = _pool(smtp)
+    antes = smtp.mensagens
+    try:
+        for i in range(5):
+            pool.enviar(_mensagem(i))
+        assert pool.conexoes_abertas == 1
+    finally:
+        pool.fechar()
+
+    assert smtp.mensagens - antes == 5
+    assert pool.conexoes_criadas == 1
+    assert pool.conexoes_abertas == 0
+
+
+def test_envios_paralelos_respeitam_o_tamanho_do_pool(smtp):
+    pool = _pool(smtp, tamanho=2)
+    antes = smtp.mensagens
+    try:
+        threads = [threading.Thread(target=pool.enviar, args=(_mensagem(i),)) for i in range(12)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(10)
+    finally:
+        pool.fechar()
+
+    assert smtp.mensagens - antes == 12
+    assert 1 <= pool.conexoes_criadas <= 2
+    assert pool.conexoes_abertas == 0
+
+
+def test_conexoes_ociosas_sao_fechadas_pela_faxina(smtp):
+    pool = _pool(smtp, idle_timeout=0.2)
+    try:
+        pool.enviar(_mensagem(0))
+        assert len(pool._livres) == 1
+
+        limite = time.monotonic() + 5
+        while pool._livres and time.monotonic() < limite:
+            time.sleep(0.1)
+        assert pool._livres == []
+        assert pool.conexoes_abertas == 0
+
+        # Depois da faxina, o próximo envio abre uma conexão nova
+        pool.enviar(_mensagem(1))
+        assert pool.conexoes_criadas == 2
+        assert pool.conexoes_abertas == 1
+    finally:
+        pool.fechar()
+
+
+def test_fechar_ociosas_so_fecha_as_vencidas(smtp):
+    pool = _pool(smtp, idle_timeout=60)
+    try:
+        pool.enviar(_mensagem(0))
+        assert pool.fechar_ociosas() == 0
+        pool.idle_timeout = 0
+        time.sleep(0.01)
+        assert pool.fechar_ociosas() == 1
+        assert pool._livres == []
+    finally:
+        pool.fechar()
+
+
+def test_conexao_vencida_e_fechada_fora_da_trava(smtp, monkeypatch):
+    pool = _pool(smtp, idle_timeout=60)
+    fechadas_com_trava = []
+    fechar = pool._fechar
+
+    def fechar_vigiando(conexao):
+        fechadas_com_trava.append(pool._lock.locked())
+        fechar(conexao)
+
+    monkeypatch.setattr(pool, "_fechar", fechar_vigiando)
+    try:
+        pool.enviar(_mensagem(0))
+        pool.idle_timeout = 0
+        time.sleep(0.01)
+        pool.enviar(_mensagem(1))  # a livre venceu: _pegar fecha e abre outra
+    finally:
+        pool.fechar()
+
+    assert fechadas_com_trava and not any(fechadas_com_trava)
+    assert pool.conexoes_criadas == 2
+    assert pool.conexoes_abertas == 0
@@ -0,0 +1,162 @@
+# tests/test_state.py
+import datetime
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from supabase import create_client
+
+from benchmarks.ciclo import CHAVE_FALSA
+from core import state
+from core.engine import RobotEngine
+from core.providers import ProvedorSintetico
+from services.robots.robot_curto import CONFIG
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TABELA = "kv_state_curto"
+CHAVE = "curto_przo_v1"
+
+
+def _ativo(ticker: str, preco: float = 10.0) -> dict:
+    return {"ticker": ticker, "preco": preco, "operacao": "compra"}
+
+
+def _semear(supabase, tickers: list[str], **extra) -> None:
+    supabase.semear(TABELA, CHAVE, {
+        "ativos": [_ativo(t) for t in tickers],
+        "tempo_acumulado": {},
+        "em_contagem": {},
+        "status": {},
+        "historico_alertas": [],
+        **extra,
+    })
+
+
+def _nuvem(supabase) -> dict:
+    return supabase.kv[TABELA][CHAVE]["v"]
+
+
+def _robo() -> RobotEngine:
+    return RobotEngine(
+        CONFIG,
+        alertar=lambda *a, **k: None,
+        arquivar=lambda *a, **k: True,
+        arquivar_no_disparo=lambda *a, **k: True,
+        provedor=ProvedorSintetico(semente=1),
+    )
+
+
+# ==================================================
+# 🏁 Painel x robô: ticker incluído durante o disparo
+# ==================================================
+@pytest.mark.parametrize("write_behind", [0, 30])
+def test_disparo_preserva_ticker_incluido_pelo_painel(supabase, monkeypatch, write_behind):
+    monkeypatch.setattr(state, "STATE_WRITE_BEHIND", write_behind)
+    _semear(supabase, ["AAA3", "BBB3"])
+    robo = _robo()
+    assert robo.iniciar()
+
+    # Gravação do robô ainda no buffer (com write-behind) antes do disparo
+    robo.estado["tempo_acumulado"]["BBB3"] = 30.0
+    robo._salvar(CONFIG.state_key, robo.estado)
+
+    # O painel inclui CCC3 sem o robô ter sincronizado
+    v = _nuvem(supabase)
+    _semear(supabase, ["AAA3", "BBB3", "CCC3"], historico_alertas=v["historico_alertas"])
+
+    agora = datetime.datetime.now(CONFIG.tz)
+    robo.disparar(robo.estado["ativos"][0], 11.0, agora)
+    state.descarregar_estados()
+
+    assert [a["ticker"] for a in _nuvem(supabase)["ativos"]] == ["BBB3", "CCC3"]
+    assert [a["ticker"] for a in robo.estado["ativos"]] == ["BBB3", "CCC3"]
+    assert _nuvem(supabase)["tempo_acumulado"] == {"BBB3": 30.0}
+
+
+def test_remocao_devolve_estado_da_nuvem(supabase):
+    _semear(supabase, ["AAA3", "BBB3"])
+    assert state.carregar_estado_duravel("curto") is not None
+
+    remoto = state.apagar_estado_duravel("curto", apenas_ticker="aaa3")
+
+    assert [a["ticker"] for a in remoto["ativos"]] == ["BBB3"]
+    assert [a["ticker"] for a in _nuvem(supabase)["ativos"]] == ["BBB3"]
+
+
+# ==================================================
+# ⏱️ updated_at: escrita do painel com upsert simples
+# ==================================================
+@pytest.mark.parametrize("gatilho", [True, False])
+def test_robo_so_percebe_upsert_do_painel_com_gatilho(supabase, monkeypatch, gatilho):
+    monkeypatch.setattr(supabase, "gatilho_updated_at", gatilho)
+    _semear(supabase, ["AAA3"])
+    robo = _robo()
+    assert robo.iniciar()
+
+    # O painel grava a linha inteira, sem mandar updated_at
+    painel = create_client(supabase.url, CHAVE_FALSA)
+    v = dict(_nuvem(supabase), ativos=[_ativo("AAA3"), _ativo("BBB3")])
+    painel.table(TABELA).upsert({"k": CHAVE, "v": v}).execute()
+    robo.sincronizar()
+
+    esperado = ["AAA3", "BBB3"] if gatilho else ["AAA3"]
+    assert [a["ticker"] for a in robo.estado["ativos"]] == esperado
+
+
+# ==================================================
+# 📒 Diário local do write-behind
+# ==================================================
+def _diario(tempo: float, gravado_em: str) -> None:
+    os.makedirs(os.environ["STATE_JOURNAL_DIR"], exist_ok=True)
+    with open(state._arquivo_diario(CHAVE), "w", encoding="utf-8") as f:
+        json.dump({
+            "nome_robo": "curto",
+            "alterados": ["tempo_acumulado"],
+            "removidos": [],
+            "estado": {"tempo_acumulado": {"AAA3": tempo}},
+            "gravado_em": gravado_em,
+        }, f)
+
+
+def test_diario_mais_novo_que_a_nuvem_e_reaplicado(supabase):
+    _semear(supabase, ["AAA3"])
+    _diario(90.0, datetime.datetime.now(datetime.timezone.utc).isoformat())
+
+    estado = state.carregar_estado_duravel("curto")
+
+    assert estado["tempo_acumulado"] == {"AAA3": 90.0}
+    assert _nuvem(supabase)["tempo_acumulado"] == {"AAA3": 90.0}
+    assert not os.path.exists(state._arquivo_diario(CHAVE))
+
+
+def test_diario_mais_antigo_que_a_nuvem_e_descartado(supabase):
+    _diario(90.0, "2024-12-31T23:59:59+00:00")
+    _semear(supabase, ["AAA3"], tempo_acumulado={"AAA3": 15.0})  # gravada depois do diário
+
+    estado = state.carregar_estado_duravel("curto")
+
+    assert estado["tempo_acumulado"] == {"AAA3": 15.0}
+    assert _nuvem(supabase)["tempo_acumulado"] == {"AAA3": 15.0}
+    assert not os.path.exists(state._arquivo_diario(CHAVE))
+
+
+def test_sigterm_envia_gravacoes_pendentes(supabase):
+    _semear(supabase, ["AAA3"])
+    codigo = (
+        "import os, signal, time\n"
+        "from core import state\n"
+        "e = state.carregar_estado_duravel('curto')\n"
+        "e['tempo_acumulado']['AAA3'] = 45.0\n"
+        "state.salvar_estado_duravel('curto', e)\n"
+        "state.instalar_descarga_no_sigterm()\n"
+        "os.kill(os.getpid(), signal.SIGTERM)\n"
+        "time.sleep(30)\n"
+    )
+    env = dict(os.environ, STATE_WRITE_BEHIND="60")
+    proc = subprocess.run([sys.executable, "-c", codigo], env=env, cwd=RAIZ, timeout=60)
+
+    assert proc.returncode == 0
+    assert _nuvem(supabase)["tempo_acumulado"] == {"AAA3": 45.0}
+    assert not os.path.exists(state._arquivo_diario(CHAVE))